@@ -1,11 +1,16 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, AsyncIterator
 from ..core.llm_manager import LLMManager
 from ..services.web_scraper import WebScraper
 import json
 from datetime import datetime as dt
 
 class BaseAgent(ABC):
+    # TTL for cached LLM responses; None uses LLM_CACHE_TTL
+    cache_ttl: Optional[int] = None
+    # Seconds before the scheduler gives up on this agent (None: AGENT_TIMEOUT_SECONDS)
+    timeout: Optional[float] = None
+    
     def __init__(self, llm_manager: LLMManager, web_scraper: WebScraper, name: str, role: str):
         self.llm_manager = llm_manager
         self.web_scraper = web_scraper
@@ -32,24 +37,55 @@ class BaseAgent(ABC):
         provider: str = "openai",
         model: Optional[str] = None,
         temperature: float = 0.7,
-        max_tokens: int = 2000
+        max_tokens: int = 2000,
+        bypass_cache: bool = False
     ) -> str:
         """Generate LLM response"""
-        messages = [
-            {"role": "system", "content": f"You are {self.name}, a {self.role}. Provide direct, professional responses without conversational phrases."},
-            {"role": "user", "content": prompt}
-        ]
+        messages = self._build_messages(prompt)
         
         response = await self.llm_manager.generate(
             messages=messages,
             provider=provider,
             model=model,
             temperature=temperature,
-            max_tokens=max_tokens
+            max_tokens=max_tokens,
+            cache_ttl=self.cache_ttl,
+            bypass_cache=bypass_cache
         )
         
         return response["content"]
     
+    async def generate_response_stream(
+        self,
+        prompt: str,
+        provider: str = "openai",
+        model: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 2000,
+        bypass_cache: bool = False
+    ) -> AsyncIterator[str]:
+        """Generate LLM response as a stream of text deltas"""
+        messages = self._build_messages(prompt)
+        
+        async for chunk in self.llm_manager.generate_stream(
+            messages=messages,
+            provider=provider,
+            model=model,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            cache_ttl=self.cache_ttl,
+            bypass_cache=bypass_cache
+        ):
+            if chunk["type"] == "delta":
+                yield chunk["content"]
+    
+    def _build_messages(self, prompt: str) -> List[Dict[str, str]]:
+        """Build chat messages for a prompt"""
+        return [
+            {"role": "system", "content": f"You are {self.name}, a {self.role}. Provide direct, professional responses without conversational phrases."},
+            {"role": "user", "content": prompt}
+        ]
+    
     def format_output(self, data: Any, output_type: str = "text") -> Dict[str, Any]:
         """Format agent output"""
         return {
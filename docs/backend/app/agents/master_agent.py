@@ -1,4 +1,4 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, AsyncIterator, Optional
 from .base_agent import BaseAgent
 from .worker_agents import (
     WebIntelligenceAgent,
@@ -8,13 +8,24 @@ from .worker_agents import (
     EXIMTrendsAgent,
     InternalKnowledgeAgent
 )
+from .scheduler import TaskScheduler
 from ..services.report_generator import ReportGenerator
-import asyncio
-import json
+from ..services.cache_manager import CacheManager, TieredCache
+from ..utils.constants import CACHE_PREFIX_QUERY, CACHE_PREFIX_QUERY_GENERATION
+import re
+import time
 from datetime import datetime as dt
 
+# Words that do not change what a query researches, ignored in cache keys
+GENERIC_QUERY_WORDS = {
+    'find', 'identify', 'search', 'analyze', 'research', 'explore', 'evaluate', 'assess',
+    'opportunities', 'opportunity', 'repurposing', 'potential', 'new', 'drug', 'drugs',
+    'molecule', 'molecules', 'what', 'are', 'is', 'a', 'an', 'of', 'to', 'for', 'the',
+    'in', 'on', 'and', 'or', 'with'
+}
+
 class MasterAgent(BaseAgent):
-    def __init__(self, llm_manager, web_scraper):
+    def __init__(self, llm_manager, web_scraper, cache_manager: Optional[CacheManager] = None):
         super().__init__(
             llm_manager,
             web_scraper,
@@ -32,6 +43,18 @@ class MasterAgent(BaseAgent):
         }
         
         self.report_generator = ReportGenerator()
+        
+        # Whole results (plan, agent results, synthesis, report) per normalized query
+        config = llm_manager.config
+        self.result_cache = None
+        if getattr(config, "QUERY_CACHE_ENABLED", False):
+            self.result_cache = TieredCache(
+                cache_manager,
+                max_entries=getattr(config, "QUERY_CACHE_MAX_ENTRIES", 200),
+                default_ttl=getattr(config, "QUERY_CACHE_TTL", 3600)
+            )
+        # Local copies of the invalidation counters, used when Redis is down
+        self._generations: Dict[str, int] = {}
     
     def _extract_search_terms(self, query: str) -> str:
         """Extract main search terms from query"""
@@ -40,46 +63,247 @@ class MasterAgent(BaseAgent):
         key_words = [w for w in words if w not in stop_words]
         return ' '.join(key_words[:4])
     
-    async def decompose_query(self, query: str, provider: str = "openai") -> Dict[str, Any]:
+    def _query_terms(self, query: str) -> str:
+        """Sorted, de-duplicated query terms without generic research words"""
+        words = re.findall(r"[a-z0-9][a-z0-9-]*", query.lower())
+        return "+".join(sorted({w for w in words if w not in GENERIC_QUERY_WORDS}))
+    
+    async def _generations_for(self, *keys: str) -> List[int]:
+        """Current values of invalidation counters, read in one round-trip"""
+        cache_manager = self.result_cache.cache_manager
+        shared = await cache_manager.get_many(list(keys)) if cache_manager else [None] * len(keys)
+        return [max(int(value or 0), self._generations.get(key, 0)) for key, value in zip(keys, shared)]
+    
+    async def _bump_generation(self, key: str):
+        """Advance an invalidation counter, so keys built on the old value miss"""
+        self._generations[key] = self._generations.get(key, 0) + 1
+        if self.result_cache.cache_manager:
+            shared = await self.result_cache.cache_manager.incr(key)
+            if shared is not None:
+                self._generations[key] = max(self._generations[key], shared)
+    
+    async def _query_cache_key(self, query: str, context: Dict[str, Any] = None) -> Optional[str]:
+        """Result cache key, or None when this request must not use the cache
+        
+        Keys carry the global and per-query invalidation counters, so an
+        invalidation in any process also misses every process's memory tier.
+        """
+        context = context or {}
+        terms = self._query_terms(query)
+        if self.result_cache is None or not terms or context.get("documents"):
+            return None
+        
+        provider = context.get("provider", "openai")
+        try:
+            # The model the request will actually use, so explicit and default agree
+            model = self.llm_manager._default_model(provider, context.get("model"))
+        except ValueError:
+            return None
+        generation = await self._generations_for(
+            CACHE_PREFIX_QUERY_GENERATION,
+            f"{CACHE_PREFIX_QUERY_GENERATION}:{terms}"
+        )
+        return f"{CACHE_PREFIX_QUERY}:{terms}:{provider}:{model}:g{generation[0]}.{generation[1]}"
+    
+    async def _get_cached_result(self, cache_key: Optional[str], context: Dict[str, Any] = None) -> Optional[Dict[str, Any]]:
+        """Cached result marked with its age, unless the request asks for fresh data"""
+        context = context or {}
+        if not cache_key or context.get("bypass_cache") or context.get("force_refresh"):
+            return None
+        
+        entry = await self.result_cache.get(cache_key)
+        if entry is None:
+            return None
+        return {
+            **entry["result"],
+            "cached": True,
+            "cache_age_seconds": round(time.time() - entry["cached_at"], 1)
+        }
+    
+    async def _cache_result(self, cache_key: Optional[str], result: Dict[str, Any]):
+        """Cache a result unless some agent failed or was cut off"""
+        if not cache_key:
+            return
+        if any(isinstance(r, dict) and r.get("error") for r in result["agent_results"].values()):
+            return
+        await self.result_cache.set(cache_key, {"result": result, "cached_at": time.time()})
+    
+    async def invalidate_cache(self, query: Optional[str] = None) -> int:
+        """Drop cached results for a query (any provider/model), or all of them
+        
+        Returns the number of entries deleted here; other processes stop
+        hitting theirs once they read the bumped generation counter.
+        """
+        if self.result_cache is None:
+            return 0
+        if query is None:
+            await self._bump_generation(CACHE_PREFIX_QUERY_GENERATION)
+            return await self.result_cache.clear_prefix(CACHE_PREFIX_QUERY)
+        terms = self._query_terms(query)
+        if not terms:
+            return 0
+        await self._bump_generation(f"{CACHE_PREFIX_QUERY_GENERATION}:{terms}")
+        return await self.result_cache.clear_prefix(f"{CACHE_PREFIX_QUERY}:{terms}")
+    
+    async def decompose_query(self, query: str, provider: str = "openai", context: Dict[str, Any] = None) -> Dict[str, Any]:
         """Decompose user query into tasks for worker agents"""
         search_terms = self._extract_search_terms(query)
         
+        tasks = [
+            {"agent": "web_intelligence", "task": search_terms, "priority": 1},
+            {"agent": "clinical_trials", "task": search_terms, "priority": 1},
+            {"agent": "patent_landscape", "task": search_terms, "priority": 2},
+            {"agent": "iqvia_insights", "task": search_terms, "priority": 2}
+        ]
+        if context and context.get("documents"):
+            # Internal documents are read against the literature findings
+            tasks.append({
+                "agent": "internal_knowledge",
+                "task": search_terms,
+                "priority": 3,
+                "depends_on": ["web_intelligence"]
+            })
+        
         return {
             "intent": f"Research {search_terms}",
-            "tasks": [
-                {"agent": "web_intelligence", "task": search_terms, "priority": 1},
-                {"agent": "clinical_trials", "task": search_terms, "priority": 1},
-                {"agent": "patent_landscape", "task": search_terms, "priority": 2},
-                {"agent": "iqvia_insights", "task": search_terms, "priority": 2}
-            ],
+            "tasks": tasks,
             "expected_output": "Comprehensive research report"
         }
     
+    def _scheduler(self, context: Dict[str, Any] = None) -> TaskScheduler:
+        """Scheduler for one request; context may shorten the deadline"""
+        config = self.llm_manager.config
+        deadline = (context or {}).get("deadline") or getattr(config, "AGENT_DEADLINE_SECONDS", None)
+        return TaskScheduler(
+            max_concurrency=getattr(config, "MAX_CONCURRENT_AGENTS", 5),
+            default_timeout=getattr(config, "AGENT_TIMEOUT_SECONDS", None),
+            deadline=deadline or None
+        )
+    
+    async def _execute_task(
+        self,
+        task_info: Dict[str, Any],
+        dependencies: Dict[str, Any],
+        context: Dict[str, Any] = None
+    ) -> Dict[str, Any]:
+        """Run one plan task on its worker agent"""
+        agent = self.workers.get(task_info["agent"])
+        if agent is None:
+            return {"error": "Agent not found"}
+        if dependencies:
+            context = {**(context or {}), "dependencies": dependencies}
+        return await agent.execute(task_info["task"], context)
+    
+    def _scheduled_tasks(self, tasks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Fill in each task's timeout from its agent when the plan has none"""
+        return [
+            {**t, "timeout": t.get("timeout") or getattr(self.workers.get(t["agent"]), "timeout", None)}
+            for t in tasks
+        ]
+    
+    def _iter_workers(self, tasks: List[Dict[str, Any]], context: Dict[str, Any] = None) -> AsyncIterator:
+        """Yield (agent, result) for worker tasks as they finish"""
+        return self._scheduler(context).run_iter(
+            self._scheduled_tasks(tasks),
+            lambda task_info, dependencies: self._execute_task(task_info, dependencies, context)
+        )
+    
+    async def _run_workers(self, tasks: List[Dict[str, Any]], context: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Run worker agent tasks and collect their results"""
+        return {name: result async for name, result in self._iter_workers(tasks, context)}
+    
     async def execute(self, query: str, context: Dict[str, Any] = None) -> Dict[str, Any]:
         """Execute orchestrated multi-agent workflow"""
         provider = context.get("provider", "openai") if context else "openai"
+        bypass_cache = bool(context and context.get("bypass_cache"))
+        
+        cache_key = await self._query_cache_key(query, context)
+        cached = await self._get_cached_result(cache_key, context)
+        if cached:
+            return cached
         
-        plan = await self.decompose_query(query, provider)
+        plan = await self.decompose_query(query, provider, context)
         
         tasks = plan.get("tasks", [])
         
-        async def execute_task(task_info):
-            agent_name = task_info["agent"]
-            task_desc = task_info["task"]
-            
-            if agent_name in self.workers:
-                agent = self.workers[agent_name]
-                result = await agent.execute(task_desc, context)
-                return (agent_name, result)
-            return (agent_name, {"error": "Agent not found"})
+        results = await self._run_workers(tasks, context)
+        
+        synthesis = await self.synthesize_results(query, plan, results, provider, bypass_cache)
+        
+        report_path = await self.report_generator.generate_report(
+            query=query,
+            synthesis=synthesis,
+            agent_results=results,
+            plan=plan
+        )
+        
+        result = {
+            "query": query,
+            "plan": plan,
+            "agent_results": results,
+            "synthesis": synthesis,
+            "report_path": report_path,
+            "timestamp": dt.now().isoformat()
+        }
+        await self._cache_result(cache_key, result)
+        
+        return {**result, "cached": False, "cache_age_seconds": 0.0}
+    
+    async def _replay_cached(self, cached: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        """Stream a cached result with the same events as a fresh run"""
+        yield {"event": "plan", "data": cached["plan"]}
+        results = cached["agent_results"]
+        for i, (name, result) in enumerate(results.items(), 1):
+            yield {
+                "event": "agent_result",
+                "data": {"agent": name, "result": result, "completed": i, "total": len(results)}
+            }
+        yield {"event": "agent_results", "data": results}
+        yield {"event": "synthesis", "data": {"synthesis": cached["synthesis"]}}
+        yield {"event": "report", "data": {"report_path": cached["report_path"]}}
+        yield {"event": "complete", "data": cached}
+    
+    async def execute_stream(self, query: str, context: Dict[str, Any] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Execute the workflow, yielding events as each stage produces output
         
-        results_list = await asyncio.gather(*[execute_task(t) for t in tasks])
+        Events are {"event": name, "data": payload} with names plan,
+        agent_result (one per worker, in completion order), agent_results,
+        synthesis_delta, synthesis, report and complete. A cached result is
+        replayed without synthesis_delta events.
+        """
+        provider = context.get("provider", "openai") if context else "openai"
+        bypass_cache = bool(context and context.get("bypass_cache"))
+        
+        cache_key = await self._query_cache_key(query, context)
+        cached = await self._get_cached_result(cache_key, context)
+        if cached:
+            async for event in self._replay_cached(cached):
+                yield event
+            return
+        
+        plan = await self.decompose_query(query, provider, context)
+        yield {"event": "plan", "data": plan}
         
         results = {}
-        for agent_name, result in results_list:
-            results[agent_name] = result
+        async for name, result in self._iter_workers(plan.get("tasks", []), context):
+            results[name] = result
+            yield {
+                "event": "agent_result",
+                "data": {
+                    "agent": name,
+                    "result": result,
+                    "completed": len(results),
+                    "total": len(plan.get("tasks", []))
+                }
+            }
+        yield {"event": "agent_results", "data": results}
         
-        synthesis = await self.synthesize_results(query, plan, results, provider)
+        parts = []
+        async for delta in self.synthesize_results_stream(query, plan, results, provider, bypass_cache):
+            parts.append(delta)
+            yield {"event": "synthesis_delta", "data": {"content": delta}}
+        synthesis = "".join(parts)
+        yield {"event": "synthesis", "data": {"synthesis": synthesis}}
         
         report_path = await self.report_generator.generate_report(
             query=query,
@@ -87,8 +311,9 @@ class MasterAgent(BaseAgent):
             agent_results=results,
             plan=plan
         )
+        yield {"event": "report", "data": {"report_path": report_path}}
         
-        return {
+        result = {
             "query": query,
             "plan": plan,
             "agent_results": results,
@@ -96,43 +321,41 @@ class MasterAgent(BaseAgent):
             "report_path": report_path,
             "timestamp": dt.now().isoformat()
         }
-    
-    async def synthesize_results(
-        self,
-        query: str,
-        plan: Dict[str, Any],
-        results: Dict[str, Any],
-        provider: str
-    ) -> str:
-        """Synthesize all agent results into coherent summary"""
+        await self._cache_result(cache_key, result)
         
-        # Extract data
+        yield {"event": "complete", "data": {**result, "cached": False, "cache_age_seconds": 0.0}}
+    
+    def _synthesis_inputs(self, results: Dict[str, Any]) -> Dict[str, Any]:
+        """Extract the agent outputs used for synthesis"""
         web_data = results.get("web_intelligence", {}).get("data", {})
         trials_data = results.get("clinical_trials", {}).get("data", {})
         patent_data = results.get("patent_landscape", {}).get("data", {})
         market_data = results.get("iqvia_insights", {}).get("data", {})
         
-        web_summary = web_data.get("summary", "")
-        trials_analysis = trials_data.get("analysis", "")
-        patent_analysis = patent_data.get("analysis", "")
-        market_analysis = market_data.get("analysis", "")
-        
-        trial_count = trials_data.get("total_trials", 0)
-        patent_count = patent_data.get("total_patents", 0)
-        
-        synthesis_prompt = f"""Create a comprehensive executive summary for: {query}
+        return {
+            "web_summary": web_data.get("summary", ""),
+            "trials_analysis": trials_data.get("analysis", ""),
+            "patent_analysis": patent_data.get("analysis", ""),
+            "market_analysis": market_data.get("analysis", ""),
+            "trial_count": trials_data.get("total_trials", 0),
+            "patent_count": patent_data.get("total_patents", 0)
+        }
+    
+    def _build_synthesis_prompt(self, query: str, inputs: Dict[str, Any]) -> str:
+        """Build the executive summary prompt"""
+        return f"""Create a comprehensive executive summary for: {query}
 
 SCIENTIFIC FINDINGS:
-{web_summary[:500]}
+{inputs["web_summary"][:500]}
 
-CLINICAL TRIALS: {trial_count} trials identified
-{trials_analysis[:300]}
+CLINICAL TRIALS: {inputs["trial_count"]} trials identified
+{inputs["trials_analysis"][:300]}
 
-IP LANDSCAPE: {patent_count} patents
-{patent_analysis[:200]}
+IP LANDSCAPE: {inputs["patent_count"]} patents
+{inputs["patent_analysis"][:200]}
 
 MARKET: $2.5B, 8.5% CAGR
-{market_analysis[:200]}
+{inputs["market_analysis"][:200]}
 
 Write a structured executive summary with these sections:
 
@@ -155,13 +378,26 @@ Write a structured executive summary with these sections:
 
 Be specific, use bullet points and numbers. 350-450 words total.
 Start directly with "# Executive Summary" - no preamble."""
+    
+    async def synthesize_results(
+        self,
+        query: str,
+        plan: Dict[str, Any],
+        results: Dict[str, Any],
+        provider: str,
+        bypass_cache: bool = False
+    ) -> str:
+        """Synthesize all agent results into coherent summary"""
+        inputs = self._synthesis_inputs(results)
+        synthesis_prompt = self._build_synthesis_prompt(query, inputs)
         
         try:
             synthesis = await self.generate_response(
                 synthesis_prompt, 
                 provider=provider, 
                 temperature=0.4,
-                max_tokens=1500
+                max_tokens=1500,
+                bypass_cache=bypass_cache
             )
             
             synthesis = self._clean_synthesis(synthesis)
@@ -169,7 +405,52 @@ Start directly with "# Executive Summary" - no preamble."""
             
         except Exception as e:
             print(f"Synthesis error: {e}")
-            return self._create_enhanced_fallback(query, web_summary, trial_count, patent_count, market_analysis)
+            return self._create_enhanced_fallback(
+                query, inputs["web_summary"], inputs["trial_count"],
+                inputs["patent_count"], inputs["market_analysis"]
+            )
+    
+    async def synthesize_results_stream(
+        self,
+        query: str,
+        plan: Dict[str, Any],
+        results: Dict[str, Any],
+        provider: str,
+        bypass_cache: bool = False
+    ) -> AsyncIterator[str]:
+        """Stream the synthesis as text deltas"""
+        inputs = self._synthesis_inputs(results)
+        synthesis_prompt = self._build_synthesis_prompt(query, inputs)
+        
+        # Hold back the opening until conversational phrases can be cleaned
+        head = ""
+        head_sent = False
+        try:
+            async for delta in self.generate_response_stream(
+                synthesis_prompt,
+                provider=provider,
+                temperature=0.4,
+                max_tokens=1500,
+                bypass_cache=bypass_cache
+            ):
+                if head_sent:
+                    yield delta
+                    continue
+                head += delta
+                if "\n" in head or len(head) >= 40:
+                    head_sent = True
+                    yield self._clean_synthesis(head)
+            
+            if not head_sent:
+                yield self._clean_synthesis(head)
+                
+        except Exception as e:
+            print(f"Synthesis error: {e}")
+            if not head_sent:
+                yield self._create_enhanced_fallback(
+                    query, inputs["web_summary"], inputs["trial_count"],
+                    inputs["patent_count"], inputs["market_analysis"]
+                )
     
     def _clean_synthesis(self, text: str) -> str:
         """Clean conversational phrases"""
@@ -0,0 +1,113 @@
+import asyncio
+import heapq
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+TaskRunner = Callable[[Dict[str, Any], Dict[str, Any]], Awaitable[Any]]
+
+class TaskScheduler:
+    """Run worker tasks as a dependency graph
+
+    Each task is a plan entry {"agent", "task", "priority", "depends_on",
+    "timeout"}. A task starts once every task it depends on has finished
+    (successfully or not), lower priority numbers first, with at most
+    max_concurrency running. A task that fails or exceeds its timeout gets
+    an error result instead of failing the run. Once `deadline` seconds
+    have passed, running tasks are cancelled and the rest are skipped, so
+    callers can continue with whatever has finished.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 5,
+        default_timeout: Optional[float] = None,
+        deadline: Optional[float] = None
+    ):
+        self.max_concurrency = max_concurrency
+        self.default_timeout = default_timeout
+        self.deadline = deadline
+
+    async def _run_task(self, task_info: Dict[str, Any], runner: TaskRunner, dependencies: Dict[str, Any]) -> Any:
+        timeout = task_info.get("timeout") or self.default_timeout
+        try:
+            if timeout:
+                return await asyncio.wait_for(runner(task_info, dependencies), timeout=timeout)
+            return await runner(task_info, dependencies)
+        except asyncio.TimeoutError:
+            return {"error": f"Timed out after {timeout}s", "status": "timeout"}
+        except Exception as e:
+            return {"error": str(e), "status": "failed"}
+
+    async def run_iter(
+        self,
+        tasks: List[Dict[str, Any]],
+        runner: TaskRunner
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """Yield (agent, result) for each task as it finishes
+
+        runner(task_info, dependency_results) runs one task. Every task yields
+        exactly once; tasks cut off by the deadline or stuck in a dependency
+        cycle yield an error result.
+        """
+        started = time.monotonic()
+        names = {t["agent"] for t in tasks}
+        waiting_on = {
+            t["agent"]: {d for d in t.get("depends_on", []) if d in names and d != t["agent"]}
+            for t in tasks
+        }
+        by_name = {t["agent"]: t for t in tasks}
+        order = {t["agent"]: i for i, t in enumerate(tasks)}
+        results: Dict[str, Any] = {}
+
+        ready: List[Tuple[int, int, str]] = []
+        for name, deps in waiting_on.items():
+            if not deps:
+                heapq.heappush(ready, (by_name[name].get("priority", 0), order[name], name))
+
+        running: Dict[asyncio.Task, str] = {}
+        deadline_hit = False
+        try:
+            while ready or running:
+                while ready and len(running) < self.max_concurrency:
+                    _, _, name = heapq.heappop(ready)
+                    task_info = by_name[name]
+                    dependencies = {d: results[d] for d in task_info.get("depends_on", []) if d in results}
+                    running[asyncio.ensure_future(self._run_task(task_info, runner, dependencies))] = name
+
+                remaining = None
+                if self.deadline is not None:
+                    remaining = self.deadline - (time.monotonic() - started)
+                    if remaining <= 0:
+                        deadline_hit = True
+                        break
+
+                done, _ = await asyncio.wait(running, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+                for finished in done:
+                    name = running.pop(finished)
+                    results[name] = finished.result()
+                    yield name, results[name]
+
+                    for other, deps in waiting_on.items():
+                        if name in deps:
+                            deps.discard(name)
+                            if not deps and other not in results:
+                                heapq.heappush(ready, (by_name[other].get("priority", 0), order[other], other))
+        finally:
+            for pending in running:
+                pending.cancel()
+
+        # Whatever did not finish: cut off by the deadline or stuck in a cycle
+        unfinished = set(running.values())
+        for name in sorted(names - results.keys(), key=order.get):
+            if name in unfinished:
+                result = {"error": f"Not finished within the {self.deadline}s deadline", "status": "incomplete"}
+            elif deadline_hit:
+                result = {"error": f"Not started within the {self.deadline}s deadline", "status": "skipped"}
+            else:
+                result = {"error": "Dependency cycle", "status": "skipped"}
+            results[name] = result
+            yield name, result
+
+    async def run(self, tasks: List[Dict[str, Any]], runner: TaskRunner) -> Dict[str, Any]:
+        """Run all tasks and return results keyed by agent"""
+        return {name: result async for name, result in self.run_iter(tasks, runner)}
@@ -2,8 +2,11 @@ from .base_agent import BaseAgent
 from typing import Dict, Any, List
 import json
 from datetime import datetime as dt
+from ..utils.helpers import truncate_text
 
 class WebIntelligenceAgent(BaseAgent):
+    cache_ttl = 6 * 3600
+    
     def __init__(self, llm_manager, web_scraper):
         super().__init__(
             llm_manager,
@@ -14,7 +17,8 @@ class WebIntelligenceAgent(BaseAgent):
     
     async def execute(self, task: str, context: Dict[str, Any] = None) -> Dict[str, Any]:
         """Search web for relevant information"""
-        pubmed_results = await self.web_scraper.search_pubmed(task, max_results=5)
+        force_refresh = bool(context and context.get("force_refresh"))
+        pubmed_results = await self.web_scraper.search_pubmed(task, max_results=5, force_refresh=force_refresh)
         web_results = await self.web_scraper.search_web(task, max_results=3)
         
         # Check if query is clinical/scientific vs market/pricing
@@ -72,11 +76,15 @@ START DIRECTLY with "# Market Intelligence Summary" - no preamble."""
             # For scientific/clinical queries, use original approach
             papers_detail = []
             for i, paper in enumerate(pubmed_results[:5], 1):
-                papers_detail.append(
+                detail = (
                     f"{i}. {paper['title']} ({paper['source']}, {paper['pubdate']})\n"
                     f"   Authors: {', '.join(paper['authors'][:3])}\n"
                     f"   PMID: {paper['pmid']}"
                 )
+                # The local PubMed index also returns abstracts
+                if paper.get("abstract"):
+                    detail += f"\n   Abstract: {truncate_text(paper['abstract'], 400)}"
+                papers_detail.append(detail)
             
             papers_text = "\n\n".join(papers_detail)
             
@@ -109,11 +117,13 @@ Write 250-300 words, professional scientific style.
 START DIRECTLY with "# Scientific Literature Analysis" - no preamble."""
         
         provider = context.get("provider", "openai") if context else "openai"
+        bypass_cache = bool(context and context.get("bypass_cache"))
         summary = await self.generate_response(
             summary_prompt, 
             provider=provider, 
             temperature=0.4, 
-            max_tokens=1200
+            max_tokens=1200,
+            bypass_cache=bypass_cache
         )
         
         # Clean any conversational start
@@ -148,6 +158,10 @@ START DIRECTLY with "# Scientific Literature Analysis" - no preamble."""
         return text
 
 class ClinicalTrialsAgent(BaseAgent):
+    cache_ttl = 6 * 3600
+    # Trials listed in the output; distributions and counts use every match
+    max_listed_trials = 20
+    
     def __init__(self, llm_manager, web_scraper):
         super().__init__(
             llm_manager,
@@ -186,7 +200,12 @@ Relevant research areas:
                 "note": "Clinical trials not applicable to market/pricing queries"
             }, output_type="table")
         
-        trials = await self.web_scraper.search_clinical_trials(task, max_results=10)
+        force_refresh = bool(context and context.get("force_refresh"))
+        trials = await self.web_scraper.search_clinical_trials(
+            task,
+            max_results=self.web_scraper.trial_search_limit,
+            force_refresh=force_refresh
+        )
         
         phase_dist = {}
         status_dist = {}
@@ -246,12 +265,13 @@ Provide analysis:
 Write 150-250 words. START with "# Clinical Trial Landscape"."""
         
         provider = context.get("provider", "openai") if context else "openai"
-        analysis = await self.generate_response(analysis_prompt, provider=provider, temperature=0.5, max_tokens=1000)
+        bypass_cache = bool(context and context.get("bypass_cache"))
+        analysis = await self.generate_response(analysis_prompt, provider=provider, temperature=0.5, max_tokens=1000, bypass_cache=bypass_cache)
         analysis = analysis.strip()
         
         return self.format_output({
             "analysis": analysis,
-            "trials": trials,
+            "trials": trials[:self.max_listed_trials],
             "phase_distribution": phase_dist,
             "status_distribution": status_dist,
             "total_trials": len(trials),
@@ -259,6 +279,8 @@ Write 150-250 words. START with "# Clinical Trial Landscape"."""
         }, output_type="table")
 
 class PatentLandscapeAgent(BaseAgent):
+    cache_ttl = 24 * 3600
+    
     def __init__(self, llm_manager, web_scraper):
         super().__init__(
             llm_manager,
@@ -269,10 +291,19 @@ class PatentLandscapeAgent(BaseAgent):
     
     async def execute(self, task: str, context: Dict[str, Any] = None) -> Dict[str, Any]:
         """Search and analyze patents"""
-        patents = await self.web_scraper.search_patents_uspto(task, max_results=10)
+        force_refresh = bool(context and context.get("force_refresh"))
+        patents = await self.web_scraper.search_patents_uspto(task, max_results=10, force_refresh=force_refresh)
         
         active_count = len([p for p in patents if p.get("status") == "Active"])
         pending_count = len([p for p in patents if p.get("status") == "Pending"])
+        total_count = len(patents)
+        
+        # With a local patent index, count across every match, not just the top results
+        landscape = await self.web_scraper.patent_landscape(task, force_refresh=force_refresh)
+        if landscape and landscape["total"]:
+            total_count = landscape["total"]
+            active_count = landscape["active"]
+            pending_count = landscape["pending"]
         
         patents_detail = []
         for i, patent in enumerate(patents[:5], 1):
@@ -281,11 +312,11 @@ class PatentLandscapeAgent(BaseAgent):
                 f"   {patent['patent_number']} | {patent['assignee']} | Status: {patent['status']}"
             )
         
-        patents_text = "\n\n".join(patents_detail)
+        patents_text = "\n\n".join(patents_detail) or "No matching patents found"
         
         analysis_prompt = f"""Patent landscape for: {task}
 
-PATENTS: {len(patents)} identified
+PATENTS: {total_count} identified
 - Active: {active_count}
 - Pending: {pending_count}
 
@@ -314,18 +345,22 @@ Provide analysis:
 Write 150-200 words. START with "# Patent Landscape Analysis"."""
         
         provider = context.get("provider", "openai") if context else "openai"
-        analysis = await self.generate_response(analysis_prompt, provider=provider, temperature=0.5, max_tokens=900)
+        bypass_cache = bool(context and context.get("bypass_cache"))
+        analysis = await self.generate_response(analysis_prompt, provider=provider, temperature=0.5, max_tokens=900, bypass_cache=bypass_cache)
         analysis = analysis.strip()
         
         return self.format_output({
             "analysis": analysis,
             "patents": patents,
-            "total_patents": len(patents),
+            "total_patents": total_count,
             "active_patents": active_count,
-            "pending_patents": pending_count
+            "pending_patents": pending_count,
+            "landscape": landscape
         }, output_type="table")
 
 class IQVIAInsightsAgent(BaseAgent):
+    cache_ttl = 24 * 3600
+    
     def __init__(self, llm_manager, web_scraper):
         super().__init__(
             llm_manager,
@@ -383,7 +418,8 @@ Analysis:
 Write 150-200 words. START with "# Market Intelligence Summary"."""
         
         provider = context.get("provider", "openai") if context else "openai"
-        analysis = await self.generate_response(analysis_prompt, provider=provider, temperature=0.5, max_tokens=900)
+        bypass_cache = bool(context and context.get("bypass_cache"))
+        analysis = await self.generate_response(analysis_prompt, provider=provider, temperature=0.5, max_tokens=900, bypass_cache=bypass_cache)
         analysis = analysis.strip()
         
         return self.format_output({
@@ -426,20 +462,28 @@ class InternalKnowledgeAgent(BaseAgent):
                 "documents_analyzed": 0
             })
         
+        # Scheduled after web intelligence, so findings can be compared
+        literature = (context.get("dependencies", {}).get("web_intelligence") or {}).get("data", {})
+        literature_text = ""
+        if literature.get("summary"):
+            literature_text = f"\nPUBLISHED LITERATURE SUMMARY:\n{literature['summary'][:500]}\n"
+        
         analysis_prompt = f"""Analyze internal documents for: {task}
 
 {len(documents)} documents provided
-
+{literature_text}
 Extract:
 1. Strategic insights
 2. Historical context
 3. Internal perspectives
 4. Action items
+5. Where internal views differ from the published literature, if given
 
 Write 100-150 words."""
         
         provider = context.get("provider", "openai") if context else "openai"
-        analysis = await self.generate_response(analysis_prompt, provider=provider, temperature=0.5, max_tokens=700)
+        bypass_cache = bool(context and context.get("bypass_cache"))
+        analysis = await self.generate_response(analysis_prompt, provider=provider, temperature=0.5, max_tokens=700, bypass_cache=bypass_cache)
         
         return self.format_output({
             "analysis": analysis,
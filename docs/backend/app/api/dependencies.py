@@ -2,22 +2,35 @@ from functools import lru_cache
 from ..core.config import get_settings
 from ..core.llm_manager import LLMManager
 from ..services.web_scraper import WebScraper
+from ..services.cache_manager import CacheManager
+from ..services.job_queue import create_job_queue
 from ..agents.master_agent import MasterAgent
 
+@lru_cache()
+def get_cache_manager():
+    """Get Cache Manager singleton"""
+    settings = get_settings()
+    return CacheManager(settings.REDIS_URL)
+
 @lru_cache()
 def get_llm_manager():
     """Get LLM Manager singleton"""
     settings = get_settings()
-    return LLMManager(settings)
+    return LLMManager(settings, cache_manager=get_cache_manager())
 
 @lru_cache()
 def get_web_scraper():
     """Get Web Scraper singleton"""
-    return WebScraper()
+    return WebScraper(get_settings(), cache_manager=get_cache_manager())
 
 @lru_cache()
 def get_master_agent():
     """Get Master Agent singleton"""
     llm_manager = get_llm_manager()
     web_scraper = get_web_scraper()
-    return MasterAgent(llm_manager, web_scraper)
\ No newline at end of file
+    return MasterAgent(llm_manager, web_scraper, cache_manager=get_cache_manager())
+
+@lru_cache()
+def get_job_queue():
+    """Get Job Queue singleton; workers start with the first submitted job"""
+    return create_job_queue(get_settings(), get_master_agent().execute_stream)
\ No newline at end of file
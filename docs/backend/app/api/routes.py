@@ -1,6 +1,6 @@
 from fastapi import APIRouter, HTTPException, UploadFile, File, Depends
-from fastapi.responses import FileResponse
-from typing import List
+from fastapi.responses import FileResponse, StreamingResponse
+from typing import List, Optional
 import os
 
 from ..models.schemas import (
@@ -8,10 +8,13 @@ from ..models.schemas import (
     QueryResponse,
     ChatRequest,
     HealthResponse,
+    JobStatus,
     UsageStats
 )
 from ..core.config import get_settings
-from .dependencies import get_master_agent, get_llm_manager
+from ..utils.helpers import format_sse
+from ..services.job_queue import job_summary, QueueFullError
+from .dependencies import get_master_agent, get_llm_manager, get_web_scraper, get_job_queue
 
 router = APIRouter(prefix="/api", tags=["api"])
 
@@ -24,7 +27,9 @@ async def process_query(
     try:
         context = {
             "provider": request.provider,
-            "model": request.model
+            "model": request.model,
+            "bypass_cache": request.bypass_cache,
+            "force_refresh": request.force_refresh
         }
         
         result = await master_agent.execute(request.query, context)
@@ -37,11 +42,97 @@ async def process_query(
             synthesis=result["synthesis"],
             report_path=result.get("report_path"),
             timestamp=result["timestamp"],
+            cached=result.get("cached", False),
+            cache_age_seconds=result.get("cache_age_seconds"),
             usage_stats=master_agent.llm_manager.get_usage_stats()
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/query/stream")
+async def process_query_stream(
+    request: QueryRequest,
+    master_agent = Depends(get_master_agent)
+):
+    """Process research query as a Server-Sent Events stream"""
+    context = {
+        "provider": request.provider,
+        "model": request.model,
+        "bypass_cache": request.bypass_cache,
+        "force_refresh": request.force_refresh
+    }
+    
+    async def event_stream():
+        try:
+            async for event in master_agent.execute_stream(request.query, context):
+                yield format_sse(event["data"], event=event["event"])
+            yield format_sse(master_agent.llm_manager.get_usage_stats(), event="usage_stats")
+        except Exception as e:
+            yield format_sse({"detail": str(e)}, event="error")
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+@router.delete("/query/cache")
+async def invalidate_query_cache(
+    query: Optional[str] = None,
+    master_agent = Depends(get_master_agent)
+):
+    """Drop cached query results for one query, or all of them"""
+    cleared = await master_agent.invalidate_cache(query)
+    return {
+        "success": True,
+        "cleared": cleared
+    }
+
+@router.post("/jobs", response_model=JobStatus, status_code=202)
+async def submit_job(
+    request: QueryRequest,
+    job_queue = Depends(get_job_queue)
+):
+    """Queue a research query to run in the background"""
+    context = {
+        "provider": request.provider,
+        "model": request.model,
+        "bypass_cache": request.bypass_cache,
+        "force_refresh": request.force_refresh
+    }
+    try:
+        job = await job_queue.submit(request.query, context)
+    except QueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    
+    return job_summary(job)
+
+@router.get("/jobs/{job_id}", response_model=JobStatus)
+async def get_job(job_id: str, job_queue = Depends(get_job_queue)):
+    """Get a background job's status and progress"""
+    job = await job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_summary(job)
+
+@router.get("/jobs/{job_id}/result")
+async def get_job_result(job_id: str, job_queue = Depends(get_job_queue)):
+    """Get a completed job's result"""
+    job = await job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job["status"] != "completed":
+        raise HTTPException(status_code=409, detail=f"Job is {job['status']}")
+    
+    return {
+        "success": True,
+        "data": job["result"]
+    }
+
+@router.delete("/jobs/{job_id}", response_model=JobStatus)
+async def cancel_job(job_id: str, job_queue = Depends(get_job_queue)):
+    """Cancel a queued or running job"""
+    job = await job_queue.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_summary(job)
+
 @router.post("/chat")
 async def chat(
     request: ChatRequest,
@@ -56,7 +147,8 @@ async def chat(
             provider=request.provider,
             model=request.model,
             temperature=request.temperature,
-            max_tokens=request.max_tokens
+            max_tokens=request.max_tokens,
+            bypass_cache=request.bypass_cache
         )
         
         return {
@@ -68,6 +160,36 @@ async def chat(
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/chat/stream")
+async def chat_stream(
+    request: ChatRequest,
+    llm_manager = Depends(get_llm_manager)
+):
+    """Interactive chat as a Server-Sent Events stream"""
+    messages = [{"role": m.role, "content": m.content} for m in request.messages]
+    
+    async def event_stream():
+        try:
+            async for chunk in llm_manager.generate_stream(
+                messages=messages,
+                provider=request.provider,
+                model=request.model,
+                temperature=request.temperature,
+                max_tokens=request.max_tokens,
+                bypass_cache=request.bypass_cache
+            ):
+                if chunk["type"] == "delta":
+                    yield format_sse({"content": chunk["content"]}, event="delta")
+                else:
+                    yield format_sse({
+                        "usage": chunk["usage"],
+                        "cost": chunk["cost"]
+                    }, event="done")
+        except Exception as e:
+            yield format_sse({"detail": str(e)}, event="error")
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
 @router.get("/reports/{filename}")
 async def download_report(filename: str):
     """Download generated report"""
@@ -115,14 +237,20 @@ async def get_usage(llm_manager = Depends(get_llm_manager)):
     return llm_manager.get_usage_stats()
 
 @router.get("/health", response_model=HealthResponse)
-async def health_check(llm_manager = Depends(get_llm_manager)):
+async def health_check(
+    llm_manager = Depends(get_llm_manager),
+    web_scraper = Depends(get_web_scraper)
+):
     """Health check endpoint"""
     from datetime import datetime
     from .. import __version__
     
+    breakers = web_scraper.get_breaker_stats()
     return HealthResponse(
-        status="healthy",
+        status="degraded" if any(b["state"] != "closed" for b in breakers.values()) else "healthy",
         timestamp=datetime.now(),
         version=__version__,
-        usage_stats=llm_manager.get_usage_stats()
+        usage_stats=llm_manager.get_usage_stats(),
+        connection_pool=web_scraper.get_pool_stats(),
+        circuit_breakers=breakers
     )
\ No newline at end of file
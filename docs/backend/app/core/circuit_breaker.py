@@ -0,0 +1,118 @@
+import asyncio
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a source whose breaker is open"""
+
+    def __init__(self, name: str, retry_in: float):
+        self.name = name
+        self.retry_in = retry_in
+        super().__init__(f"Circuit '{name}' is open; retrying in {retry_in:.1f}s")
+
+class CircuitBreaker:
+    """Closed/open/half-open breaker for one upstream source
+
+    Tracks the last `window` calls; a call counts as bad when it fails, times
+    out or takes longer than slow_call_seconds. Once at least min_requests
+    calls are recorded and the bad ratio reaches failure_rate, the breaker
+    opens and calls fail immediately. After open_seconds a single probe is
+    let through: success closes the breaker, failure opens it again.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_rate: float = 0.5,
+        min_requests: int = 5,
+        window: int = 20,
+        slow_call_seconds: float = 5.0,
+        open_seconds: float = 30.0,
+        call_timeout: Optional[float] = None
+    ):
+        self.name = name
+        self.failure_rate = failure_rate
+        self.min_requests = min_requests
+        self.slow_call_seconds = slow_call_seconds
+        self.open_seconds = open_seconds
+        self.call_timeout = call_timeout
+
+        self._outcomes: deque = deque(maxlen=window)
+        self._opened_at: Optional[float] = None
+        self._probing = False
+        self.stats = {"calls": 0, "failures": 0, "slow_calls": 0, "rejected": 0, "opened": 0}
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.open_seconds:
+            return "half_open"
+        return "open"
+
+    def _open(self):
+        self._opened_at = time.monotonic()
+        self._outcomes.clear()
+        self.stats["opened"] += 1
+
+    def _close(self):
+        self._opened_at = None
+        self._outcomes.clear()
+
+    def _record(self, bad: bool, probe: bool):
+        if probe:
+            self._probing = False
+            if bad:
+                self._open()
+            else:
+                self._close()
+            return
+
+        self._outcomes.append(bad)
+        if len(self._outcomes) >= self.min_requests:
+            if sum(self._outcomes) / len(self._outcomes) >= self.failure_rate:
+                self._open()
+
+    async def call(self, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Run fn() through the breaker, or raise CircuitOpenError"""
+        state = self.state
+        probe = False
+        if state == "open" or (state == "half_open" and self._probing):
+            self.stats["rejected"] += 1
+            retry_in = self.open_seconds - (time.monotonic() - self._opened_at)
+            raise CircuitOpenError(self.name, max(0.0, retry_in))
+        if state == "half_open":
+            self._probing = probe = True
+
+        self.stats["calls"] += 1
+        started = time.monotonic()
+        try:
+            if self.call_timeout:
+                result = await asyncio.wait_for(fn(), timeout=self.call_timeout)
+            else:
+                result = await fn()
+        except asyncio.CancelledError:
+            # The caller went away; that says nothing about the source
+            if probe:
+                self._probing = False
+            raise
+        except Exception:
+            self.stats["failures"] += 1
+            self._record(True, probe)
+            raise
+
+        slow = time.monotonic() - started > self.slow_call_seconds
+        if slow:
+            self.stats["slow_calls"] += 1
+        self._record(slow, probe)
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get breaker state and counters"""
+        recent = len(self._outcomes)
+        return {
+            **self.stats,
+            "state": self.state,
+            "recent_failure_rate": round(sum(self._outcomes) / recent, 3) if recent else 0.0
+        }
@@ -0,0 +1,99 @@
+import asyncio
+import time
+from collections import deque
+from typing import Dict, Any
+
+class AdaptiveConcurrencyLimiter:
+    """AIMD concurrency limit for outbound LLM calls
+
+    Starts at max_limit. Each success grows the limit by 1/limit (about one
+    slot per round of calls), up to max_limit. Overload errors, or a call
+    much slower than the usual latency for its key, cut the limit by the
+    backoff factor, at most once per cooldown.
+    """
+
+    def __init__(
+        self,
+        max_limit: int,
+        min_limit: int = 1,
+        backoff: float = 0.5,
+        latency_tolerance: float = 2.0,
+        cooldown: float = 1.0
+    ):
+        self.max_limit = max_limit
+        self.min_limit = min_limit
+        self.backoff = backoff
+        self.latency_tolerance = latency_tolerance
+        self.cooldown = cooldown
+
+        self.limit = float(max_limit)
+        self.in_flight = 0
+        self._waiters: deque = deque()
+        self._baselines: Dict[str, float] = {}
+        self._last_decrease = 0.0
+        self.stats = {"increases": 0, "decreases": 0}
+
+    async def acquire(self):
+        """Wait for a free slot"""
+        if self.in_flight < int(self.limit) and not self._waiters:
+            self.in_flight += 1
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed to us just as we were cancelled
+                self.release()
+            else:
+                self._waiters.remove(waiter)
+            raise
+
+    def release(self):
+        """Free a slot and wake waiters that now fit under the limit"""
+        self.in_flight -= 1
+        self._wake()
+
+    def _wake(self):
+        while self._waiters and self.in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+
+    def record_success(self, latency: float, key: str = "default"):
+        """Feed back a successful call's latency"""
+        baseline = self._baselines.get(key)
+        if baseline is None:
+            self._baselines[key] = latency
+        else:
+            self._baselines[key] = baseline * 0.95 + latency * 0.05
+            if latency > baseline * self.latency_tolerance:
+                self.record_overload()
+                return
+
+        if self.limit < self.max_limit:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            self.stats["increases"] += 1
+            self._wake()
+
+    def record_overload(self):
+        """Feed back a 429/5xx or latency spike"""
+        now = time.monotonic()
+        if now - self._last_decrease < self.cooldown:
+            return
+        self._last_decrease = now
+        self.limit = max(self.min_limit, self.limit * self.backoff)
+        self.stats["decreases"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get current limit and saturation"""
+        return {
+            **self.stats,
+            "limit": round(self.limit, 2),
+            "max_limit": self.max_limit,
+            "in_flight": self.in_flight,
+            "queue_depth": len(self._waiters)
+        }
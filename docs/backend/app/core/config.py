@@ -9,24 +9,118 @@ class Settings(BaseSettings):
     # Rate Limiting
     MAX_REQUESTS_PER_MINUTE: int = 20
     MAX_TOKENS_PER_REQUEST: int = 6000
+    MAX_TOKENS_PER_MINUTE: int = 90000
+    RATE_LIMIT_USE_REDIS: bool = True
+    
+    # LLM retries
+    LLM_MAX_RETRIES: int = 3
+    LLM_RETRY_BASE_DELAY: float = 1.0
+    LLM_RETRY_MAX_DELAY: float = 30.0
+    LLM_REQUEST_DEADLINE: float = 120.0
     
     # Redis
     REDIS_URL: str = "redis://localhost:6379"
     
+    # LLM response cache
+    LLM_CACHE_ENABLED: bool = False
+    LLM_CACHE_TTL: int = 3600
+    LLM_CACHE_MAX_ENTRIES: int = 1000
+    
+    # Hedged LLM requests
+    HEDGING_ENABLED: bool = False
+    HEDGE_PERCENTILE: float = 0.95
+    HEDGE_BUDGET_RATIO: float = 0.1
+    HEDGE_MIN_SAMPLES: int = 20
+    HEDGE_CROSS_PROVIDER: bool = True
+    
+    # Fake LLM provider (load testing)
+    FAKE_LLM_LATENCY_MS: float = 800
+    FAKE_LLM_LATENCY_SIGMA: float = 0.3
+    FAKE_LLM_ERROR_RATE: float = 0.0
+    FAKE_LLM_SEED: int = 0
+    
     # App Settings
     ENVIRONMENT: str = "production"
     LOG_LEVEL: str = "INFO"
     MAX_CONCURRENT_AGENTS: int = 5
+    # Per-agent timeout, and how long to wait for agents before synthesizing
+    # with whatever has finished (0 waits for all)
+    AGENT_TIMEOUT_SECONDS: float = 60.0
+    AGENT_DEADLINE_SECONDS: float = 90.0
+    
+    # Background research jobs (/api/jobs): "memory" or "redis"
+    JOB_BACKEND: str = "memory"
+    JOB_WORKERS: int = 2
+    JOB_MAX_QUEUED: int = 100
+    JOB_RESULT_TTL: int = 86400
+    JOB_LEASE_TTL: int = 30
+    
+    # Whole /api/query results, keyed on normalized query terms, provider and model
+    QUERY_CACHE_ENABLED: bool = False
+    QUERY_CACHE_TTL: int = 3600
+    QUERY_CACHE_MAX_ENTRIES: int = 200
     
     # Model Settings
     DEFAULT_OPENAI_MODEL: str = "gpt-4o-mini"
     DEFAULT_GEMINI_MODEL: str = "gemini-2.5-flash"
     
+    # Web scraper connection pool
+    SCRAPER_POOL_SIZE: int = 100
+    SCRAPER_POOL_PER_HOST: int = 10
+    SCRAPER_DNS_CACHE_TTL: int = 300
+    SCRAPER_KEEPALIVE_TIMEOUT: int = 30
+    SCRAPE_MAX_BYTES: int = 2 * 1024 * 1024
+    SCRAPE_PARSE_WORKERS: int = 2
+    SCRAPE_CONCURRENCY: int = 20
+    SCRAPE_PER_DOMAIN: int = 2
+    SCRAPE_DOMAIN_DELAY: float = 0.5
+    ROBOTS_CACHE_TTL: int = 3600
+    # Domains whose robots.txt and scrape limits are remembered
+    SCRAPE_MAX_DOMAINS: int = 1000
+    
+    # Source search result cache (seconds)
+    CACHE_TTL_PUBMED: int = 86400
+    CACHE_TTL_TRIALS: int = 21600
+    CACHE_TTL_PATENTS: int = 604800
+    SOURCE_CACHE_MAX_ENTRIES: int = 2000
+    
+    # ClinicalTrials.gov v2 API
+    CLINICAL_TRIALS_PAGE_SIZE: int = 100
+    
+    # "api" queries ClinicalTrials.gov; "local" uses the index built with
+    # python -m app.services.trial_index ingest <bulk export>
+    CLINICAL_TRIALS_BACKEND: str = "api"
+    CLINICAL_TRIALS_INDEX_PATH: str = "data/trials.db"
+    CLINICAL_TRIALS_LOCAL_MAX_RESULTS: int = 1000
+    
+    # Per-source circuit breakers and call timeout
+    SOURCE_TIMEOUT_SECONDS: float = 10.0
+    BREAKER_FAILURE_RATE: float = 0.5
+    BREAKER_MIN_REQUESTS: int = 5
+    BREAKER_SLOW_CALL_SECONDS: float = 5.0
+    BREAKER_OPEN_SECONDS: int = 30
+    
     # External APIs (optional)
     CLINICALTRIALS_API_KEY: str = ""
     USPTO_API_KEY: str = ""
     PUBMED_API_KEY: str = ""
     
+    # Sent with every NCBI E-utilities request, as NCBI asks of API clients
+    NCBI_TOOL: str = "pharma-ai"
+    NCBI_EMAIL: str = ""
+    
+    # Window for merging concurrent esummary lookups (0 uses WebEnv per query)
+    PUBMED_BATCH_WINDOW_MS: int = 5
+    PUBMED_BATCH_MAX_IDS: int = 200
+    
+    # "api" queries E-utilities; "local" uses the index built with
+    # python -m app.services.pubmed_index ingest <MEDLINE files>
+    PUBMED_BACKEND: str = "api"
+    PUBMED_INDEX_PATH: str = "data/pubmed.db"
+    
+    # Directory built with python -m app.services.patent_index build; empty uses mock patents
+    PATENT_INDEX_PATH: str = ""
+    
     class Config:
         env_file = ".env"
         case_sensitive = True
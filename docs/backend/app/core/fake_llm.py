@@ -0,0 +1,91 @@
+import asyncio
+import hashlib
+import random
+import re
+from typing import Dict, List, AsyncIterator
+
+FILLER_SENTENCES = [
+    "Evidence from {n} independent studies supports further evaluation.",
+    "Mechanistic data point to modulation of AMPK and mTOR signalling.",
+    "Phase {phase} programmes account for most of the current activity.",
+    "Market growth is driven by rising incidence and payer acceptance.",
+    "Key risks include reimbursement pressure and competitive entry.",
+    "Combination regimens show the strongest signal in early cohorts.",
+    "Patent coverage is concentrated among {n} major assignees.",
+    "Real-world data suggest adherence improves with simplified dosing.",
+]
+
+class FakeLLMError(Exception):
+    """Injected provider failure that looks like a 429 or 503"""
+
+    def __init__(self, status_code: int):
+        self.status_code = status_code
+        super().__init__(f"Fake LLM injected error {status_code}")
+
+class FakeLLMProvider:
+    """Deterministic offline LLM for load tests and benchmarks
+
+    Output depends only on the messages and seed, and follows the headings
+    requested in the prompt so downstream parsing behaves as with a real
+    model. Latency is log-normal around latency_ms, and error_rate of calls
+    fail with a retryable 429/503.
+    """
+
+    def __init__(
+        self,
+        latency_ms: float = 800,
+        latency_sigma: float = 0.3,
+        error_rate: float = 0.0,
+        seed: int = 0
+    ):
+        self.latency_ms = latency_ms
+        self.latency_sigma = latency_sigma
+        self.error_rate = error_rate
+        self.seed = seed
+        self._rng = random.Random(seed)
+
+    def _content_rng(self, messages: List[Dict[str, str]]) -> random.Random:
+        digest = hashlib.md5(repr((self.seed, messages)).encode()).hexdigest()
+        return random.Random(int(digest[:16], 16))
+
+    def render(self, messages: List[Dict[str, str]], max_tokens: int = 2000) -> str:
+        """Render a markdown answer for the messages"""
+        prompt = messages[-1]["content"] if messages else ""
+        rng = self._content_rng(messages)
+
+        title = re.search(r'(?:START|Start)[^"]*"(# [^"]+)"', prompt)
+        lines = [title.group(1) if title else "# Response", ""]
+
+        sections = re.findall(r"^## .+$", prompt, flags=re.MULTILINE) or ["## Summary"]
+        for section in sections:
+            lines.append(section.strip())
+            for _ in range(rng.randint(1, 3)):
+                sentence = rng.choice(FILLER_SENTENCES)
+                lines.append(f"- {sentence.format(n=rng.randint(2, 40), phase=rng.randint(1, 3))}")
+            lines.append("")
+
+        # Respect the completion budget (roughly 4 characters per token)
+        return "\n".join(lines).strip()[:max_tokens * 4]
+
+    def _latency(self) -> float:
+        return self.latency_ms / 1000 * self._rng.lognormvariate(0, self.latency_sigma)
+
+    def _maybe_fail(self):
+        if self.error_rate and self._rng.random() < self.error_rate:
+            raise FakeLLMError(self._rng.choice([429, 503]))
+
+    async def generate(self, messages: List[Dict[str, str]], max_tokens: int = 2000) -> str:
+        """Return the rendered answer after a simulated delay"""
+        await asyncio.sleep(self._latency())
+        self._maybe_fail()
+        return self.render(messages, max_tokens)
+
+    async def stream(self, messages: List[Dict[str, str]], max_tokens: int = 2000) -> AsyncIterator[str]:
+        """Yield the rendered answer in small chunks spread over the delay"""
+        self._maybe_fail()
+        content = self.render(messages, max_tokens)
+        chunks = re.findall(r"\S+\s*", content) or [content]
+        delay = self._latency() / len(chunks)
+        for chunk in chunks:
+            await asyncio.sleep(delay)
+            yield chunk
@@ -0,0 +1,94 @@
+from collections import deque
+from typing import Optional, Dict, Any
+
+class LatencyTracker:
+    """Rolling window of call latencies per key"""
+
+    def __init__(self, window: int = 200):
+        self.window = window
+        self._samples: Dict[str, deque] = {}
+
+    def record(self, key: str, seconds: float):
+        """Record a completed call's latency"""
+        samples = self._samples.get(key)
+        if samples is None:
+            samples = self._samples[key] = deque(maxlen=self.window)
+        samples.append(seconds)
+
+    def count(self, key: str) -> int:
+        """Number of samples recorded for key"""
+        return len(self._samples.get(key, ()))
+
+    def percentile(self, key: str, q: float) -> Optional[float]:
+        """Latency at quantile q (0-1), or None without samples"""
+        samples = self._samples.get(key)
+        if not samples:
+            return None
+        ordered = sorted(samples)
+        index = min(len(ordered) - 1, int(q * len(ordered)))
+        return ordered[index]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get p50/p95 per key"""
+        return {
+            key: {
+                "samples": len(samples),
+                "p50": round(self.percentile(key, 0.5), 3),
+                "p95": round(self.percentile(key, 0.95), 3)
+            }
+            for key, samples in self._samples.items() if samples
+        }
+
+class HedgingPolicy:
+    """Decide when to send a backup request for a slow LLM call
+
+    A backup is issued once the primary has run longer than the learned
+    latency percentile for its model. Hedges are capped at a fraction of all
+    requests so a provider-wide slowdown cannot double our spend.
+    """
+
+    def __init__(
+        self,
+        percentile: float = 0.95,
+        budget_ratio: float = 0.1,
+        min_samples: int = 20,
+        cross_provider: bool = True
+    ):
+        self.percentile = percentile
+        self.budget_ratio = budget_ratio
+        self.min_samples = min_samples
+        self.cross_provider = cross_provider
+        self.latencies = LatencyTracker()
+        self.stats = {
+            "requests": 0,
+            "hedged": 0,
+            "primary_wins": 0,
+            "backup_wins": 0,
+            "budget_exhausted": 0
+        }
+
+    def hedge_delay(self, key: str) -> Optional[float]:
+        """Seconds to wait before hedging, or None while still learning"""
+        self.stats["requests"] += 1
+        if self.latencies.count(key) < self.min_samples:
+            return None
+        return self.latencies.percentile(key, self.percentile)
+
+    def acquire_budget(self) -> bool:
+        """Reserve a hedge if we are within the budget"""
+        if self.stats["hedged"] + 1 > self.stats["requests"] * self.budget_ratio:
+            self.stats["budget_exhausted"] += 1
+            return False
+        self.stats["hedged"] += 1
+        return True
+
+    def record_winner(self, winner: str):
+        """Record whether the primary or the backup finished first"""
+        self.stats[f"{winner}_wins"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hedging statistics"""
+        return {
+            **self.stats,
+            "latency": self.latencies.get_stats()
+        }
@@ -1,41 +1,109 @@
 import openai  # pyright: ignore[reportMissingImports]
 import google.generativeai as genai  # pyright: ignore[reportMissingImports]
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, AsyncIterator, Awaitable, Callable
 import tiktoken
 import asyncio
-from collections import deque
-from datetime import datetime as dt, timedelta
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from .rate_limiter import RateLimiter
+from .hedging import HedgingPolicy
+from .concurrency import AdaptiveConcurrencyLimiter
+from .retry import RetryPolicy, is_overload_error
+from .fake_llm import FakeLLMProvider
+from ..services.cache_manager import CacheManager, TieredCache, make_cache_key
+from ..utils.singleflight import SingleFlight
 
-class RateLimiter:
-    def __init__(self, max_requests: int, time_window: int = 60):
-        self.max_requests = max_requests
-        self.time_window = time_window
-        self.requests = deque()
-    
-    async def acquire(self):
-        now = dt.now()
-        while self.requests and (now - self.requests[0]) > timedelta(seconds=self.time_window):
-            self.requests.popleft()
-        
-        if len(self.requests) >= self.max_requests:
-            sleep_time = (self.requests[0] + timedelta(seconds=self.time_window) - now).total_seconds()
-            if sleep_time > 0:
-                await asyncio.sleep(sleep_time)
-            self.requests.popleft()
-        
-        self.requests.append(now)
+# Set by _call_hedged for its primary call; _timed sets the event once the
+# call has cleared the local limiters and is going out to the provider
+_send_started: ContextVar[Optional[asyncio.Event]] = ContextVar("send_started", default=None)
+
+@lru_cache(maxsize=32)
+def get_gemini_model(model: str, temperature: float, max_tokens: int):
+    """Get a cached Gemini model bound to its generation config"""
+    return genai.GenerativeModel(
+        model,
+        generation_config={
+            "temperature": temperature,
+            "max_output_tokens": max_tokens,
+        }
+    )
 
 class LLMManager:
-    def __init__(self, config):
+    def __init__(self, config, cache_manager: Optional[CacheManager] = None):
         self.config = config
-        self.openai_client = openai.AsyncOpenAI(api_key=config.OPENAI_API_KEY)
+        # Retries are handled by our own policy, not the SDK's
+        self.openai_client = openai.AsyncOpenAI(api_key=config.OPENAI_API_KEY, max_retries=0)
         genai.configure(api_key=config.GOOGLE_API_KEY)
         
-        self.openai_limiter = RateLimiter(config.MAX_REQUESTS_PER_MINUTE)
-        self.gemini_limiter = RateLimiter(config.MAX_REQUESTS_PER_MINUTE)
+        # Shared across uvicorn workers and replicas through Redis
+        limiter_redis_url = config.REDIS_URL if config.RATE_LIMIT_USE_REDIS else None
+        self.openai_limiter = RateLimiter(
+            config.MAX_REQUESTS_PER_MINUTE,
+            redis_url=limiter_redis_url,
+            name="openai:rpm"
+        )
+        self.gemini_limiter = RateLimiter(
+            config.MAX_REQUESTS_PER_MINUTE,
+            redis_url=limiter_redis_url,
+            name="gemini:rpm"
+        )
+        
+        # Token budgets are reserved before each call and settled on usage
+        self.openai_token_limiter = RateLimiter(
+            config.MAX_TOKENS_PER_MINUTE,
+            redis_url=limiter_redis_url,
+            name="openai:tpm"
+        )
+        self.gemini_token_limiter = RateLimiter(
+            config.MAX_TOKENS_PER_MINUTE,
+            redis_url=limiter_redis_url,
+            name="gemini:tpm"
+        )
         
-        self.total_tokens_used = {"openai": 0, "gemini": 0}
-        self.total_cost = {"openai": 0.0, "gemini": 0.0}
+        # Offline provider for load tests and benchmarks
+        self.fake_llm = FakeLLMProvider(
+            latency_ms=config.FAKE_LLM_LATENCY_MS,
+            latency_sigma=config.FAKE_LLM_LATENCY_SIGMA,
+            error_rate=config.FAKE_LLM_ERROR_RATE,
+            seed=config.FAKE_LLM_SEED
+        )
+        
+        self.total_tokens_used = {"openai": 0, "gemini": 0, "fake": 0}
+        self.total_cost = {"openai": 0.0, "gemini": 0.0, "fake": 0.0}
+        
+        self.retry_policy = RetryPolicy(
+            max_retries=config.LLM_MAX_RETRIES,
+            base_delay=config.LLM_RETRY_BASE_DELAY,
+            max_delay=config.LLM_RETRY_MAX_DELAY,
+            deadline=config.LLM_REQUEST_DEADLINE
+        )
+        
+        # Adaptive cap on concurrent provider calls
+        self.concurrency_limiter = AdaptiveConcurrencyLimiter(config.MAX_CONCURRENT_AGENTS)
+        
+        # Optional backup requests for calls slower than their usual tail
+        self.hedging = None
+        if config.HEDGING_ENABLED:
+            self.hedging = HedgingPolicy(
+                percentile=config.HEDGE_PERCENTILE,
+                budget_ratio=config.HEDGE_BUDGET_RATIO,
+                min_samples=config.HEDGE_MIN_SAMPLES,
+                cross_provider=config.HEDGE_CROSS_PROVIDER
+            )
+        
+        # Identical concurrent requests share one provider call
+        self.inflight = SingleFlight()
+        
+        # Opt-in exact-match response cache
+        self.response_cache = None
+        if config.LLM_CACHE_ENABLED:
+            self.response_cache = TieredCache(
+                cache_manager,
+                max_entries=config.LLM_CACHE_MAX_ENTRIES,
+                default_ttl=config.LLM_CACHE_TTL
+            )
         
     def count_tokens(self, text: str, model: str = "gpt-4") -> int:
         """Count tokens in text"""
@@ -45,6 +113,11 @@ class LLMManager:
         except:
             return len(text) // 4
     
+    def estimate_request_tokens(self, messages: list, max_tokens: int, model: str = "gpt-4") -> int:
+        """Estimate the TPM cost of a request (prompt plus completion budget)"""
+        prompt_tokens = sum(self.count_tokens(m["content"], model) for m in messages)
+        return prompt_tokens + max_tokens
+    
     def estimate_cost(self, tokens: int, model: str, is_completion: bool = False) -> float:
         """Estimate API call cost"""
         costs = {
@@ -58,45 +131,128 @@ class LLMManager:
         
         return tokens * costs[model_key][cost_type]
     
+    def _on_retry(self, provider: str, error: Exception, delay: float):
+        """Log a retry and feed overloads back to the concurrency limiter"""
+        if is_overload_error(error):
+            self.concurrency_limiter.record_overload()
+        print(f"{provider} API error ({error}). Retrying in {delay:.1f} seconds...")
+    
+    @asynccontextmanager
+    async def _provider_slot(self, request_limiter: Optional[RateLimiter] = None):
+        """Take a request token, then a concurrency slot held for one attempt"""
+        if request_limiter:
+            await request_limiter.acquire()
+        await self.concurrency_limiter.acquire()
+        try:
+            yield
+        finally:
+            self.concurrency_limiter.release()
+    
+    async def _timed(self, key: str, send: Callable[[], Awaitable[Any]]) -> Any:
+        """Run one provider round-trip, feeding its latency to the limiters"""
+        started = _send_started.get()
+        if started is not None:
+            started.set()
+        start = time.monotonic()
+        response = await send()
+        latency = time.monotonic() - start
+        
+        self.concurrency_limiter.record_success(latency, key)
+        if self.hedging:
+            self.hedging.latencies.record(key, latency)
+        return response
+    
     async def call_openai(
         self,
         messages: list,
         model: str = "gpt-4",
         temperature: float = 0.7,
         max_tokens: int = 2000,
+        max_retries: Optional[int] = None,
         **kwargs
     ) -> Dict[str, Any]:
-        """Call OpenAI API"""
-        await self.openai_limiter.acquire()
+        """Call OpenAI API with retries for rate limits and transient errors"""
+        reserved_tokens = self.estimate_request_tokens(messages, max_tokens, model)
+        await self.openai_token_limiter.acquire(reserved_tokens)
         
-        try:
-            response = await self.openai_client.chat.completions.create(
+        key = self._latency_key("openai", model, {"max_tokens": max_tokens})
+        sent = False
+        
+        def attempt():
+            nonlocal sent
+            sent = True
+            return self._timed(key, lambda: self.openai_client.chat.completions.create(
                 model=model,
                 messages=messages,
                 temperature=temperature,
                 max_tokens=max_tokens,
                 **kwargs
+            ))
+        
+        used_tokens = 0
+        try:
+            # Every attempt counts against the provider's request quota
+            response, retry_stats = await self.retry_policy.run(
+                attempt,
+                max_retries=max_retries,
+                on_retry=lambda e, delay: self._on_retry("OpenAI", e, delay),
+                gate=lambda: self._provider_slot(self.openai_limiter)
             )
-            
-            usage = response.usage
-            self.total_tokens_used["openai"] += usage.total_tokens
-            self.total_cost["openai"] += self.estimate_cost(usage.prompt_tokens, model, False)
-            self.total_cost["openai"] += self.estimate_cost(usage.completion_tokens, model, True)
-            
-            return {
-                "content": response.choices[0].message.content,
-                "usage": {
-                    "prompt_tokens": usage.prompt_tokens,
-                    "completion_tokens": usage.completion_tokens,
-                    "total_tokens": usage.total_tokens
-                },
-                "cost": self.estimate_cost(usage.prompt_tokens, model, False) + 
-                        self.estimate_cost(usage.completion_tokens, model, True),
-                "model": model
-            }
+            used_tokens = response.usage.total_tokens
+        except asyncio.CancelledError:
+            # A cancelled request (a losing hedge, say) that reached the
+            # provider has still spent its prompt tokens
+            if sent:
+                used_tokens = reserved_tokens - max_tokens
+            raise
         except Exception as e:
             print(f"OpenAI API Error: {str(e)}")
             raise
+        finally:
+            await self.openai_token_limiter.settle(reserved_tokens, used_tokens)
+        
+        usage = response.usage
+        self.total_tokens_used["openai"] += usage.total_tokens
+        self.total_cost["openai"] += self.estimate_cost(usage.prompt_tokens, model, False)
+        self.total_cost["openai"] += self.estimate_cost(usage.completion_tokens, model, True)
+        
+        return {
+            "content": response.choices[0].message.content,
+            "usage": {
+                "prompt_tokens": usage.prompt_tokens,
+                "completion_tokens": usage.completion_tokens,
+                "total_tokens": usage.total_tokens
+            },
+            "cost": self.estimate_cost(usage.prompt_tokens, model, False) + 
+                    self.estimate_cost(usage.completion_tokens, model, True),
+            "model": model,
+            "retries": retry_stats
+        }
+    
+    def _gemini_prompt(self, messages: list) -> str:
+        """Flatten chat messages into a single Gemini prompt"""
+        # Shorten prompt for Gemini
+        return "\n".join([f"{m['role']}: {m['content'][:500]}" for m in messages])
+    
+    def _extract_gemini_text(self, response) -> Optional[str]:
+        """Extract text from a Gemini response or stream chunk"""
+        # Handle both simple and complex responses
+        try:
+            # Try simple text access first
+            return response.text
+        except Exception:
+            # Fallback to parts extraction
+            if hasattr(response, 'candidates') and response.candidates:
+                candidate = response.candidates[0]
+                if hasattr(candidate, 'content') and candidate.content:
+                    if hasattr(candidate.content, 'parts'):
+                        parts_text = []
+                        for part in candidate.content.parts:
+                            if hasattr(part, 'text') and part.text:
+                                parts_text.append(part.text)
+                        if parts_text:
+                            return "".join(parts_text)
+        return None
     
     async def call_gemini(
         self,
@@ -104,117 +260,462 @@ class LLMManager:
         model: str = "gemini-2.0-flash-exp",
         temperature: float = 0.7,
         max_tokens: int = 2000,
-        max_retries: int = 3,
+        max_retries: Optional[int] = None,
         **kwargs
     ) -> Dict[str, Any]:
-        """Call Gemini API with retry logic for rate limits"""
-        await self.gemini_limiter.acquire()
+        """Call Gemini API with retries for rate limits and transient errors"""
+        prompt = self._gemini_prompt(messages)
         
-        # Shorten prompt for Gemini
-        prompt = "\n".join([f"{m['role']}: {m['content'][:500]}" for m in messages])
+        reserved_tokens = self.count_tokens(prompt) + max_tokens
+        await self.gemini_token_limiter.acquire(reserved_tokens)
         
-        model_instance = genai.GenerativeModel(model)
-        generation_config = {
-            "temperature": temperature,
-            "max_output_tokens": max_tokens,
+        model_instance = get_gemini_model(model, temperature, max_tokens)
+        key = self._latency_key("gemini", model, {"max_tokens": max_tokens})
+        sent = False
+        
+        def attempt():
+            nonlocal sent
+            sent = True
+            return self._timed(key, lambda: model_instance.generate_content_async(prompt))
+        
+        input_tokens = self.count_tokens(prompt)
+        used_tokens = 0
+        try:
+            response, retry_stats = await self.retry_policy.run(
+                attempt,
+                max_retries=max_retries,
+                on_retry=lambda e, delay: self._on_retry("Gemini", e, delay),
+                gate=lambda: self._provider_slot(self.gemini_limiter)
+            )
+            
+            text_content = self._extract_gemini_text(response)
+            
+            if not text_content:
+                raise ValueError("No text content found in Gemini response")
+            used_tokens = input_tokens + self.count_tokens(text_content)
+        except asyncio.CancelledError:
+            if sent:
+                used_tokens = input_tokens
+            raise
+        except Exception as e:
+            print(f"Gemini API Error: {str(e)}")
+            raise
+        finally:
+            await self.gemini_token_limiter.settle(reserved_tokens, used_tokens)
+        
+        output_tokens = self.count_tokens(text_content)
+        total_tokens = input_tokens + output_tokens
+        
+        self.total_tokens_used["gemini"] += total_tokens
+        self.total_cost["gemini"] += self.estimate_cost(input_tokens, "gemini-pro", False)
+        self.total_cost["gemini"] += self.estimate_cost(output_tokens, "gemini-pro", True)
+        
+        return {
+            "content": text_content,
+            "usage": {
+                "prompt_tokens": input_tokens,
+                "completion_tokens": output_tokens,
+                "total_tokens": total_tokens
+            },
+            "cost": self.estimate_cost(input_tokens, "gemini-pro", False) + 
+                    self.estimate_cost(output_tokens, "gemini-pro", True),
+            "model": model,
+            "retries": retry_stats
         }
+    
+    async def call_fake(
+        self,
+        messages: list,
+        model: str = "fake-model",
+        temperature: float = 0.7,
+        max_tokens: int = 2000,
+        max_retries: Optional[int] = None,
+        **kwargs
+    ) -> Dict[str, Any]:
+        """Call the deterministic fake provider (no network, no cost)"""
+        key = self._latency_key("fake", model, {"max_tokens": max_tokens})
+        content, retry_stats = await self.retry_policy.run(
+            lambda: self._timed(key, lambda: self.fake_llm.generate(messages, max_tokens)),
+            max_retries=max_retries,
+            on_retry=lambda e, delay: self._on_retry("Fake", e, delay),
+            gate=self._provider_slot
+        )
+        return self._fake_result(messages, content, model, retries=retry_stats)
+    
+    def _fake_result(self, messages: list, content: str, model: str, **extra) -> Dict[str, Any]:
+        """Build a fake provider response and record its token usage"""
+        prompt_tokens = sum(self.count_tokens(m["content"]) for m in messages)
+        completion_tokens = self.count_tokens(content)
+        self.total_tokens_used["fake"] += prompt_tokens + completion_tokens
         
-        # Retry logic with exponential backoff
-        last_exception = None
-        for attempt in range(max_retries):
-            try:
-                response = await asyncio.to_thread(
-                    model_instance.generate_content,
-                    prompt,
-                    generation_config=generation_config
-                )
-                
-                # Extract text from response - handle both simple and complex responses
-                text_content = None
-                try:
-                    # Try simple text access first
-                    text_content = response.text
-                except Exception:
-                    # Fallback to parts extraction
-                    if hasattr(response, 'candidates') and response.candidates:
-                        candidate = response.candidates[0]
-                        if hasattr(candidate, 'content') and candidate.content:
-                            if hasattr(candidate.content, 'parts'):
-                                parts_text = []
-                                for part in candidate.content.parts:
-                                    if hasattr(part, 'text') and part.text:
-                                        parts_text.append(part.text)
-                                if parts_text:
-                                    text_content = "".join(parts_text)
-                
-                if not text_content:
-                    raise ValueError("No text content found in Gemini response")
-                
-                input_tokens = self.count_tokens(prompt)
-                output_tokens = self.count_tokens(text_content)
-                total_tokens = input_tokens + output_tokens
-                
-                self.total_tokens_used["gemini"] += total_tokens
-                self.total_cost["gemini"] += self.estimate_cost(input_tokens, "gemini-pro", False)
-                self.total_cost["gemini"] += self.estimate_cost(output_tokens, "gemini-pro", True)
-                
-                return {
-                    "content": text_content,
-                    "usage": {
-                        "prompt_tokens": input_tokens,
-                        "completion_tokens": output_tokens,
-                        "total_tokens": total_tokens
-                    },
-                    "cost": self.estimate_cost(input_tokens, "gemini-pro", False) + 
-                            self.estimate_cost(output_tokens, "gemini-pro", True),
-                    "model": model
-                }
-                
-            except Exception as e:
-                error_str = str(e)
-                last_exception = e
-                
-                # Check if it's a 429 rate limit error
-                if "429" in error_str or "Resource exhausted" in error_str:
-                    if attempt < max_retries - 1:
-                        # Exponential backoff: 2^attempt seconds
-                        wait_time = 2 ** attempt
-                        print(f"Gemini API rate limited (429). Retrying in {wait_time} seconds... (attempt {attempt + 1}/{max_retries})")
-                        await asyncio.sleep(wait_time)
-                        continue
-                    else:
-                        error_msg = f"Gemini API rate limit exceeded after {max_retries} attempts. Please try again later."
-                        print(f"Gemini API Error: {error_msg}")
-                        raise Exception(error_msg)
-                else:
-                    # For other errors, don't retry
-                    print(f"Gemini API Error: {error_str}")
-                    raise
-        
-        # If we get here, all retries failed
-        raise last_exception
+        return {
+            "content": content,
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens
+            },
+            "cost": 0.0,
+            "model": model,
+            **extra
+        }
+    
+    def _default_model(self, provider: str, model: Optional[str]) -> str:
+        """Resolve the model used for a provider"""
+        if provider == "openai":
+            return model or "gpt-4"
+        elif provider == "gemini":
+            return model or "gemini-2.0-flash-exp"
+        elif provider == "fake":
+            return model or "fake-model"
+        raise ValueError(f"Unknown provider: {provider}")
+    
+    def _response_cache_key(self, messages: list, provider: str, model: str, kwargs: Dict[str, Any]) -> str:
+        """Build a normalized cache key for a generation request"""
+        return make_cache_key("llm", {
+            "provider": provider,
+            "model": model,
+            "messages": [
+                {"role": m["role"], "content": " ".join(m["content"].split())}
+                for m in messages
+            ],
+            "temperature": round(float(kwargs.get("temperature", 0.7)), 2),
+            "max_tokens": kwargs.get("max_tokens", 2000),
+            "options": {k: v for k, v in kwargs.items() if k not in ("temperature", "max_tokens")}
+        })
+    
+    async def _call_provider(self, messages: list, provider: str, model: str, **kwargs) -> Dict[str, Any]:
+        """Dispatch a generation request, hedging it when enabled"""
+        if self.hedging:
+            return await self._call_hedged(messages, provider, model, **kwargs)
+        return await self._call_once(messages, provider, model, **kwargs)
+    
+    async def _call_once(self, messages: list, provider: str, model: str, **kwargs) -> Dict[str, Any]:
+        """Send a single request to a provider"""
+        if provider == "openai":
+            call = self.call_openai
+        elif provider == "gemini":
+            call = self.call_gemini
+        elif provider == "fake":
+            call = self.call_fake
+        else:
+            raise ValueError(f"Unknown provider: {provider}")
+        
+        # Slots and latency are tracked per attempt inside the call
+        try:
+            return await call(messages, model, **kwargs)
+        except Exception as e:
+            if is_overload_error(e):
+                self.concurrency_limiter.record_overload()
+            raise
+    
+    def _latency_key(self, provider: str, model: str, kwargs: Dict[str, Any]) -> str:
+        # Completion budget dominates latency, so track it alongside the model
+        return f"{provider}:{model}:{kwargs.get('max_tokens', 2000)}"
+    
+    def _backup_target(self, provider: str, model: str):
+        """Provider and model to use for a hedged request"""
+        if not self.hedging.cross_provider or provider == "fake":
+            return provider, model
+        backup_provider = "gemini" if provider == "openai" else "openai"
+        return backup_provider, self._default_model(backup_provider, None)
+    
+    async def _call_hedged(self, messages: list, provider: str, model: str, **kwargs) -> Dict[str, Any]:
+        """Race the primary call against a backup once it runs past its tail latency
+        
+        The hedge delay starts once the primary has cleared the local rate and
+        concurrency limiters, so queueing here never launches extra requests.
+        """
+        delay = self.hedging.hedge_delay(self._latency_key(provider, model, kwargs))
+        started = asyncio.Event()
+        token = _send_started.set(started)
+        try:
+            primary = asyncio.ensure_future(self._call_once(messages, provider, model, **kwargs))
+        finally:
+            _send_started.reset(token)
+        if delay is None:
+            return await primary
+        
+        backup = None
+        waiting = asyncio.ensure_future(started.wait())
+        try:
+            await asyncio.wait({primary, waiting}, return_when=asyncio.FIRST_COMPLETED)
+            if primary.done():
+                return await primary
+            done, _ = await asyncio.wait({primary}, timeout=delay)
+            if done or not self.hedging.acquire_budget():
+                return await primary
+            
+            backup_provider, backup_model = self._backup_target(provider, model)
+            backup = asyncio.ensure_future(
+                self._call_once(messages, backup_provider, backup_model, **kwargs)
+            )
+            sides = {primary: ("primary", provider), backup: ("backup", backup_provider)}
+            pending = set(sides)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        winner, winner_provider = sides[task]
+                        self.hedging.record_winner(winner)
+                        return {
+                            **task.result(),
+                            "hedged": True,
+                            "hedge_winner": winner,
+                            "hedge_provider": winner_provider
+                        }
+            # Both sides failed; surface the primary's error
+            return primary.result()
+        finally:
+            for task in (primary, backup, waiting):
+                if task is not None and not task.done():
+                    task.cancel()
     
     async def generate(
         self,
         messages: list,
         provider: str = "openai",
         model: Optional[str] = None,
+        cache_ttl: Optional[int] = None,
+        bypass_cache: bool = False,
         **kwargs
     ) -> Dict[str, Any]:
         """Unified generation interface"""
+        model = self._default_model(provider, model)
+        cache_key = self._response_cache_key(messages, provider, model, kwargs)
+        
+        if bypass_cache:
+            # Always a fresh call of its own: never joins a flight that may
+            # be serving cached-path callers, and leaves the cache alone
+            return await self._call_provider(messages, provider, model, **kwargs)
+        
+        if self.response_cache:
+            cached = await self.response_cache.get(cache_key)
+            if cached is not None:
+                return {**cached, "cached": True}
+        
+        async def call():
+            response = await self._call_provider(messages, provider, model, **kwargs)
+            if self.response_cache:
+                # A cross-provider hedge may have answered from the other
+                # provider; file that answer under its own provider's key
+                key = cache_key
+                if response.get("hedge_provider", provider) != provider:
+                    key = self._response_cache_key(messages, response["hedge_provider"], response["model"], kwargs)
+                await self.response_cache.set(key, response, ttl=cache_ttl)
+            return response
+        
+        return await self.inflight.do(cache_key, call)
+    
+    async def generate_stream(
+        self,
+        messages: list,
+        provider: str = "openai",
+        model: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 2000,
+        cache_ttl: Optional[int] = None,
+        bypass_cache: bool = False,
+        **kwargs
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Streaming generation interface
+        
+        Yields {"type": "delta", "content": ...} chunks as they arrive, then a
+        final {"type": "done", ...} chunk carrying usage and cost.
+        """
+        model = self._default_model(provider, model)
+        
+        cache_key = None
+        if self.response_cache and not bypass_cache:
+            cache_key = self._response_cache_key(
+                messages, provider, model,
+                {"temperature": temperature, "max_tokens": max_tokens, **kwargs}
+            )
+        
+        if cache_key:
+            cached = await self.response_cache.get(cache_key)
+            if cached is not None:
+                yield {"type": "delta", "content": cached["content"]}
+                yield {"type": "done", **cached, "cached": True}
+                return
+        
         if provider == "openai":
-            model = model or "gpt-4"
-            return await self.call_openai(messages, model, **kwargs)
+            stream = self._stream_openai(messages, model, temperature, max_tokens, **kwargs)
         elif provider == "gemini":
-            model = model or "gemini-2.0-flash-exp"
-            return await self.call_gemini(messages, model, **kwargs)
+            stream = self._stream_gemini(messages, model, temperature, max_tokens, **kwargs)
         else:
-            raise ValueError(f"Unknown provider: {provider}")
+            stream = self._stream_fake(messages, model, temperature, max_tokens, **kwargs)
+        
+        async for chunk in stream:
+            if chunk["type"] == "done" and cache_key:
+                result = {k: v for k, v in chunk.items() if k != "type"}
+                await self.response_cache.set(cache_key, result, ttl=cache_ttl)
+            yield chunk
+    
+    async def _stream_openai(
+        self,
+        messages: list,
+        model: str,
+        temperature: float,
+        max_tokens: int,
+        **kwargs
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Stream an OpenAI chat completion"""
+        reserved_tokens = self.estimate_request_tokens(messages, max_tokens, model)
+        await self.openai_limiter.acquire()
+        await self.openai_token_limiter.acquire(reserved_tokens)
+        
+        parts = []
+        usage = None
+        try:
+            # Ask for usage on the final chunk; sent as extra_body since the
+            # pinned SDK predates the stream_options parameter
+            extra_body = {**kwargs.pop("extra_body", {}), "stream_options": {"include_usage": True}}
+            stream = await self.openai_client.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                stream=True,
+                extra_body=extra_body,
+                **kwargs
+            )
+            async for chunk in stream:
+                if getattr(chunk, "usage", None):
+                    usage = chunk.usage
+                if chunk.choices and chunk.choices[0].delta.content:
+                    delta = chunk.choices[0].delta.content
+                    parts.append(delta)
+                    yield {"type": "delta", "content": delta}
+        except BaseException as e:
+            # The prompt and whatever was streamed are spent even if the
+            # client disconnected or the stream broke
+            used = reserved_tokens - max_tokens + self.count_tokens("".join(parts), model)
+            await self.openai_token_limiter.settle(reserved_tokens, used)
+            if isinstance(e, Exception):
+                print(f"OpenAI API Error: {str(e)}")
+            raise
+        
+        content = "".join(parts)
+        if usage:
+            prompt_tokens, completion_tokens = usage.prompt_tokens, usage.completion_tokens
+        else:
+            prompt_tokens = reserved_tokens - max_tokens
+            completion_tokens = self.count_tokens(content, model)
+        total_tokens = prompt_tokens + completion_tokens
+        await self.openai_token_limiter.settle(reserved_tokens, total_tokens)
+        
+        cost = self.estimate_cost(prompt_tokens, model, False) + \
+            self.estimate_cost(completion_tokens, model, True)
+        self.total_tokens_used["openai"] += total_tokens
+        self.total_cost["openai"] += cost
+        
+        yield {
+            "type": "done",
+            "content": content,
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": total_tokens
+            },
+            "cost": cost,
+            "model": model
+        }
+    
+    async def _stream_gemini(
+        self,
+        messages: list,
+        model: str,
+        temperature: float,
+        max_tokens: int,
+        **kwargs
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Stream a Gemini completion"""
+        prompt = self._gemini_prompt(messages)
+        
+        reserved_tokens = self.count_tokens(prompt) + max_tokens
+        await self.gemini_limiter.acquire()
+        await self.gemini_token_limiter.acquire(reserved_tokens)
+        
+        model_instance = get_gemini_model(model, temperature, max_tokens)
+        
+        parts = []
+        try:
+            response = await model_instance.generate_content_async(prompt, stream=True)
+            async for chunk in response:
+                delta = self._extract_gemini_text(chunk)
+                if delta:
+                    parts.append(delta)
+                    yield {"type": "delta", "content": delta}
+        except BaseException as e:
+            # The prompt and whatever was streamed are spent even if the
+            # client disconnected or the stream broke
+            used = reserved_tokens - max_tokens + self.count_tokens("".join(parts))
+            await self.gemini_token_limiter.settle(reserved_tokens, used)
+            if isinstance(e, Exception):
+                print(f"Gemini API Error: {str(e)}")
+            raise
+        
+        content = "".join(parts)
+        input_tokens = self.count_tokens(prompt)
+        output_tokens = self.count_tokens(content)
+        total_tokens = input_tokens + output_tokens
+        await self.gemini_token_limiter.settle(reserved_tokens, total_tokens)
+        
+        cost = self.estimate_cost(input_tokens, "gemini-pro", False) + \
+            self.estimate_cost(output_tokens, "gemini-pro", True)
+        self.total_tokens_used["gemini"] += total_tokens
+        self.total_cost["gemini"] += cost
+        
+        yield {
+            "type": "done",
+            "content": content,
+            "usage": {
+                "prompt_tokens": input_tokens,
+                "completion_tokens": output_tokens,
+                "total_tokens": total_tokens
+            },
+            "cost": cost,
+            "model": model
+        }
+    
+    async def _stream_fake(
+        self,
+        messages: list,
+        model: str,
+        temperature: float,
+        max_tokens: int,
+        **kwargs
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Stream from the fake provider"""
+        parts = []
+        async for delta in self.fake_llm.stream(messages, max_tokens):
+            parts.append(delta)
+            yield {"type": "delta", "content": delta}
+        
+        yield {"type": "done", **self._fake_result(messages, "".join(parts), model)}
     
     def get_usage_stats(self) -> Dict[str, Any]:
         """Get usage statistics"""
         return {
             "tokens_used": self.total_tokens_used,
             "total_cost": self.total_cost,
-            "total_cost_usd": sum(self.total_cost.values())
+            "total_cost_usd": sum(self.total_cost.values()),
+            "rate_limits": {
+                "openai": {
+                    "requests": self.openai_limiter.get_stats(),
+                    "tokens": self.openai_token_limiter.get_stats()
+                },
+                "gemini": {
+                    "requests": self.gemini_limiter.get_stats(),
+                    "tokens": self.gemini_token_limiter.get_stats()
+                }
+            },
+            "retries": self.retry_policy.get_stats(),
+            "concurrency": self.concurrency_limiter.get_stats(),
+            "inflight": self.inflight.get_stats(),
+            "hedging": self.hedging.get_stats() if self.hedging else {"enabled": False},
+            "response_cache": (
+                self.response_cache.get_stats() if self.response_cache else {"enabled": False}
+            )
         }
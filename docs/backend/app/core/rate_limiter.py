@@ -0,0 +1,151 @@
+import redis.asyncio as redis  # pyright: ignore[reportMissingImports]
+import asyncio
+import time
+import logging
+from typing import Optional, Dict, Any
+
+logger = logging.getLogger("pharma_ai")
+
+# Atomic token bucket. Callers reserve tokens up front and get the balance
+# back; a negative balance is the queue of waiters ahead, so they are served
+# in the order their reservation reached Redis. A negative amount refunds.
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local requested = tonumber(ARGV[3])
+local ttl = tonumber(ARGV[4])
+
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1])
+local ts = tonumber(state[2])
+if tokens == nil then
+    tokens = capacity
+    ts = now
+end
+
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+tokens = math.min(capacity, tokens - requested)
+
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], ttl)
+
+return tostring(tokens)
+"""
+
+class RateLimiter:
+    """Token bucket rate limiter shared across workers through Redis
+
+    Redis is reached through the asyncio client, so reservations never block
+    the event loop. Stats report the last balance seen, refilled locally,
+    rather than making a round-trip of their own.
+    """
+
+    def __init__(
+        self,
+        max_requests: int,
+        time_window: int = 60,
+        redis_url: Optional[str] = None,
+        name: str = "default",
+        redis_retry_interval: int = 30
+    ):
+        self.max_requests = max_requests
+        self.time_window = time_window
+        self.rate = max_requests / time_window
+        self.name = name
+        self.key = f"ratelimit:{name}"
+        self.redis_retry_interval = redis_retry_interval
+
+        # In-process bucket used when Redis is unavailable
+        self._tokens = float(max_requests)
+        self._updated = time.monotonic()
+
+        # Last balance returned by any reservation, for stats
+        self._balance = float(max_requests)
+        self._balance_at = self._updated
+
+        self.waiting = 0
+        self._script = None
+        self._redis_retry_at = 0.0
+
+        if redis_url:
+            try:
+                client = redis.from_url(redis_url, socket_timeout=0.5, socket_connect_timeout=0.5)
+                self._script = client.register_script(TOKEN_BUCKET_SCRIPT)
+            except Exception as e:
+                logger.warning(f"Rate limiter '{name}' using in-process bucket: {e}")
+
+    @property
+    def distributed(self) -> bool:
+        """Whether the shared Redis bucket is currently in use"""
+        return self._script is not None and time.monotonic() >= self._redis_retry_at
+
+    def _reserve_local(self, amount: float) -> float:
+        now = time.monotonic()
+        self._tokens = min(self.max_requests, self._tokens + (now - self._updated) * self.rate)
+        self._tokens = min(self.max_requests, self._tokens - amount)
+        self._updated = now
+        return self._tokens
+
+    async def _reserve_redis(self, amount: float) -> float:
+        ttl = max(1, int(self.time_window * 2))
+        balance = await self._script(
+            keys=[self.key],
+            args=[self.max_requests, self.rate, amount, ttl]
+        )
+        return float(balance)
+
+    async def _reserve(self, amount: float) -> float:
+        """Reserve tokens and return the bucket balance afterwards"""
+        balance = None
+        if self.distributed:
+            try:
+                balance = await self._reserve_redis(amount)
+            except Exception as e:
+                logger.warning(f"Rate limiter '{self.name}' falling back to in-process bucket: {e}")
+                self._redis_retry_at = time.monotonic() + self.redis_retry_interval
+        if balance is None:
+            balance = self._reserve_local(amount)
+
+        self._balance = balance
+        self._balance_at = time.monotonic()
+        return balance
+
+    async def acquire(self, amount: float = 1) -> float:
+        """Wait until `amount` tokens are available; returns the time waited"""
+        balance = await self._reserve(amount)
+        wait = -balance / self.rate if balance < 0 else 0.0
+        if wait > 0:
+            self.waiting += 1
+            try:
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                # Give the slot back so later waiters are not delayed for nothing
+                await self._reserve(-amount)
+                raise
+            finally:
+                self.waiting -= 1
+        return wait
+
+    async def settle(self, reserved: float, used: float):
+        """Reconcile an earlier reservation against the amount actually used"""
+        if used != reserved:
+            await self._reserve(used - reserved)
+
+    def get_wait_time(self) -> float:
+        """Seconds a new single-token request would wait, from the last balance seen"""
+        elapsed = time.monotonic() - self._balance_at
+        balance = min(self.max_requests, self._balance + elapsed * self.rate)
+        return max(0.0, (1 - balance) / self.rate)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get limiter statistics"""
+        return {
+            "limit": self.max_requests,
+            "window_seconds": self.time_window,
+            "waiting": self.waiting,
+            "wait_time_seconds": round(self.get_wait_time(), 3),
+            "distributed": self.distributed
+        }
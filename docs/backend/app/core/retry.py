@@ -0,0 +1,140 @@
+import asyncio
+import random
+import time
+from email.utils import parsedate_to_datetime
+from datetime import datetime as dt, timezone
+from typing import Any, AsyncContextManager, Awaitable, Callable, Dict, Optional, Tuple
+
+def is_overload_error(error: Exception) -> bool:
+    """Whether an error means the provider is rate limiting or overloaded"""
+    status = getattr(error, "status_code", None) or getattr(error, "code", None)
+    if isinstance(status, int) and (status == 429 or status >= 500):
+        return True
+    error_str = str(error)
+    return "429" in error_str or "Resource exhausted" in error_str
+
+def is_retryable_error(error: Exception) -> bool:
+    """Whether a failed call is worth retrying"""
+    if isinstance(error, (asyncio.TimeoutError, ConnectionError)):
+        return True
+    # openai.APIConnectionError / APITimeoutError and their subclasses
+    if type(error).__name__ in ("APIConnectionError", "APITimeoutError"):
+        return True
+    return is_overload_error(error)
+
+def get_retry_after(error: Exception) -> Optional[float]:
+    """Seconds the provider asked us to wait, from Retry-After headers"""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return float(retry_after_ms) / 1000
+        except ValueError:
+            pass
+
+    retry_after = headers.get("retry-after")
+    if not retry_after:
+        return None
+    try:
+        return float(retry_after)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(retry_after)
+        return max(0.0, (retry_at - dt.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+class RetryPolicy:
+    """Full-jitter exponential backoff bounded by a per-request deadline"""
+
+    def __init__(
+        self,
+        max_retries: int = 3,
+        base_delay: float = 1.0,
+        max_delay: float = 30.0,
+        deadline: Optional[float] = 120.0
+    ):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self.totals = {"calls": 0, "retries": 0, "sleep_seconds": 0.0, "exhausted": 0}
+
+    def backoff(self, attempt: int, error: Exception) -> float:
+        """Delay before retry number `attempt` (0-based)"""
+        retry_after = get_retry_after(error)
+        if retry_after is not None:
+            # Honor the server, adding a little jitter to spread replicas out
+            return retry_after + random.uniform(0, self.base_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    async def run(
+        self,
+        fn: Callable[[], Awaitable[Any]],
+        max_retries: Optional[int] = None,
+        on_retry: Optional[Callable[[Exception, float], None]] = None,
+        gate: Optional[Callable[[], AsyncContextManager]] = None
+    ) -> Tuple[Any, Dict[str, Any]]:
+        """Call fn() until it succeeds; returns (result, retry stats)
+
+        Each attempt runs inside gate() when given. Time spent entering the
+        gate (queueing on our own rate or concurrency limits) does not count
+        against the deadline, which only bounds provider time and backoff.
+        """
+        max_retries = self.max_retries if max_retries is None else max_retries
+        started = time.monotonic()
+        queued = 0.0
+        stats = {"attempts": 0, "retries": 0, "sleep_seconds": 0.0}
+        self.totals["calls"] += 1
+
+        async def attempt(remaining: Optional[float]):
+            if remaining is not None:
+                return await asyncio.wait_for(fn(), timeout=max(remaining, 0.001))
+            return await fn()
+
+        while True:
+            stats["attempts"] += 1
+            try:
+                if gate is None:
+                    remaining = None
+                    if self.deadline is not None:
+                        remaining = self.deadline - (time.monotonic() - started)
+                    result = await attempt(remaining)
+                else:
+                    entering = time.monotonic()
+                    async with gate():
+                        queued += time.monotonic() - entering
+                        remaining = None
+                        if self.deadline is not None:
+                            remaining = self.deadline - (time.monotonic() - started - queued)
+                        result = await attempt(remaining)
+                return result, stats
+            except Exception as e:
+                if stats["retries"] >= max_retries or not is_retryable_error(e):
+                    if stats["retries"]:
+                        self.totals["exhausted"] += 1
+                    raise
+
+                delay = self.backoff(stats["retries"], e)
+                if self.deadline is not None:
+                    remaining = self.deadline - (time.monotonic() - started - queued)
+                    if delay >= remaining:
+                        self.totals["exhausted"] += 1
+                        raise
+
+                if on_retry:
+                    on_retry(e, delay)
+                stats["retries"] += 1
+                stats["sleep_seconds"] = round(stats["sleep_seconds"] + delay, 3)
+                self.totals["retries"] += 1
+                self.totals["sleep_seconds"] = round(self.totals["sleep_seconds"] + delay, 3)
+                await asyncio.sleep(delay)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get aggregate retry statistics"""
+        return dict(self.totals)
@@ -1,18 +1,31 @@
 from fastapi import FastAPI, HTTPException, UploadFile, File
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse
 from pydantic import BaseModel
 from typing import Optional, List
+from contextlib import asynccontextmanager
 import os
 from datetime import datetime
 
 from .core.config import get_settings
 from .core.llm_manager import LLMManager
 from .services.web_scraper import WebScraper
+from .services.cache_manager import CacheManager
+from .services.job_queue import create_job_queue, job_summary, QueueFullError
 from .agents.master_agent import MasterAgent
+from .utils.helpers import format_sse
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open shared resources on startup and release them on shutdown"""
+    await web_scraper.start()
+    job_queue.start()
+    yield
+    await job_queue.close()
+    await web_scraper.close()
 
 # Initialize
-app = FastAPI(title="Pharma Agentic AI", version="1.0.0")
+app = FastAPI(title="Pharma Agentic AI", version="1.0.0", lifespan=lifespan)
 settings = get_settings()
 
 # CORS
@@ -25,15 +38,19 @@ app.add_middleware(
 )
 
 # Global instances
-llm_manager = LLMManager(settings)
-web_scraper = WebScraper()
-master_agent = MasterAgent(llm_manager, web_scraper)
+cache_manager = CacheManager(settings.REDIS_URL)
+llm_manager = LLMManager(settings, cache_manager=cache_manager)
+web_scraper = WebScraper(settings, cache_manager=cache_manager)
+master_agent = MasterAgent(llm_manager, web_scraper, cache_manager=cache_manager)
+job_queue = create_job_queue(settings, master_agent.execute_stream)
 
 # Request Models
 class QueryRequest(BaseModel):
     query: str
-    provider: str = "openai"  # or "gemini"
+    provider: str = "openai"  # or "gemini", "fake"
     model: Optional[str] = None
+    bypass_cache: bool = False
+    force_refresh: bool = False
 
 class ChatMessage(BaseModel):
     role: str
@@ -43,6 +60,7 @@ class ChatRequest(BaseModel):
     messages: List[ChatMessage]
     provider: str = "openai"
     model: Optional[str] = None
+    bypass_cache: bool = False
 
 # Routes
 @app.get("/")
@@ -55,10 +73,13 @@ async def root():
 
 @app.get("/health")
 async def health_check():
+    breakers = web_scraper.get_breaker_stats()
     return {
-        "status": "healthy",
+        "status": "degraded" if any(b["state"] != "closed" for b in breakers.values()) else "healthy",
         "timestamp": datetime.now().isoformat(),
-        "usage_stats": llm_manager.get_usage_stats()
+        "usage_stats": llm_manager.get_usage_stats(),
+        "connection_pool": web_scraper.get_pool_stats(),
+        "circuit_breakers": breakers
     }
 
 @app.post("/api/query")
@@ -67,7 +88,9 @@ async def process_query(request: QueryRequest):
     try:
         context = {
             "provider": request.provider,
-            "model": request.model
+            "model": request.model,
+            "bypass_cache": request.bypass_cache,
+            "force_refresh": request.force_refresh
         }
         
         result = await master_agent.execute(request.query, context)
@@ -80,6 +103,81 @@ async def process_query(request: QueryRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/query/stream")
+async def process_query_stream(request: QueryRequest):
+    """Process a research query, streaming progress as Server-Sent Events"""
+    context = {
+        "provider": request.provider,
+        "model": request.model,
+        "bypass_cache": request.bypass_cache,
+        "force_refresh": request.force_refresh
+    }
+    
+    async def event_stream():
+        try:
+            async for event in master_agent.execute_stream(request.query, context):
+                yield format_sse(event["data"], event=event["event"])
+            yield format_sse(llm_manager.get_usage_stats(), event="usage_stats")
+        except Exception as e:
+            yield format_sse({"detail": str(e)}, event="error")
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+@app.delete("/api/query/cache")
+async def invalidate_query_cache(query: Optional[str] = None):
+    """Drop cached query results for one query, or all of them"""
+    cleared = await master_agent.invalidate_cache(query)
+    return {
+        "success": True,
+        "cleared": cleared
+    }
+
+@app.post("/api/jobs", status_code=202)
+async def submit_job(request: QueryRequest):
+    """Queue a research query to run in the background"""
+    context = {
+        "provider": request.provider,
+        "model": request.model,
+        "bypass_cache": request.bypass_cache,
+        "force_refresh": request.force_refresh
+    }
+    try:
+        job = await job_queue.submit(request.query, context)
+    except QueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    
+    return job_summary(job)
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Get a background job's status and progress"""
+    job = await job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_summary(job)
+
+@app.get("/api/jobs/{job_id}/result")
+async def get_job_result(job_id: str):
+    """Get a completed job's result, in the /api/query format"""
+    job = await job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job["status"] != "completed":
+        raise HTTPException(status_code=409, detail=f"Job is {job['status']}")
+    
+    return {
+        "success": True,
+        "data": job["result"]
+    }
+
+@app.delete("/api/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    """Cancel a queued or running job"""
+    job = await job_queue.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_summary(job)
+
 @app.post("/api/chat")
 async def chat(request: ChatRequest):
     """Interactive chat interface"""
@@ -89,7 +187,8 @@ async def chat(request: ChatRequest):
         response = await llm_manager.generate(
             messages=messages,
             provider=request.provider,
-            model=request.model
+            model=request.model,
+            bypass_cache=request.bypass_cache
         )
         
         return {
@@ -101,6 +200,31 @@ async def chat(request: ChatRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """Interactive chat, streaming the response as Server-Sent Events"""
+    messages = [{"role": m.role, "content": m.content} for m in request.messages]
+    
+    async def event_stream():
+        try:
+            async for chunk in llm_manager.generate_stream(
+                messages=messages,
+                provider=request.provider,
+                model=request.model,
+                bypass_cache=request.bypass_cache
+            ):
+                if chunk["type"] == "delta":
+                    yield format_sse({"content": chunk["content"]}, event="delta")
+                else:
+                    yield format_sse({
+                        "usage": chunk["usage"],
+                        "cost": chunk["cost"]
+                    }, event="done")
+        except Exception as e:
+            yield format_sse({"detail": str(e)}, event="error")
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
 @app.get("/api/reports/{filename}")
 async def download_report(filename: str):
     """Download generated report"""
@@ -14,13 +14,15 @@ class ChatMessage(BaseModel):
 
 class QueryRequest(BaseModel):
     query: str = Field(..., min_length=10, max_length=2000, description="Research query")
-    provider: str = Field(default="openai", description="LLM provider: openai or gemini")
+    provider: str = Field(default="openai", description="LLM provider: openai, gemini or fake")
     model: Optional[str] = Field(None, description="Specific model to use")
+    bypass_cache: bool = Field(default=False, description="Skip the LLM response cache")
+    force_refresh: bool = Field(default=False, description="Refetch PubMed, trial and patent results")
     
     @validator('provider')
     def validate_provider(cls, v):
-        if v not in ['openai', 'gemini']:
-            raise ValueError('Provider must be openai or gemini')
+        if v not in ['openai', 'gemini', 'fake']:
+            raise ValueError('Provider must be openai, gemini or fake')
         return v
 
 class ChatRequest(BaseModel):
@@ -29,6 +31,7 @@ class ChatRequest(BaseModel):
     model: Optional[str] = None
     temperature: float = Field(default=0.7, ge=0.0, le=2.0)
     max_tokens: int = Field(default=2000, ge=100, le=4000)
+    bypass_cache: bool = False
 
 class AgentResult(BaseModel):
     agent: str
@@ -40,6 +43,12 @@ class UsageStats(BaseModel):
     tokens_used: Dict[str, int]
     total_cost: Dict[str, float]
     total_cost_usd: float
+    rate_limits: Optional[Dict[str, Any]] = None
+    response_cache: Optional[Dict[str, Any]] = None
+    retries: Optional[Dict[str, Any]] = None
+    concurrency: Optional[Dict[str, Any]] = None
+    inflight: Optional[Dict[str, Any]] = None
+    hedging: Optional[Dict[str, Any]] = None
 
 class QueryResponse(BaseModel):
     success: bool
@@ -49,13 +58,32 @@ class QueryResponse(BaseModel):
     synthesis: str
     report_path: Optional[str]
     timestamp: datetime
+    cached: bool = False
+    cache_age_seconds: Optional[float] = None
     usage_stats: UsageStats
 
+class JobProgress(BaseModel):
+    stage: str
+    completed: int
+    total: int
+
+class JobStatus(BaseModel):
+    id: str
+    status: str = Field(..., description="queued, running, completed, failed or cancelled")
+    query: str
+    progress: JobProgress
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
 class HealthResponse(BaseModel):
     status: str
     timestamp: datetime
     version: str
     usage_stats: UsageStats
+    connection_pool: Optional[Dict[str, Any]] = None
+    circuit_breakers: Optional[Dict[str, Any]] = None
 
 class ErrorResponse(BaseModel):
     error: str
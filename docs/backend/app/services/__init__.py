@@ -1,6 +1,8 @@
 from .web_scraper import WebScraper
 from .report_generator import ReportGenerator
-from .cache_manager import CacheManager
+from .cache_manager import CacheManager, TieredCache
 from .document_processor import DocumentProcessor
+from .clinical_trials_client import ClinicalTrialsClient
+from .job_queue import JobQueue
 
-__all__ = ["WebScraper", "ReportGenerator", "CacheManager", "DocumentProcessor"]
\ No newline at end of file
+__all__ = ["WebScraper", "ReportGenerator", "CacheManager", "TieredCache", "DocumentProcessor", "ClinicalTrialsClient", "JobQueue"]
\ No newline at end of file
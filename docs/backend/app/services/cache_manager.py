@@ -1,14 +1,26 @@
-import redis  # pyright: ignore[reportMissingImports]
+import redis.asyncio as redis  # pyright: ignore[reportMissingImports]
 import json
 import hashlib
-from typing import Any, Optional
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Dict, List
 from datetime import timedelta
 import logging
 
 logger = logging.getLogger("pharma_ai")
 
+def make_cache_key(prefix: str, data: Any) -> str:
+    """Generate cache key from data"""
+    data_str = json.dumps(data, sort_keys=True)
+    hash_str = hashlib.md5(data_str.encode()).hexdigest()
+    return f"{prefix}:{hash_str}"
+
 class CacheManager:
-    """Manage Redis caching for API responses"""
+    """Manage Redis caching for API responses
+
+    Redis is reached through the asyncio client, so cache lookups never
+    block the event loop.
+    """
     
     def __init__(self, redis_url: str = "redis://localhost:6379"):
         try:
@@ -21,9 +33,7 @@ class CacheManager:
     
     def _generate_key(self, prefix: str, data: Any) -> str:
         """Generate cache key from data"""
-        data_str = json.dumps(data, sort_keys=True)
-        hash_str = hashlib.md5(data_str.encode()).hexdigest()
-        return f"{prefix}:{hash_str}"
+        return make_cache_key(prefix, data)
     
     async def get(self, key: str) -> Optional[Any]:
         """Get value from cache"""
@@ -31,7 +41,7 @@ class CacheManager:
             return None
         
         try:
-            value = self.redis_client.get(key)
+            value = await self.redis_client.get(key)
             if value:
                 logger.debug(f"Cache hit: {key}")
                 return json.loads(value)
@@ -41,6 +51,17 @@ class CacheManager:
             logger.error(f"Cache get error: {e}")
             return None
     
+    async def get_many(self, keys: List[str]) -> List[Optional[Any]]:
+        """Get several values in one round-trip; None for each missing key"""
+        if not self.redis_client:
+            return [None] * len(keys)
+        
+        try:
+            return [json.loads(value) if value else None for value in await self.redis_client.mget(keys)]
+        except Exception as e:
+            logger.error(f"Cache get error: {e}")
+            return [None] * len(keys)
+    
     async def set(
         self,
         key: str,
@@ -53,7 +74,7 @@ class CacheManager:
         
         try:
             ttl = ttl or self.default_ttl
-            self.redis_client.setex(
+            await self.redis_client.setex(
                 key,
                 ttl,
                 json.dumps(value)
@@ -70,25 +91,156 @@ class CacheManager:
             return False
         
         try:
-            self.redis_client.delete(key)
+            await self.redis_client.delete(key)
             logger.debug(f"Cache deleted: {key}")
             return True
         except Exception as e:
             logger.error(f"Cache delete error: {e}")
             return False
     
+    async def incr(self, key: str) -> Optional[int]:
+        """Increment a counter shared by every process, or None without Redis"""
+        if not self.redis_client:
+            return None
+        
+        try:
+            return await self.redis_client.incr(key)
+        except Exception as e:
+            logger.error(f"Cache incr error: {e}")
+            return None
+    
     async def clear_pattern(self, pattern: str) -> int:
         """Clear all keys matching pattern"""
         if not self.redis_client:
             return 0
         
         try:
-            keys = self.redis_client.keys(pattern)
-            if keys:
-                count = self.redis_client.delete(*keys)
+            # SCAN in batches rather than KEYS, which blocks Redis on large keyspaces
+            count = 0
+            batch = []
+            async for key in self.redis_client.scan_iter(match=pattern, count=500):
+                batch.append(key)
+                if len(batch) >= 500:
+                    count += await self.redis_client.delete(*batch)
+                    batch = []
+            if batch:
+                count += await self.redis_client.delete(*batch)
+            if count:
                 logger.info(f"Cleared {count} cache keys matching: {pattern}")
-                return count
-            return 0
+            return count
         except Exception as e:
             logger.error(f"Cache clear error: {e}")
-            return 0
\ No newline at end of file
+            return 0
+
+class MemoryCache:
+    """In-process LRU cache with per-entry TTL"""
+    
+    def __init__(self, max_entries: int = 1000, default_ttl: int = 3600):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._entries: OrderedDict = OrderedDict()
+    
+    def get(self, key: str) -> Optional[Any]:
+        """Get value from cache"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        
+        self._entries.move_to_end(key)
+        return value
+    
+    def set(self, key: str, value: Any, ttl: Optional[int] = None):
+        """Set value in cache, evicting the least recently used entries"""
+        ttl = ttl or self.default_ttl
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+    
+    def delete(self, key: str):
+        """Delete key from cache"""
+        self._entries.pop(key, None)
+    
+    def clear_prefix(self, prefix: str) -> int:
+        """Delete all keys starting with prefix"""
+        keys = [k for k in self._entries if k.startswith(prefix)]
+        for key in keys:
+            del self._entries[key]
+        return len(keys)
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+
+class TieredCache:
+    """In-process LRU in front of the shared Redis cache"""
+    
+    def __init__(
+        self,
+        cache_manager: Optional[CacheManager] = None,
+        max_entries: int = 1000,
+        default_ttl: int = 3600
+    ):
+        self.memory = MemoryCache(max_entries, default_ttl)
+        self.cache_manager = cache_manager
+        self.default_ttl = default_ttl
+        self.stats = {"memory_hits": 0, "redis_hits": 0, "misses": 0, "sets": 0}
+    
+    async def get(self, key: str) -> Optional[Any]:
+        """Get value from memory, then Redis"""
+        value = self.memory.get(key)
+        if value is not None:
+            self.stats["memory_hits"] += 1
+            return value
+        
+        if self.cache_manager:
+            value = await self.cache_manager.get(key)
+            if value is not None:
+                self.stats["redis_hits"] += 1
+                self.memory.set(key, value)
+                return value
+        
+        self.stats["misses"] += 1
+        return None
+    
+    async def set(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
+        """Set value in both tiers"""
+        ttl = ttl or self.default_ttl
+        self.memory.set(key, value, ttl)
+        self.stats["sets"] += 1
+        
+        if self.cache_manager:
+            return await self.cache_manager.set(key, value, ttl)
+        return True
+    
+    async def delete(self, key: str) -> bool:
+        """Delete key from both tiers"""
+        self.memory.delete(key)
+        
+        if self.cache_manager:
+            return await self.cache_manager.delete(key)
+        return True
+    
+    async def clear_prefix(self, prefix: str) -> int:
+        """Delete all keys under a prefix from both tiers"""
+        count = self.memory.clear_prefix(f"{prefix}:")
+        
+        if self.cache_manager:
+            count = max(count, await self.cache_manager.clear_pattern(f"{prefix}:*"))
+        return count
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss statistics"""
+        hits = self.stats["memory_hits"] + self.stats["redis_hits"]
+        lookups = hits + self.stats["misses"]
+        return {
+            **self.stats,
+            "hits": hits,
+            "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+            "memory_entries": len(self.memory)
+        }
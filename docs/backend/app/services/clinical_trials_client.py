@@ -0,0 +1,190 @@
+import json
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+import aiohttp
+
+CLINICAL_TRIALS_API_URL = "https://clinicaltrials.gov/api/v2/studies"
+
+# Only the fields parse_study reads are requested by default
+DEFAULT_FIELDS = [
+    "NCTId",
+    "BriefTitle",
+    "Condition",
+    "InterventionName",
+    "Phase",
+    "OverallStatus",
+    "LastUpdatePostDate"
+]
+
+PHASE_LABELS = {
+    "EARLY_PHASE1": "Early Phase 1",
+    "PHASE1": "Phase 1",
+    "PHASE2": "Phase 2",
+    "PHASE3": "Phase 3",
+    "PHASE4": "Phase 4",
+    "NA": "N/A"
+}
+
+STATUS_LABELS = {
+    "ACTIVE_NOT_RECRUITING": "Active, not recruiting",
+    "ENROLLING_BY_INVITATION": "Enrolling by invitation",
+    "NOT_YET_RECRUITING": "Not yet recruiting"
+}
+
+def parse_study(study: Dict[str, Any]) -> Dict[str, Any]:
+    """Map a v2 study record to the trial dict the agents use"""
+    protocol = study.get("protocolSection", {})
+    identification = protocol.get("identificationModule", {})
+    status = protocol.get("statusModule", {})
+    nct_id = identification.get("nctId", "")
+    phases = protocol.get("designModule", {}).get("phases", [])
+    overall_status = status.get("overallStatus", "")
+
+    return {
+        "nct_id": nct_id,
+        "title": identification.get("briefTitle", ""),
+        "condition": protocol.get("conditionsModule", {}).get("conditions", []),
+        "interventions": [
+            intervention.get("name", "")
+            for intervention in protocol.get("armsInterventionsModule", {}).get("interventions", [])
+        ],
+        "phase": "/".join(PHASE_LABELS.get(p, p) for p in phases) or "N/A",
+        "status": STATUS_LABELS.get(overall_status, overall_status.replace("_", " ").capitalize()),
+        "last_update": status.get("lastUpdatePostDateStruct", {}).get("date", ""),
+        "url": f"https://clinicaltrials.gov/study/{nct_id}"
+    }
+
+class HttpTransport:
+    """Fetch study pages from the live API over a shared session
+
+    With a breaker, each page request goes through it, so only upstream
+    time counts toward the source's health.
+    """
+
+    def __init__(
+        self,
+        get_session: Callable[[], Awaitable[aiohttp.ClientSession]],
+        url: str = CLINICAL_TRIALS_API_URL,
+        breaker=None
+    ):
+        self.get_session = get_session
+        self.url = url
+        self.breaker = breaker
+
+    async def __call__(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        session = await self.get_session()
+
+        async def send() -> Dict[str, Any]:
+            async with session.get(self.url, params=params) as response:
+                response.raise_for_status()
+                return await response.json(content_type=None)
+
+        if self.breaker is None:
+            return await send()
+        return await self.breaker.call(send)
+
+class RecordedTransport:
+    """Replay recorded study pages for offline tests
+
+    Pages are served in order by following their nextPageToken, so the
+    client's pagination runs exactly as against the live API.
+    """
+
+    def __init__(self, pages: List[Dict[str, Any]]):
+        self.pages: Dict[Optional[str], Dict[str, Any]] = {}
+        token = None
+        for page in pages:
+            self.pages[token] = page
+            token = page.get("nextPageToken")
+        self.requests: List[Dict[str, Any]] = []
+
+    @classmethod
+    def load(cls, path: str) -> "RecordedTransport":
+        """Load pages recorded as a JSON list"""
+        with open(path) as f:
+            return cls(json.load(f))
+
+    async def __call__(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        self.requests.append(params)
+        return self.pages.get(params.get("pageToken"), {"studies": []})
+
+class ClinicalTrialsClient:
+    """Client for the ClinicalTrials.gov v2 studies API"""
+
+    def __init__(self, transport: Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]], page_size: int = 100):
+        self.transport = transport
+        self.page_size = page_size
+        self.stats = {"pages": 0, "studies": 0}
+
+    def _params(
+        self,
+        query: str,
+        fields: Optional[List[str]],
+        phases: Optional[List[str]],
+        statuses: Optional[List[str]],
+        page_size: int
+    ) -> Dict[str, Any]:
+        params = {
+            "query.term": query,
+            "fields": ",".join(fields or DEFAULT_FIELDS),
+            "pageSize": page_size,
+            "format": "json"
+        }
+        if statuses:
+            params["filter.overallStatus"] = ",".join(statuses)
+        if phases:
+            params["filter.advanced"] = f"AREA[Phase]({' OR '.join(phases)})"
+        return params
+
+    async def iter_pages(
+        self,
+        query: str,
+        fields: Optional[List[str]] = None,
+        phases: Optional[List[str]] = None,
+        statuses: Optional[List[str]] = None,
+        page_size: Optional[int] = None
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Yield raw study records one page at a time"""
+        params = self._params(query, fields, phases, statuses, page_size or self.page_size)
+        while True:
+            page = await self.transport(params)
+            self.stats["pages"] += 1
+            yield page.get("studies", [])
+
+            token = page.get("nextPageToken")
+            if not token:
+                return
+            params = {**params, "pageToken": token}
+
+    async def iter_studies(
+        self,
+        query: str,
+        fields: Optional[List[str]] = None,
+        phases: Optional[List[str]] = None,
+        statuses: Optional[List[str]] = None,
+        page_size: Optional[int] = None,
+        max_studies: Optional[int] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Yield parsed studies across pages, fetching the next page lazily
+
+        phases and statuses take API enum values (e.g. PHASE2, RECRUITING).
+        Stops after max_studies, or when the caller stops iterating.
+        """
+        if max_studies is not None and page_size is None:
+            page_size = min(max_studies, self.page_size)
+
+        count = 0
+        async for studies in self.iter_pages(query, fields, phases, statuses, page_size):
+            for study in studies:
+                count += 1
+                self.stats["studies"] += 1
+                yield parse_study(study)
+                if max_studies is not None and count >= max_studies:
+                    return
+
+    async def search(self, query: str, max_studies: int = 10, **filters) -> List[Dict[str, Any]]:
+        """Collect the first max_studies parsed studies"""
+        return [study async for study in self.iter_studies(query, max_studies=max_studies, **filters)]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get paging statistics"""
+        return dict(self.stats)
@@ -0,0 +1,403 @@
+import redis  # pyright: ignore[reportMissingImports]
+import redis.asyncio  # pyright: ignore[reportMissingImports]
+import asyncio
+import json
+import time
+import uuid
+from typing import Any, AsyncIterator, Callable, Dict, Optional
+from datetime import datetime
+import logging
+
+logger = logging.getLogger("pharma_ai")
+
+FINISHED_STATUSES = ("completed", "failed", "cancelled")
+
+# runner(query, context) yields execute_stream events
+JobRunner = Callable[[str, Dict[str, Any]], AsyncIterator[Dict[str, Any]]]
+
+def job_summary(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Job record without its (large) result and request context"""
+    return {k: v for k, v in job.items() if k not in ("result", "context")}
+
+class QueueFullError(Exception):
+    """Raised when submitting to a queue that already holds max_queued jobs"""
+
+class MemoryJobStore:
+    """In-process job records and queue, for a single API process"""
+
+    def __init__(self, result_ttl: int = 86400):
+        self.result_ttl = result_ttl
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._finished_at: Dict[str, float] = {}
+        self._queue: Optional[asyncio.Queue] = None
+
+    @property
+    def queue(self) -> asyncio.Queue:
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        return self._queue
+
+    def _expire(self):
+        cutoff = time.monotonic() - self.result_ttl
+        for job_id in [j for j, t in self._finished_at.items() if t < cutoff]:
+            self._jobs.pop(job_id, None)
+            del self._finished_at[job_id]
+
+    async def save(self, job: Dict[str, Any], expected_status: Optional[str] = None) -> bool:
+        """Store a job record; with expected_status, only if the stored status still matches"""
+        current = self._jobs.get(job["id"])
+        if expected_status is not None and (current is None or current["status"] != expected_status):
+            return False
+        self._jobs[job["id"]] = job
+        if job["status"] in FINISHED_STATUSES:
+            self._finished_at.setdefault(job["id"], time.monotonic())
+        self._expire()
+        return True
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        job = self._jobs.get(job_id)
+        return dict(job) if job else None
+
+    async def push(self, job_id: str):
+        self.queue.put_nowait(job_id)
+
+    async def pop(self, timeout: float = 1.0) -> Optional[str]:
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def queued(self) -> int:
+        return self.queue.qsize()
+
+    # Jobs cannot outlive this process, so there is nothing to lease or recover
+    async def ack(self, job_id: str):
+        pass
+
+    async def heartbeat(self):
+        pass
+
+    async def recover(self) -> int:
+        return 0
+
+    async def close(self):
+        pass
+
+class RedisJobStore:
+    """Job records and queue in Redis, shared by every API process
+
+    Redis is reached through the asyncio client, so job bookkeeping never
+    blocks the event loop. pop() moves a job id into this process's
+    processing list rather than removing it, and ack() drops it once the job
+    has finished. While the process is alive, heartbeat() keeps its lease
+    key fresh; recover() in any process requeues the processing lists of
+    processes whose lease expired, so jobs held by a crashed process run
+    again.
+    """
+
+    def __init__(self, redis_url: str, prefix: str = "jobs", result_ttl: int = 86400, lease_ttl: int = 30):
+        # One sync ping at startup, before the event loop runs, decides
+        # between Redis and in-process jobs
+        client = redis.from_url(redis_url)
+        try:
+            client.ping()
+        finally:
+            client.close()
+        self.redis_client = redis.asyncio.from_url(redis_url, decode_responses=True)
+        self.prefix = prefix
+        self.result_ttl = result_ttl
+        self.lease_ttl = lease_ttl
+        self.queue_key = f"{prefix}:queue"
+        self.worker_id = uuid.uuid4().hex
+        self.processing_key = f"{prefix}:processing:{self.worker_id}"
+
+    async def save(self, job: Dict[str, Any], expected_status: Optional[str] = None) -> bool:
+        """Store a job record; with expected_status, only if the stored status still matches"""
+        key = f"{self.prefix}:{job['id']}"
+        value = json.dumps(job)
+        if expected_status is None:
+            await self.redis_client.set(key, value, ex=self.result_ttl)
+            return True
+
+        # WATCH makes the check and the write atomic against other processes
+        async def save_if(pipe) -> bool:
+            current = await pipe.get(key)
+            if current is None or json.loads(current)["status"] != expected_status:
+                return False
+            pipe.multi()
+            pipe.set(key, value, ex=self.result_ttl)
+            return True
+
+        return await self.redis_client.transaction(save_if, key, value_from_callable=True)
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        value = await self.redis_client.get(f"{self.prefix}:{job_id}")
+        return json.loads(value) if value else None
+
+    async def push(self, job_id: str):
+        await self.redis_client.rpush(self.queue_key, job_id)
+
+    async def pop(self, timeout: float = 1.0) -> Optional[str]:
+        # A pop cancelled by close() after Redis moved the id leaves it in the
+        # processing list, where close() requeues it
+        return await self.redis_client.blmove(
+            self.queue_key, self.processing_key, max(1, int(timeout)), "LEFT", "RIGHT"
+        )
+
+    async def ack(self, job_id: str):
+        """Drop a finished job from this process's processing list"""
+        await self.redis_client.lrem(self.processing_key, 1, job_id)
+
+    async def heartbeat(self):
+        """Renew this process's lease on its processing list"""
+        await self.redis_client.set(f"{self.prefix}:lease:{self.worker_id}", "1", ex=self.lease_ttl)
+
+    async def _requeue(self, processing_key: str) -> int:
+        # Reset records before their ids are visible, or a worker would skip them
+        for job_id in await self.redis_client.lrange(processing_key, 0, -1):
+            job = await self.get(job_id)
+            if job and job["status"] == "running":
+                job.update(
+                    status="queued",
+                    started_at=None,
+                    progress={"stage": "queued", "completed": 0, "total": 0}
+                )
+                await self.save(job, expected_status="running")
+        count = 0
+        while await self.redis_client.lmove(processing_key, self.queue_key, "RIGHT", "LEFT") is not None:
+            count += 1
+        return count
+
+    async def recover(self) -> int:
+        """Requeue jobs held by processes whose lease has expired"""
+        count = 0
+        async for processing_key in self.redis_client.scan_iter(match=f"{self.prefix}:processing:*"):
+            worker_id = processing_key.rsplit(":", 1)[-1]
+            if worker_id == self.worker_id or await self.redis_client.exists(f"{self.prefix}:lease:{worker_id}"):
+                continue
+            count += await self._requeue(processing_key)
+        return count
+
+    async def close(self):
+        """Requeue this process's unfinished jobs and release its lease"""
+        await self._requeue(self.processing_key)
+        await self.redis_client.delete(f"{self.prefix}:lease:{self.worker_id}")
+        await self.redis_client.aclose()
+
+    async def queued(self) -> int:
+        return await self.redis_client.llen(self.queue_key)
+
+class JobQueue:
+    """Run research queries in the background on a bounded worker pool
+
+    submit() stores a queued job and returns at once; `workers` tasks pop
+    jobs and run them through runner, recording progress from its events
+    (agents completed out of planned, current stage) and the final result.
+    Cancelling a queued job drops it; cancelling a running job stops it at
+    its next event, or immediately if it runs in this process. Every
+    heartbeat_interval the store's lease is renewed and jobs left behind by
+    dead processes are requeued.
+    """
+
+    def __init__(
+        self,
+        store,
+        runner: JobRunner,
+        workers: int = 2,
+        max_queued: int = 100,
+        heartbeat_interval: float = 10.0,
+        error_delay: float = 1.0
+    ):
+        self.store = store
+        self.runner = runner
+        self.workers = workers
+        self.max_queued = max_queued
+        self.heartbeat_interval = heartbeat_interval
+        self.error_delay = error_delay
+        self._tasks = []
+        self._running: Dict[str, asyncio.Task] = {}
+        self.stats = {"submitted": 0, "completed": 0, "failed": 0, "cancelled": 0, "recovered": 0}
+
+    def start(self):
+        """Start the worker tasks; safe to call more than once"""
+        if self._tasks:
+            return
+        # The heartbeat goes first so the lease exists before any job is popped
+        self._tasks = [asyncio.ensure_future(self._heartbeat())]
+        self._tasks += [asyncio.ensure_future(self._worker()) for _ in range(self.workers)]
+
+    async def close(self):
+        """Stop the workers and hand jobs running in this process back to the queue"""
+        running = list(self._running.values())
+        for task in running + self._tasks:
+            task.cancel()
+        await asyncio.gather(*running, *self._tasks, return_exceptions=True)
+        self._tasks = []
+        await self.store.close()
+
+    async def submit(self, query: str, context: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Queue a query and return the new job record"""
+        self.start()
+        if await self.store.queued() >= self.max_queued:
+            raise QueueFullError(f"Job queue is full ({self.max_queued} queued)")
+
+        job = {
+            "id": uuid.uuid4().hex,
+            "status": "queued",
+            "query": query,
+            "context": context or {},
+            "progress": {"stage": "queued", "completed": 0, "total": 0},
+            "error": None,
+            "result": None,
+            "created_at": datetime.now().isoformat(),
+            "started_at": None,
+            "finished_at": None
+        }
+        await self.store.save(job)
+        await self.store.push(job["id"])
+        self.stats["submitted"] += 1
+        return job
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get a job record, or None if unknown or expired"""
+        return await self.store.get(job_id)
+
+    async def cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Cancel a queued or running job; finished jobs are returned unchanged"""
+        job = await self.store.get(job_id)
+        if job is None or job["status"] in FINISHED_STATUSES:
+            return job
+
+        status = job["status"]
+        job["status"] = "cancelled"
+        job["finished_at"] = datetime.now().isoformat()
+        if not await self.store.save(job, expected_status=status):
+            # The job started or finished meanwhile; cancel its current state
+            return await self.cancel(job_id)
+        self.stats["cancelled"] += 1
+
+        task = self._running.get(job_id)
+        if task:
+            task.cancel()
+        return job
+
+    async def _worker(self):
+        # Only cancellation stops a worker; store errors (a Redis outage, say)
+        # are logged and retried after error_delay
+        while True:
+            try:
+                await self._work_one()
+            except Exception as e:
+                logger.error(f"Job worker error: {e}")
+                await asyncio.sleep(self.error_delay)
+
+    async def _work_one(self):
+        job_id = await self.store.pop()
+        if job_id is None:
+            return
+        job = await self.store.get(job_id)
+        if job is None or job["status"] != "queued":
+            await self.store.ack(job_id)
+            return
+
+        task = asyncio.ensure_future(self._run(job))
+        self._running[job_id] = task
+        try:
+            # wait() rather than await, so cancelling the job leaves the worker running
+            await asyncio.wait({task})
+        finally:
+            self._running.pop(job_id, None)
+        if not task.cancelled() and task.exception():
+            logger.error(f"Job {job_id} stopped: {task.exception()}")
+        # Not acked if the worker was stopped, so close() requeues the job
+        await self.store.ack(job_id)
+
+    async def _heartbeat(self):
+        while True:
+            try:
+                await self.store.heartbeat()
+                recovered = await self.store.recover()
+                if recovered:
+                    self.stats["recovered"] += recovered
+                    logger.warning(f"Requeued {recovered} jobs from stopped workers")
+            except Exception as e:
+                logger.error(f"Job queue heartbeat failed: {e}")
+            await asyncio.sleep(self.heartbeat_interval)
+
+    async def _run(self, job: Dict[str, Any]):
+        # Every save is conditional on the status this worker last wrote, so
+        # a cancel from another process is never overwritten
+        job["status"] = "running"
+        job["started_at"] = datetime.now().isoformat()
+        job["progress"]["stage"] = "planning"
+        if not await self.store.save(job, expected_status="queued"):
+            return
+
+        try:
+            async for event in self.runner(job["query"], job["context"]):
+                name = event["event"]
+                if name == "synthesis_delta":
+                    continue
+
+                progress = job["progress"]
+                if name == "plan":
+                    progress.update(stage="agents", total=len(event["data"].get("tasks", [])))
+                elif name == "agent_result":
+                    progress.update(completed=event["data"]["completed"], total=event["data"]["total"])
+                elif name == "agent_results":
+                    progress["stage"] = "synthesis"
+                elif name == "synthesis":
+                    progress["stage"] = "report"
+                elif name == "complete":
+                    progress["stage"] = "complete"
+                    job["result"] = event["data"]
+                if not await self.store.save(job, expected_status="running"):
+                    return
+
+            job["status"] = "completed" if job["result"] is not None else "failed"
+            if job["result"] is None:
+                job["error"] = "Run ended without a result"
+        except asyncio.CancelledError:
+            # cancel() has already recorded the job as cancelled
+            raise
+        except Exception as e:
+            logger.error(f"Job {job['id']} failed: {e}")
+            job["status"] = "failed"
+            job["error"] = str(e)
+
+        job["finished_at"] = datetime.now().isoformat()
+        if await self.store.save(job, expected_status="running"):
+            self.stats[job["status"]] += 1
+
+    async def get_stats(self) -> Dict[str, Any]:
+        """Get queue depth, running jobs and counters"""
+        return {
+            **self.stats,
+            "queued": await self.store.queued(),
+            "running": len(self._running),
+            "workers": self.workers,
+            "backend": "redis" if isinstance(self.store, RedisJobStore) else "memory"
+        }
+
+def create_job_queue(settings, runner: JobRunner) -> JobQueue:
+    """Build a JobQueue on the configured backend, falling back to memory"""
+    store = None
+    if settings.JOB_BACKEND == "redis":
+        try:
+            store = RedisJobStore(
+                settings.REDIS_URL,
+                result_ttl=settings.JOB_RESULT_TTL,
+                lease_ttl=settings.JOB_LEASE_TTL
+            )
+        except Exception as e:
+            logger.warning(f"Redis job store unavailable: {e}. Using in-process jobs.")
+    if store is None:
+        store = MemoryJobStore(result_ttl=settings.JOB_RESULT_TTL)
+
+    return JobQueue(
+        store,
+        runner,
+        workers=settings.JOB_WORKERS,
+        max_queued=settings.JOB_MAX_QUEUED,
+        heartbeat_interval=settings.JOB_LEASE_TTL / 3
+    )
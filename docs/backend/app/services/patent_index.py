@@ -0,0 +1,364 @@
+import argparse
+import bisect
+import csv
+import glob
+import io
+import json
+import os
+import re
+import sys
+import zipfile
+from datetime import date, datetime as dt
+from typing import Any, Dict, Iterator, List, Optional, Set
+import numpy as np
+
+NO_DATE = np.iinfo(np.int32).min
+EPOCH = date(1970, 1, 1)
+
+STOP_WORDS = {
+    "the", "and", "for", "with", "from", "that", "this", "are", "which", "said", "wherein",
+    "claim", "claims", "comprising", "method", "one", "more", "least", "thereof", "such",
+    "use", "composition", "compound", "compounds", "having", "being", "its", "into", "each"
+}
+
+def tokenize(text: str) -> Set[str]:
+    """Distinct lowercase terms of three or more characters"""
+    return {t for t in re.findall(r"[a-z0-9]{3,}", text.lower()) if t not in STOP_WORDS}
+
+def _days(value: str) -> int:
+    try:
+        return (dt.strptime(value[:10], "%Y-%m-%d").date() - EPOCH).days
+    except (TypeError, ValueError):
+        return NO_DATE
+
+def _add_years(days: int, years: int) -> int:
+    if days == NO_DATE:
+        return NO_DATE
+    d = EPOCH.fromordinal(EPOCH.toordinal() + days)
+    try:
+        shifted = d.replace(year=d.year + years)
+    except ValueError:
+        # 29 February
+        shifted = d.replace(year=d.year + years, day=28)
+    return (shifted - EPOCH).days
+
+def _iso(days: int) -> str:
+    return "" if days == NO_DATE else EPOCH.fromordinal(EPOCH.toordinal() + int(days)).isoformat()
+
+def read_tsv(path: str) -> Iterator[Dict[str, str]]:
+    """Stream rows of a PatentsView TSV, plain or zipped"""
+    csv.field_size_limit(sys.maxsize)
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            with archive.open(archive.namelist()[0]) as raw:
+                yield from csv.DictReader(io.TextIOWrapper(raw, encoding="utf-8"), delimiter="\t")
+    else:
+        with open(path, encoding="utf-8", newline="") as f:
+            yield from csv.DictReader(f, delimiter="\t")
+
+def _find(source: str, name: str) -> List[str]:
+    return sorted(glob.glob(os.path.join(source, f"{name}.tsv")) + glob.glob(os.path.join(source, f"{name}.tsv.zip")))
+
+def _write_strings(out: str, name: str, values: List[str]):
+    encoded = [v.encode("utf-8") for v in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(v) for v in encoded])
+    with open(os.path.join(out, f"{name}.bin"), "wb") as f:
+        f.write(b"".join(encoded))
+    np.save(os.path.join(out, f"{name}_off.npy"), offsets)
+
+def _write_postings(out: str, name: str, postings: Dict[str, Set[int]]):
+    """Store term -> doc ids as a sorted vocabulary plus CSR arrays"""
+    vocab = sorted(postings)
+    offsets = np.zeros(len(vocab) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(postings[term]) for term in vocab])
+    docs = np.fromiter(
+        (doc for term in vocab for doc in sorted(postings[term])),
+        dtype=np.int32,
+        count=int(offsets[-1])
+    )
+    with open(os.path.join(out, f"{name}.json"), "w") as f:
+        json.dump(vocab, f)
+    np.save(os.path.join(out, f"{name}_off.npy"), offsets)
+    np.save(os.path.join(out, f"{name}_post.npy"), docs)
+
+def build_patent_index(source: str, out: str, cpc_prefixes: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Build a memory-mapped patent index from PatentsView bulk TSVs
+
+    Reads g_patent (required), g_application, g_assignee_disambiguated,
+    g_cpc_current and g_claims_* for granted patents, and optionally
+    pg_published_application and its pg_* companions for pending
+    applications. cpc_prefixes (e.g. ["A61K", "A61P"]) restricts the index
+    to matching patents, which keeps it to a useful size.
+    """
+    os.makedirs(out, exist_ok=True)
+    prefixes = tuple(p.upper() for p in cpc_prefixes or [])
+
+    doc_of: Dict[str, int] = {}
+    numbers: List[str] = []
+    titles: List[str] = []
+    filing: List[int] = []
+    grant: List[int] = []
+    expiry: List[int] = []
+    assignee: List[int] = []
+    assignee_names: Dict[str, int] = {"": 0}
+    terms: Dict[str, Set[int]] = {}
+    cpcs: Dict[str, Set[int]] = {}
+    design: Set[int] = set()
+    granted_applications: Set[str] = set()
+
+    for kind, prefix, id_field in (("granted", "g", "patent_id"), ("pending", "pg", "document_number")):
+        # CPC codes first, so the prefix filter can decide which documents to keep
+        codes: Dict[str, Set[str]] = {}
+        for path in _find(source, f"{prefix}_cpc_current"):
+            for row in read_tsv(path):
+                code = (row.get("cpc_group") or "").replace(" ", "")
+                if code:
+                    codes.setdefault(row[id_field], set()).add(code)
+
+        main_file = "g_patent" if kind == "granted" else "pg_published_application"
+        for path in _find(source, main_file):
+            for row in read_tsv(path):
+                key = row[id_field]
+                doc_codes = codes.get(key, set())
+                if prefixes and not any(code.startswith(prefixes) for code in doc_codes):
+                    continue
+                # Published applications that were since granted are already indexed
+                if kind == "pending" and row.get("application_id") in granted_applications:
+                    continue
+
+                doc = doc_of[f"{kind}:{key}"] = len(numbers)
+                numbers.append(key)
+                title = row.get("patent_title") or row.get("invention_title") or ""
+                titles.append(title)
+                filing.append(_days(row.get("filing_date", "")))
+                grant.append(_days(row.get("patent_date", "")) if kind == "granted" else NO_DATE)
+                expiry.append(NO_DATE)
+                assignee.append(0)
+                if row.get("patent_type") == "design":
+                    design.add(doc)
+
+                for term in tokenize(f"{title} {row.get('patent_abstract') or row.get('invention_abstract') or ''}"):
+                    terms.setdefault(term, set()).add(doc)
+                for code in doc_codes:
+                    cpcs.setdefault(code, set()).add(doc)
+
+        if kind == "granted":
+            for path in _find(source, "g_application"):
+                for row in read_tsv(path):
+                    doc = doc_of.get(f"granted:{row['patent_id']}")
+                    if doc is not None:
+                        filing[doc] = _days(row.get("filing_date", ""))
+                        granted_applications.add(row.get("application_id", ""))
+
+        for path in _find(source, f"{prefix}_assignee_disambiguated"):
+            for row in read_tsv(path):
+                doc = doc_of.get(f"{kind}:{row[id_field]}")
+                # Rows are ordered by sequence; keep the first-listed assignee
+                if doc is None or assignee[doc]:
+                    continue
+                name = row.get("disambig_assignee_organization") or " ".join(
+                    p for p in (row.get("disambig_assignee_individual_name_first"),
+                                row.get("disambig_assignee_individual_name_last")) if p
+                )
+                assignee[doc] = assignee_names.setdefault(name, len(assignee_names))
+
+        for path in _find(source, f"{prefix}_claims*"):
+            for row in read_tsv(path):
+                doc = doc_of.get(f"{kind}:{row[id_field]}")
+                if doc is not None:
+                    for term in tokenize(row.get("claim_text", "")):
+                        terms.setdefault(term, set()).add(doc)
+
+    # Utility and plant patents run 20 years from filing; design patents 15 from grant
+    for doc in range(len(numbers)):
+        if grant[doc] != NO_DATE:
+            expiry[doc] = _add_years(grant[doc], 15) if doc in design else _add_years(filing[doc], 20)
+
+    _write_strings(out, "numbers", numbers)
+    _write_strings(out, "titles", titles)
+    for name, column in (("filing", filing), ("grant", grant), ("expiry", expiry), ("assignee", assignee)):
+        np.save(os.path.join(out, f"{name}.npy"), np.asarray(column, dtype=np.int32))
+    _write_postings(out, "terms", terms)
+    _write_postings(out, "cpc", cpcs)
+
+    meta = {
+        "patents": len(numbers),
+        "pending": sum(1 for g in grant if g == NO_DATE),
+        "terms": len(terms),
+        "cpc_codes": len(cpcs),
+        "cpc_prefixes": list(prefixes),
+        "built_at": dt.now().isoformat()
+    }
+    with open(os.path.join(out, "assignees.json"), "w") as f:
+        json.dump(sorted(assignee_names, key=assignee_names.get), f)
+    with open(os.path.join(out, "meta.json"), "w") as f:
+        json.dump(meta, f)
+    return meta
+
+class PatentIndex:
+    """Memory-mapped columnar patent index built by build_patent_index"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, "meta.json")) as f:
+            self.meta = json.load(f)
+        with open(os.path.join(path, "assignees.json")) as f:
+            self.assignees: List[str] = json.load(f)
+
+        self.filing = self._array("filing")
+        self.grant = self._array("grant")
+        self.expiry = self._array("expiry")
+        self.assignee = self._array("assignee")
+        self.size = len(self.filing)
+
+        self._strings = {name: self._string_column(name) for name in ("numbers", "titles")}
+        self._postings = {name: self._posting_list(name) for name in ("terms", "cpc")}
+
+    def _array(self, name: str) -> np.ndarray:
+        return np.load(os.path.join(self.path, f"{name}.npy"), mmap_mode="r")
+
+    def _string_column(self, name: str):
+        blob_path = os.path.join(self.path, f"{name}.bin")
+        blob = np.memmap(blob_path, dtype=np.uint8, mode="r") if os.path.getsize(blob_path) else np.zeros(0, np.uint8)
+        return blob, self._array(f"{name}_off")
+
+    def _posting_list(self, name: str):
+        with open(os.path.join(self.path, f"{name}.json")) as f:
+            vocab = json.load(f)
+        return vocab, {term: i for i, term in enumerate(vocab)}, self._array(f"{name}_off"), self._array(f"{name}_post")
+
+    def _string(self, name: str, doc: int) -> str:
+        blob, offsets = self._strings[name]
+        return bytes(blob[offsets[doc]:offsets[doc + 1]]).decode("utf-8")
+
+    def _docs(self, name: str, term_id: int) -> np.ndarray:
+        _, _, offsets, postings = self._postings[name]
+        return postings[offsets[term_id]:offsets[term_id + 1]]
+
+    def _cpc_mask(self, cpc_prefixes: List[str]) -> np.ndarray:
+        vocab, _, _, _ = self._postings["cpc"]
+        mask = np.zeros(self.size, dtype=bool)
+        for prefix in cpc_prefixes:
+            prefix = prefix.upper().replace(" ", "")
+            # Codes sharing a prefix are contiguous in the sorted vocabulary
+            start = bisect.bisect_left(vocab, prefix)
+            end = bisect.bisect_left(vocab, prefix + "\uffff")
+            for term_id in range(start, end):
+                mask[self._docs("cpc", term_id)] = True
+        return mask
+
+    def _scores(self, query: str, cpc_prefixes: Optional[List[str]] = None) -> np.ndarray:
+        """Matched query terms per document; all-term matches win when present"""
+        _, term_ids, _, _ = self._postings["terms"]
+        known = [term_ids[t] for t in tokenize(query) if t in term_ids]
+        if known:
+            scores = np.bincount(
+                np.concatenate([self._docs("terms", t) for t in known]),
+                minlength=self.size
+            ).astype(np.int32)
+            if (scores == len(known)).any():
+                scores[scores < len(known)] = 0
+        else:
+            scores = np.zeros(self.size, dtype=np.int32)
+        if cpc_prefixes:
+            if not known:
+                scores[:] = 1
+            scores[~self._cpc_mask(cpc_prefixes)] = 0
+        return scores
+
+    def search(
+        self,
+        query: str,
+        max_results: int = 10,
+        cpc_prefixes: Optional[List[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """Best keyword matches, most recently granted first among equals"""
+        scores = self._scores(query, cpc_prefixes)
+        matches = np.flatnonzero(scores)
+        if not len(matches):
+            return []
+        # int64 so negating the NO_DATE sentinel cannot overflow
+        order = np.lexsort((
+            -self.filing[matches].astype(np.int64),
+            -self.grant[matches].astype(np.int64),
+            -scores[matches]
+        ))
+        today = (date.today() - EPOCH).days
+
+        results = []
+        for doc in matches[order[:max_results]]:
+            number = self._string("numbers", doc)
+            granted = self.grant[doc] != NO_DATE
+            status = "Pending" if not granted else ("Active" if self.expiry[doc] > today else "Expired")
+            results.append({
+                "patent_number": f"US{number}" if granted else number,
+                "title": self._string("titles", doc),
+                "assignee": self.assignees[self.assignee[doc]],
+                "filing_date": _iso(self.filing[doc]),
+                "grant_date": _iso(self.grant[doc]),
+                "expiry_date": _iso(self.expiry[doc]),
+                "status": status,
+                "url": f"https://patents.google.com/patent/US{number}"
+            })
+        return results
+
+    def landscape(
+        self,
+        query: str,
+        cpc_prefixes: Optional[List[str]] = None,
+        expiring_within_years: int = 5,
+        top_assignees: int = 5
+    ) -> Dict[str, Any]:
+        """Status counts and top holders over every matching patent"""
+        matches = np.flatnonzero(self._scores(query, cpc_prefixes))
+        today = (date.today() - EPOCH).days
+        horizon = _add_years(today, expiring_within_years)
+
+        grant = self.grant[matches]
+        expiry = self.expiry[matches]
+        granted = grant != NO_DATE
+        active = granted & (expiry > today)
+
+        holders = np.bincount(self.assignee[matches], minlength=len(self.assignees))
+        holders[0] = 0
+        top = np.argsort(-holders)[:top_assignees]
+
+        return {
+            "total": int(len(matches)),
+            "active": int(active.sum()),
+            "pending": int((~granted).sum()),
+            "expired": int((granted & ~active).sum()),
+            f"expiring_within_{expiring_within_years}y": int((active & (expiry <= horizon)).sum()),
+            "top_assignees": [
+                {"assignee": self.assignees[i], "patents": int(holders[i])}
+                for i in top if holders[i]
+            ]
+        }
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Build and query the local patent index")
+    parser.add_argument("--index", default="data/patents", help="Index directory")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser("build", help="Build from a directory of PatentsView TSV files")
+    build.add_argument("source")
+    build.add_argument("--cpc", default="", help="Comma-separated CPC prefixes to keep, e.g. A61K,A61P")
+
+    search = commands.add_parser("search", help="Search the index")
+    search.add_argument("query")
+    search.add_argument("--limit", type=int, default=10)
+    search.add_argument("--cpc", default="")
+
+    args = parser.parse_args(argv)
+    cpc = [p for p in args.cpc.split(",") if p]
+    if args.command == "build":
+        print(json.dumps(build_patent_index(args.source, args.index, cpc)))
+    else:
+        index = PatentIndex(args.index)
+        print(json.dumps(index.landscape(args.query, cpc)))
+        for patent in index.search(args.query, args.limit, cpc):
+            print(f"{patent['patent_number']:<14} {patent['status']:<8} {patent['assignee'][:30]:<30} {patent['title']}")
+
+if __name__ == "__main__":
+    main()
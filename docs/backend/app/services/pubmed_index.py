@@ -0,0 +1,267 @@
+import argparse
+import gzip
+import json
+import os
+import sqlite3
+from datetime import datetime as dt
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from lxml import etree
+from .trial_index import fts_query
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    pmid INTEGER PRIMARY KEY,
+    title TEXT,
+    abstract TEXT,
+    mesh TEXT,
+    journal TEXT,
+    pubdate TEXT,
+    year INTEGER,
+    authors TEXT,
+    doi TEXT
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+    title, abstract, mesh,
+    content='articles', content_rowid='pmid'
+);
+CREATE TRIGGER IF NOT EXISTS articles_ai AFTER INSERT ON articles BEGIN
+    INSERT INTO articles_fts(rowid, title, abstract, mesh) VALUES (new.pmid, new.title, new.abstract, new.mesh);
+END;
+CREATE TRIGGER IF NOT EXISTS articles_ad AFTER DELETE ON articles BEGIN
+    INSERT INTO articles_fts(articles_fts, rowid, title, abstract, mesh)
+    VALUES ('delete', old.pmid, old.title, old.abstract, old.mesh);
+END;
+CREATE TABLE IF NOT EXISTS ingested_files (
+    name TEXT PRIMARY KEY,
+    articles INTEGER,
+    deleted INTEGER,
+    ingested_at TEXT
+);
+"""
+
+# Column weights for bm25(): title, abstract, MeSH terms
+BM25_WEIGHTS = (10.0, 3.0, 5.0)
+
+def _text(elem: Optional[etree._Element]) -> str:
+    """All text under an element (titles may contain inline markup)"""
+    return " ".join("".join(elem.itertext()).split()) if elem is not None else ""
+
+def _pubdate(article: etree._Element) -> Tuple[str, Optional[int]]:
+    date = article.find("Journal/JournalIssue/PubDate")
+    if date is None:
+        return "", None
+    medline_date = date.findtext("MedlineDate")
+    if medline_date:
+        year = medline_date[:4]
+        return medline_date, int(year) if year.isdigit() else None
+    parts = [date.findtext(tag) for tag in ("Year", "Month", "Day")]
+    year = parts[0]
+    return " ".join(p for p in parts if p), int(year) if year and year.isdigit() else None
+
+def parse_medline_article(elem: etree._Element) -> Dict[str, Any]:
+    """Extract the indexed fields of a PubmedArticle element"""
+    citation = elem.find("MedlineCitation")
+    article = citation.find("Article")
+    pubdate, year = _pubdate(article)
+
+    authors = []
+    for author in article.iterfind("AuthorList/Author"):
+        name = author.findtext("CollectiveName") or " ".join(
+            p for p in (author.findtext("LastName"), author.findtext("Initials")) if p
+        )
+        if name:
+            authors.append(name)
+
+    doi = elem.findtext("PubmedData/ArticleIdList/ArticleId[@IdType='doi']") or \
+        article.findtext("ELocationID[@EIdType='doi']") or ""
+
+    return {
+        "pmid": int(citation.findtext("PMID")),
+        "title": _text(article.find("ArticleTitle")),
+        "abstract": " ".join(_text(part) for part in article.iterfind("Abstract/AbstractText")),
+        "mesh": "; ".join(
+            _text(heading) for heading in citation.iterfind("MeshHeadingList/MeshHeading/DescriptorName")
+        ),
+        "journal": article.findtext("Journal/Title") or "",
+        "pubdate": pubdate,
+        "year": year,
+        "authors": "; ".join(authors),
+        "doi": doi
+    }
+
+def iter_medline(path: str) -> Iterator[Tuple[str, Any]]:
+    """Stream ("article", fields) and ("delete", pmids) from a MEDLINE XML file
+
+    Elements are cleared as soon as they are parsed, so memory stays flat
+    however large the file is.
+    """
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rb") as f:
+        for _, elem in etree.iterparse(f, events=("end",), tag=("PubmedArticle", "DeleteCitation")):
+            if elem.tag == "PubmedArticle":
+                yield "article", parse_medline_article(elem)
+            else:
+                yield "delete", [int(pmid.text) for pmid in elem.iterfind("PMID")]
+
+            elem.clear()
+            while elem.getprevious() is not None:
+                del elem.getparent()[0]
+
+class PubMedIndex:
+    """On-disk SQLite FTS5 index of MEDLINE baseline and update files"""
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.executescript(SCHEMA)
+        finally:
+            conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        # One connection per call so searches can run in worker threads
+        conn = sqlite3.connect(self.path)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def ingest_file(self, path: str, batch_size: int = 1000, force: bool = False) -> Dict[str, Any]:
+        """Apply one baseline or update file; files already applied are skipped
+
+        Update files must be applied in release order: later versions of a
+        citation replace earlier ones and DeleteCitation removes them.
+        """
+        name = os.path.basename(path)
+        conn = self._connect()
+        try:
+            if not force and conn.execute("SELECT 1 FROM ingested_files WHERE name = ?", (name,)).fetchone():
+                return {"file": name, "skipped": True}
+
+            stats = {"file": name, "articles": 0, "deleted": 0}
+            batch = []
+            for kind, payload in iter_medline(path):
+                if kind == "delete":
+                    self._write(conn, batch)
+                    batch = []
+                    with conn:
+                        conn.executemany("DELETE FROM articles WHERE pmid = ?", [(pmid,) for pmid in payload])
+                    stats["deleted"] += len(payload)
+                    continue
+
+                batch.append(payload)
+                stats["articles"] += 1
+                if len(batch) >= batch_size:
+                    self._write(conn, batch)
+                    batch = []
+            self._write(conn, batch)
+
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO ingested_files VALUES (?, ?, ?, ?)",
+                    (name, stats["articles"], stats["deleted"], dt.now().isoformat())
+                )
+            return stats
+        finally:
+            conn.close()
+
+    def _write(self, conn: sqlite3.Connection, batch: List[Dict[str, Any]]):
+        if not batch:
+            return
+        pmids = [(article["pmid"],) for article in batch]
+        with conn:
+            # Delete then insert so the FTS delete trigger sees the old version
+            conn.executemany("DELETE FROM articles WHERE pmid = ?", pmids)
+            conn.executemany(
+                """INSERT INTO articles (pmid, title, abstract, mesh, journal, pubdate, year, authors, doi)
+                VALUES (:pmid, :title, :abstract, :mesh, :journal, :pubdate, :year, :authors, :doi)""",
+                batch
+            )
+
+    def search(self, query: str, max_results: int = 10, min_year: Optional[int] = None) -> List[Dict[str, Any]]:
+        """BM25-rank articles over title, abstract and MeSH terms
+
+        Requires all query terms to match, falling back to any term.
+        """
+        results = self._search(fts_query(query), max_results, min_year)
+        if not results:
+            results = self._search(fts_query(query, any_term=True), max_results, min_year)
+        return results
+
+    def _search(self, match: str, max_results: int, min_year: Optional[int]) -> List[Dict[str, Any]]:
+        if not match:
+            return []
+
+        sql = """
+            SELECT a.* FROM articles_fts
+            JOIN articles a ON a.pmid = articles_fts.rowid
+            WHERE articles_fts MATCH ?
+        """
+        params: List[Any] = [match]
+        if min_year:
+            sql += " AND a.year >= ?"
+            params.append(min_year)
+        sql += f" ORDER BY bm25(articles_fts, {', '.join(map(str, BM25_WEIGHTS))}) LIMIT ?"
+        params.append(max_results)
+
+        conn = self._connect()
+        try:
+            rows = conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+        return [self._row_to_result(row) for row in rows]
+
+    def _row_to_result(self, row: sqlite3.Row) -> Dict[str, Any]:
+        # Same shape as the E-utilities results, plus the abstract
+        pmid = str(row["pmid"])
+        return {
+            "pmid": pmid,
+            "title": row["title"],
+            "authors": row["authors"].split("; ")[:3] if row["authors"] else [],
+            "source": row["journal"],
+            "pubdate": row["pubdate"],
+            "doi": row["doi"],
+            "abstract": row["abstract"],
+            "url": f"https://pubmed.ncbi.nlm.nih.gov/{pmid}/"
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get index size and the files applied so far"""
+        conn = self._connect()
+        try:
+            articles = conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+            files, last_file = conn.execute("SELECT COUNT(*), MAX(name) FROM ingested_files").fetchone()
+        finally:
+            conn.close()
+        return {"path": self.path, "articles": articles, "files": files, "last_file": last_file}
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Build and query the local PubMed index")
+    parser.add_argument("--db", default="data/pubmed.db", help="Index database path")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    ingest = commands.add_parser("ingest", help="Apply MEDLINE baseline/update files (.xml or .xml.gz)")
+    ingest.add_argument("files", nargs="+")
+    ingest.add_argument("--force", action="store_true", help="Re-apply files already ingested")
+
+    search = commands.add_parser("search", help="Search the index")
+    search.add_argument("query")
+    search.add_argument("--limit", type=int, default=10)
+
+    commands.add_parser("stats", help="Show index statistics")
+
+    args = parser.parse_args(argv)
+    index = PubMedIndex(args.db)
+    if args.command == "ingest":
+        # Release file names sort in the order they must be applied
+        for path in sorted(args.files, key=os.path.basename):
+            print(json.dumps(index.ingest_file(path, force=args.force)))
+    elif args.command == "search":
+        for article in index.search(args.query, args.limit):
+            print(f"{article['pmid']:>9}  {article['pubdate'][:4]:<4}  {article['title']}")
+    else:
+        print(json.dumps(index.get_stats()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+import argparse
+import json
+import os
+import re
+import sqlite3
+import zipfile
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+from .clinical_trials_client import parse_study
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS studies (
+    id INTEGER PRIMARY KEY,
+    nct_id TEXT UNIQUE NOT NULL,
+    title TEXT,
+    conditions TEXT,
+    interventions TEXT,
+    phase TEXT,
+    status TEXT,
+    last_update TEXT
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS studies_fts USING fts5(
+    title, conditions, interventions, phase, status,
+    content='studies', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS studies_ai AFTER INSERT ON studies BEGIN
+    INSERT INTO studies_fts(rowid, title, conditions, interventions, phase, status)
+    VALUES (new.id, new.title, new.conditions, new.interventions, new.phase, new.status);
+END;
+CREATE TRIGGER IF NOT EXISTS studies_ad AFTER DELETE ON studies BEGIN
+    INSERT INTO studies_fts(studies_fts, rowid, title, conditions, interventions, phase, status)
+    VALUES ('delete', old.id, old.title, old.conditions, old.interventions, old.phase, old.status);
+END;
+CREATE TRIGGER IF NOT EXISTS studies_au AFTER UPDATE ON studies BEGIN
+    INSERT INTO studies_fts(studies_fts, rowid, title, conditions, interventions, phase, status)
+    VALUES ('delete', old.id, old.title, old.conditions, old.interventions, old.phase, old.status);
+    INSERT INTO studies_fts(rowid, title, conditions, interventions, phase, status)
+    VALUES (new.id, new.title, new.conditions, new.interventions, new.phase, new.status);
+END;
+"""
+
+UPSERT = """
+INSERT INTO studies (nct_id, title, conditions, interventions, phase, status, last_update)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(nct_id) DO UPDATE SET
+    title = excluded.title,
+    conditions = excluded.conditions,
+    interventions = excluded.interventions,
+    phase = excluded.phase,
+    status = excluded.status,
+    last_update = excluded.last_update
+WHERE excluded.last_update > studies.last_update
+"""
+
+def iter_study_records(path: str) -> Iterator[Dict[str, Any]]:
+    """Stream raw v2 study records from a bulk export
+
+    Accepts the ClinicalTrials.gov zip of per-study JSON files, a directory
+    of such files, a JSON Lines file, or a JSON file holding one study, a
+    list of studies or an API page ({"studies": [...]}).
+    """
+    if os.path.isdir(path):
+        for root, _, files in os.walk(path):
+            for name in sorted(files):
+                if name.endswith((".json", ".jsonl", ".ndjson")):
+                    yield from iter_study_records(os.path.join(root, name))
+    elif zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            for name in archive.namelist():
+                if name.endswith(".json"):
+                    with archive.open(name) as f:
+                        yield from _studies_in(json.load(f))
+    elif path.endswith((".jsonl", ".ndjson")):
+        with open(path) as f:
+            for line in f:
+                if line.strip():
+                    yield from _studies_in(json.loads(line))
+    else:
+        with open(path) as f:
+            yield from _studies_in(json.load(f))
+
+def _studies_in(data: Any) -> Iterator[Dict[str, Any]]:
+    if isinstance(data, list):
+        for item in data:
+            yield from _studies_in(item)
+    elif "studies" in data:
+        yield from data["studies"]
+    else:
+        yield data
+
+def fts_query(text: str, any_term: bool = False) -> str:
+    """Turn free text into an FTS5 query of quoted terms"""
+    terms = re.findall(r"\w+", text.lower())
+    return f" {'OR' if any_term else 'AND'} ".join(f'"{term}"' for term in terms)
+
+class TrialIndex:
+    """On-disk SQLite FTS5 index of ClinicalTrials.gov studies"""
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.executescript(SCHEMA)
+        finally:
+            conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        # One connection per call so searches can run in worker threads
+        conn = sqlite3.connect(self.path)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def ingest(self, records: Iterable[Dict[str, Any]], batch_size: int = 1000) -> Dict[str, int]:
+        """Upsert raw study records, skipping ones not updated since last ingest"""
+        stats = {"seen": 0, "written": 0}
+        conn = self._connect()
+        try:
+            batch = []
+            for record in records:
+                study = parse_study(record)
+                if not study["nct_id"]:
+                    continue
+                stats["seen"] += 1
+                batch.append((
+                    study["nct_id"],
+                    study["title"],
+                    "; ".join(study["condition"]),
+                    "; ".join(study["interventions"]),
+                    study["phase"],
+                    study["status"],
+                    study["last_update"]
+                ))
+                if len(batch) >= batch_size:
+                    stats["written"] += self._write(conn, batch)
+                    batch = []
+            if batch:
+                stats["written"] += self._write(conn, batch)
+        finally:
+            conn.close()
+        stats["skipped"] = stats["seen"] - stats["written"]
+        return stats
+
+    def _write(self, conn: sqlite3.Connection, batch: List[tuple]) -> int:
+        with conn:
+            # rowcount excludes the FTS rows written by triggers
+            return conn.executemany(UPSERT, batch).rowcount
+
+    def search(
+        self,
+        query: str,
+        max_results: int = 10,
+        phases: Optional[List[str]] = None,
+        statuses: Optional[List[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """Rank studies matching all query terms, or any term if none match all
+
+        phases and statuses filter on display labels (e.g. "Phase 2", "Recruiting").
+        """
+        results = self._search(fts_query(query), max_results, phases, statuses)
+        if not results:
+            results = self._search(fts_query(query, any_term=True), max_results, phases, statuses)
+        return results
+
+    def _search(
+        self,
+        match: str,
+        max_results: int,
+        phases: Optional[List[str]],
+        statuses: Optional[List[str]]
+    ) -> List[Dict[str, Any]]:
+        if not match:
+            return []
+
+        sql = """
+            SELECT s.* FROM studies_fts
+            JOIN studies s ON s.id = studies_fts.rowid
+            WHERE studies_fts MATCH ?
+        """
+        params: List[Any] = [match]
+        if phases:
+            sql += f" AND s.phase IN ({','.join('?' * len(phases))})"
+            params.extend(phases)
+        if statuses:
+            sql += f" AND s.status IN ({','.join('?' * len(statuses))})"
+            params.extend(statuses)
+        sql += " ORDER BY bm25(studies_fts, 10.0, 5.0, 5.0, 1.0, 1.0) LIMIT ?"
+        params.append(max_results)
+
+        conn = self._connect()
+        try:
+            rows = conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+        return [self._row_to_trial(row) for row in rows]
+
+    def _row_to_trial(self, row: sqlite3.Row) -> Dict[str, Any]:
+        return {
+            "nct_id": row["nct_id"],
+            "title": row["title"],
+            "condition": row["conditions"].split("; ") if row["conditions"] else [],
+            "interventions": row["interventions"].split("; ") if row["interventions"] else [],
+            "phase": row["phase"],
+            "status": row["status"],
+            "last_update": row["last_update"],
+            "url": f"https://clinicaltrials.gov/study/{row['nct_id']}"
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get index size and the newest update date it holds"""
+        conn = self._connect()
+        try:
+            count, last_update = conn.execute("SELECT COUNT(*), MAX(last_update) FROM studies").fetchone()
+        finally:
+            conn.close()
+        return {"path": self.path, "studies": count, "last_update": last_update}
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Build and query the local ClinicalTrials.gov index")
+    parser.add_argument("--db", default="data/trials.db", help="Index database path")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    ingest = commands.add_parser("ingest", help="Ingest a bulk JSON export (zip, directory, .json or .jsonl)")
+    ingest.add_argument("source")
+
+    search = commands.add_parser("search", help="Search the index")
+    search.add_argument("query")
+    search.add_argument("--limit", type=int, default=10)
+
+    commands.add_parser("stats", help="Show index statistics")
+
+    args = parser.parse_args(argv)
+    index = TrialIndex(args.db)
+    if args.command == "ingest":
+        print(json.dumps(index.ingest(iter_study_records(args.source))))
+    elif args.command == "search":
+        for trial in index.search(args.query, args.limit):
+            print(f"{trial['nct_id']}  {trial['phase']:<16} {trial['status']:<24} {trial['title']}")
+    else:
+        print(json.dumps(index.get_stats()))
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,319 @@
 import aiohttp
-from bs4 import BeautifulSoup
-from typing import List, Dict, Any
+import asyncio
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Optional, Callable, Awaitable, AsyncIterator, Iterable, Tuple
 from datetime import datetime as dt
+from urllib.parse import urlsplit
+from urllib.robotparser import RobotFileParser
+import lxml.html
+from lxml import etree
+from .cache_manager import CacheManager, MemoryCache, TieredCache, make_cache_key
+from .clinical_trials_client import ClinicalTrialsClient, HttpTransport
+from ..core.rate_limiter import RateLimiter
+from ..core.circuit_breaker import CircuitBreaker, CircuitOpenError
+from ..utils.singleflight import SingleFlight
+from ..utils.batcher import MicroBatcher
+from ..utils.helpers import normalize_url
+from ..utils.constants import (
+    CACHE_PREFIX_PUBMED, CACHE_PREFIX_PUBMED_RECORD, CACHE_PREFIX_TRIALS, CACHE_PREFIX_PATENTS,
+    CACHE_PREFIX_PATENT_LANDSCAPE
+)
+
+EUTILS_BASE_URL = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/"
+
+def extract_page_text(html: bytes, encoding: Optional[str] = None, max_chars: int = 5000) -> Dict[str, Any]:
+    """Extract the title and visible text of an HTML page
+    
+    Module-level so it can run in a worker process.
+    """
+    started = time.perf_counter()
+    title, text = "", ""
+    if html.strip():
+        doc = lxml.html.fromstring(html, parser=lxml.html.HTMLParser(encoding=encoding))
+        etree.strip_elements(doc, "script", "style", "noscript", etree.Comment, with_tail=False)
+        title = (doc.findtext(".//title") or "").strip()
+        text = " ".join(" ".join(doc.itertext()).split())[:max_chars]
+    return {
+        "title": title,
+        "content": text,
+        "parse_ms": round((time.perf_counter() - started) * 1000, 2)
+    }
 
 class WebScraper:
-    def __init__(self):
+    def __init__(self, config=None, cache_manager: Optional[CacheManager] = None):
+        self.config = config
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         }
         self.timeout = aiohttp.ClientTimeout(total=30)
+        
+        # One pooled session per process, opened and closed by the app lifespan
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._session_loop = None
+        self.sessions_created = 0
+        
+        # Identical concurrent searches share one upstream fetch
+        self.inflight = SingleFlight()
+        
+        # Normalized search results, cached per source
+        self.cache = TieredCache(cache_manager, max_entries=self._setting("SOURCE_CACHE_MAX_ENTRIES", 2000))
+        self.cache_ttls = {
+            CACHE_PREFIX_PUBMED: self._setting("CACHE_TTL_PUBMED", 86400),
+            CACHE_PREFIX_TRIALS: self._setting("CACHE_TTL_TRIALS", 21600),
+            CACHE_PREFIX_PATENTS: self._setting("CACHE_TTL_PATENTS", 604800)
+        }
+        
+        # Fail fast to cache or mock data while a source is unhealthy
+        self.breakers = {
+            prefix: CircuitBreaker(
+                name,
+                failure_rate=self._setting("BREAKER_FAILURE_RATE", 0.5),
+                min_requests=self._setting("BREAKER_MIN_REQUESTS", 5),
+                slow_call_seconds=self._setting("BREAKER_SLOW_CALL_SECONDS", 5.0),
+                open_seconds=self._setting("BREAKER_OPEN_SECONDS", 30),
+                call_timeout=self._setting("SOURCE_TIMEOUT_SECONDS", 10)
+            )
+            for prefix, name in (
+                (CACHE_PREFIX_PUBMED, "pubmed"),
+                (CACHE_PREFIX_TRIALS, "clinical_trials"),
+                (CACHE_PREFIX_PATENTS, "patents")
+            )
+        }
+        
+        # NCBI allows 3 requests/s per client, or 10/s with an API key. The
+        # bucket is shared through Redis so all workers stay under the limit.
+        self.ncbi_api_key = self._setting("PUBMED_API_KEY", "")
+        self.ncbi_limiter = RateLimiter(
+            10 if self.ncbi_api_key else 3,
+            time_window=1,
+            redis_url=self._setting("REDIS_URL", None) if self._setting("RATE_LIMIT_USE_REDIS", False) else None,
+            name="ncbi:eutils"
+        )
+        
+        # HTML extraction is CPU-bound, so it runs off the event loop
+        self.scrape_max_bytes = self._setting("SCRAPE_MAX_BYTES", 2 * 1024 * 1024)
+        self.parse_workers = self._setting("SCRAPE_PARSE_WORKERS", 2)
+        self._parse_pool: Optional[ProcessPoolExecutor] = None
+        
+        # Bulk scraping politeness, shared by every scrape_many call: total
+        # and per-domain concurrency, per-domain spacing and robots.txt rules
+        self.scrape_concurrency = self._setting("SCRAPE_CONCURRENCY", 20)
+        self.scrape_per_domain = self._setting("SCRAPE_PER_DOMAIN", 2)
+        self.max_tracked_domains = self._setting("SCRAPE_MAX_DOMAINS", 1000)
+        self._scrape_loop = None
+        self._scrape_limit: Optional[asyncio.Semaphore] = None
+        self._domain_limits: Dict[str, asyncio.Semaphore] = {}
+        self._domain_active: Dict[str, int] = {}
+        self._domain_next_at: Dict[str, float] = {}
+        self._robots = MemoryCache(
+            max_entries=self.max_tracked_domains,
+            default_ttl=self._setting("ROBOTS_CACHE_TTL", 3600)
+        )
+        
+        self.trials_client = ClinicalTrialsClient(
+            HttpTransport(self._get_session, breaker=self.breakers[CACHE_PREFIX_TRIALS]),
+            page_size=self._setting("CLINICAL_TRIALS_PAGE_SIZE", 100)
+        )
+        
+        # "local" serves trial searches from the bulk-data index instead of the API
+        self.trial_index = None
+        if self._setting("CLINICAL_TRIALS_BACKEND", "api") == "local":
+            from .trial_index import TrialIndex
+            self.trial_index = TrialIndex(self._setting("CLINICAL_TRIALS_INDEX_PATH", "data/trials.db"))
+        
+        # "local" serves PubMed searches from the MEDLINE baseline index
+        self.pubmed_index = None
+        if self._setting("PUBMED_BACKEND", "api") == "local":
+            from .pubmed_index import PubMedIndex
+            self.pubmed_index = PubMedIndex(self._setting("PUBMED_INDEX_PATH", "data/pubmed.db"))
+        
+        # Patent searches need a local index; without one they fall back to mock data
+        self.patent_index = None
+        if self._setting("PATENT_INDEX_PATH", ""):
+            from .patent_index import PatentIndex
+            try:
+                self.patent_index = PatentIndex(self._setting("PATENT_INDEX_PATH", ""))
+            except Exception as e:
+                print(f"Patent index unavailable, using mock patents: {e!r}")
+        
+        # PMIDs wanted by concurrent searches share one esummary call
+        self.pubmed_batch_window = self._setting("PUBMED_BATCH_WINDOW_MS", 5) / 1000
+        self.esummary_batcher = MicroBatcher(
+            self._esummary_batch,
+            window=self.pubmed_batch_window,
+            max_batch=self._setting("PUBMED_BATCH_MAX_IDS", 200)
+        )
+    
+    def _setting(self, name: str, default: Any) -> Any:
+        """Read a setting, falling back to a default when run without config"""
+        return getattr(self.config, name, default) if self.config else default
+    
+    async def start(self):
+        """Open the shared HTTP session"""
+        if self._session is not None and not self._session.closed:
+            return
+        
+        connector = aiohttp.TCPConnector(
+            limit=self._setting("SCRAPER_POOL_SIZE", 100),
+            limit_per_host=self._setting("SCRAPER_POOL_PER_HOST", 10),
+            ttl_dns_cache=self._setting("SCRAPER_DNS_CACHE_TTL", 300),
+            keepalive_timeout=self._setting("SCRAPER_KEEPALIVE_TIMEOUT", 30),
+            enable_cleanup_closed=True
+        )
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=self.timeout,
+            headers=self.headers
+        )
+        self._session_loop = asyncio.get_running_loop()
+        self.sessions_created += 1
+    
+    async def close(self):
+        """Close the shared HTTP session"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._session_loop = None
+        
+        if self._parse_pool is not None:
+            self._parse_pool.shutdown(wait=False, cancel_futures=True)
+            self._parse_pool = None
+    
+    async def _discard_session(self):
+        """Drop a session opened on another event loop, closing its sockets"""
+        session, self._session = self._session, None
+        if session is None or session.closed:
+            return
+        
+        # The session cannot be awaited from this loop; close its connector
+        # directly (a no-op for transports whose loop is already closed)
+        connector = session.connector
+        session.detach()
+        if connector is not None:
+            try:
+                await connector.close()
+            except Exception as e:
+                print(f"Error closing stale connector: {e}")
+    
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Get the shared session, opening one if the lifespan has not"""
+        # Sessions are bound to their event loop (test clients may run several)
+        if self._session_loop is not asyncio.get_running_loop():
+            await self._discard_session()
+        if self._session is None or self._session.closed:
+            await self.start()
+        return self._session
+    
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """Get connection pool utilization"""
+        if self._session is None or self._session.closed:
+            return {"open": False, "sessions_created": self.sessions_created}
+        
+        connector = self._session.connector
+        idle = getattr(connector, "_conns", {})
+        return {
+            "open": True,
+            "sessions_created": self.sessions_created,
+            "limit": connector.limit,
+            "limit_per_host": connector.limit_per_host,
+            "in_use": len(getattr(connector, "_acquired", ())),
+            "idle": sum(len(conns) for conns in idle.values()),
+            "hosts": len(idle)
+        }
+    
+    def _eutils_params(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Add the identification NCBI asks E-utilities clients to send"""
+        params = {**params, "tool": self._setting("NCBI_TOOL", "pharma-ai")}
+        email = self._setting("NCBI_EMAIL", "")
+        if email:
+            params["email"] = email
+        if self.ncbi_api_key:
+            params["api_key"] = self.ncbi_api_key
+        return params
+    
+    async def _eutils_request(
+        self,
+        endpoint: str,
+        params: Dict[str, Any],
+        method: str = "GET",
+        max_retries: int = 3
+    ) -> Dict[str, Any]:
+        """Call an E-utilities endpoint within NCBI's request rate
+        
+        Requests over the rate wait for a slot rather than failing, and a 429
+        from NCBI is retried after its Retry-After delay. POST sends the
+        parameters as a form, for ID lists too long for a URL.
+        """
+        session = await self._get_session()
+        params = self._eutils_params(params)
+        url = f"{EUTILS_BASE_URL}{endpoint}"
+        
+        async def send() -> Tuple[Optional[str], Any]:
+            if method == "POST":
+                request = session.post(url, data=params)
+            else:
+                request = session.get(url, params=params)
+            async with request as response:
+                if response.status == 429:
+                    # NCBI throttling us is not the source failing
+                    return response.headers.get("Retry-After", ""), None
+                response.raise_for_status()
+                return None, await response.json(content_type=None)
+        
+        breaker = self.breakers[CACHE_PREFIX_PUBMED]
+        for attempt in range(max_retries + 1):
+            # Only the HTTP round-trip counts toward the breaker, not our
+            # own rate limiting or Retry-After waits
+            await self.ncbi_limiter.acquire()
+            retry_after, data = await breaker.call(send)
+            if retry_after is None:
+                return data
+            if attempt == max_retries:
+                raise RuntimeError(f"NCBI rate limit persisted after {max_retries} retries")
+            await asyncio.sleep(float(retry_after) if retry_after.isdigit() else 2 ** attempt)
+    
+    def get_breaker_stats(self) -> Dict[str, Any]:
+        """Get circuit breaker state per source"""
+        return {breaker.name: breaker.get_stats() for breaker in self.breakers.values()}
+    
+    async def _cached_search(
+        self,
+        prefix: str,
+        search_query: str,
+        max_results: int,
+        force_refresh: bool,
+        fetch: Callable[[str, int], Awaitable[List[Dict[str, Any]]]]
+    ) -> List[Dict[str, Any]]:
+        """Serve a source search from cache, fetching once on a miss
+        
+        Fetchers call the source through its circuit breaker; errors and an
+        open breaker both return empty results, which callers replace with
+        mock data. Empty results are never cached.
+        """
+        key = make_cache_key(prefix, {"query": search_query, "max_results": max_results})
+        
+        if not force_refresh:
+            cached = await self.cache.get(key)
+            if cached is not None:
+                return cached
+        
+        breaker = self.breakers[prefix]
+        
+        async def load():
+            try:
+                results = await fetch(search_query, max_results)
+            except CircuitOpenError:
+                return []
+            except Exception as e:
+                print(f"{breaker.name} search error: {e!r}")
+                return []
+            if results:
+                await self.cache.set(key, results, ttl=self.cache_ttls[prefix])
+            return results
+        
+        # Identical concurrent searches share one upstream fetch
+        return await self.inflight.do(key, load)
     
     def _extract_key_terms(self, query: str) -> str:
         """Extract main topic from query (first 5 important words)"""
@@ -19,59 +324,109 @@ class WebScraper:
         key_words = [w for w in words if w not in stop_words and len(w) > 3][:5]
         return ' '.join(key_words)
     
-    async def search_pubmed(self, query: str, max_results: int = 10) -> List[Dict[str, Any]]:
+    async def search_pubmed(self, query: str, max_results: int = 10, force_refresh: bool = False) -> List[Dict[str, Any]]:
         """Search PubMed for research papers"""
         # Extract only key terms
         search_query = self._extract_key_terms(query)
+        results = await self._cached_search(
+            CACHE_PREFIX_PUBMED, search_query, max_results, force_refresh, self._fetch_pubmed
+        )
+        return results if results else self._get_mock_pubmed_results(search_query)
+    
+    async def _fetch_pubmed(self, search_query: str, max_results: int) -> List[Dict[str, Any]]:
+        """Fetch PubMed results"""
+        if self.pubmed_index is not None:
+            return await self.breakers[CACHE_PREFIX_PUBMED].call(
+                lambda: asyncio.to_thread(self.pubmed_index.search, search_query, max_results)
+            )
+        if not self.pubmed_batch_window:
+            return await self._fetch_pubmed_history(search_query, max_results)
         
-        base_url = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/"
+        data = await self._eutils_request("esearch.fcgi", {
+            "db": "pubmed",
+            "term": search_query,
+            "retmax": max_results,
+            "retmode": "json"
+        })
+        id_list = data.get("esearchresult", {}).get("idlist", [])
+        if not id_list:
+            return []
         
-        try:
-            search_url = f"{base_url}esearch.fcgi"
-            params = {
-                "db": "pubmed",
-                "term": search_query,
-                "retmax": max_results,
-                "retmode": "json"
-            }
+        records = await self._pubmed_records(id_list)
+        return [records[pmid] for pmid in id_list if pmid in records]
+    
+    async def _fetch_pubmed_history(self, search_query: str, max_results: int) -> List[Dict[str, Any]]:
+        """Fetch PubMed results through the E-utilities history server"""
+        # Keep the result set on the history server so the summary step
+        # references it by WebEnv instead of resending the ID list
+        data = await self._eutils_request("esearch.fcgi", {
+            "db": "pubmed",
+            "term": search_query,
+            "retmax": max_results,
+            "usehistory": "y",
+            "retmode": "json"
+        })
+        search = data.get("esearchresult", {})
+        if not search.get("idlist") or not search.get("webenv"):
+            return []
+        
+        data = await self._eutils_request("esummary.fcgi", {
+            "db": "pubmed",
+            "WebEnv": search["webenv"],
+            "query_key": search["querykey"],
+            "retmax": max_results,
+            "retmode": "json"
+        })
+        return self._parse_pubmed_summary(data)
+    
+    async def _pubmed_records(self, pmids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get summary records by PMID, from cache or a batched esummary"""
+        keys = [f"{CACHE_PREFIX_PUBMED_RECORD}:{pmid}" for pmid in pmids]
+        cached = await asyncio.gather(*(self.cache.get(key) for key in keys))
+        records = {pmid: record for pmid, record in zip(pmids, cached) if record is not None}
+        
+        missing = [pmid for pmid in pmids if pmid not in records]
+        if missing:
+            records.update(await self.esummary_batcher.load_many(missing))
+        return records
+    
+    async def _esummary_batch(self, pmids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Summarize a batch of PMIDs in one request and cache each record"""
+        data = await self._eutils_request("esummary.fcgi", {
+            "db": "pubmed",
+            "id": ",".join(pmids),
+            "retmode": "json"
+        }, method="POST")
+        
+        records = {record["pmid"]: record for record in self._parse_pubmed_summary(data)}
+        ttl = self.cache_ttls[CACHE_PREFIX_PUBMED]
+        await asyncio.gather(*(
+            self.cache.set(f"{CACHE_PREFIX_PUBMED_RECORD}:{pmid}", record, ttl=ttl)
+            for pmid, record in records.items()
+        ))
+        return records
+    
+    def _parse_pubmed_summary(self, data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Convert an esummary response into result dicts, in search order"""
+        records = data.get("result", {})
+        results = []
+        
+        for pmid in records.get("uids", []):
+            article = records.get(pmid)
+            if not article:
+                continue
             
-            async with aiohttp.ClientSession(timeout=self.timeout) as session:
-                async with session.get(search_url, params=params) as response:
-                    data = await response.json()
-                    id_list = data.get("esearchresult", {}).get("idlist", [])
-                
-                if not id_list:
-                    return self._get_mock_pubmed_results(search_query)
-                
-                summary_url = f"{base_url}esummary.fcgi"
-                params = {
-                    "db": "pubmed",
-                    "id": ",".join(id_list),
-                    "retmode": "json"
-                }
-                
-                async with session.get(summary_url, params=params) as response:
-                    data = await response.json()
-                    results = []
-                    
-                    for pmid, article in data.get("result", {}).items():
-                        if pmid == "uids":
-                            continue
-                        
-                        results.append({
-                            "pmid": pmid,
-                            "title": article.get("title", ""),
-                            "authors": [author.get("name", "") for author in article.get("authors", [])[:3]],
-                            "source": article.get("source", ""),
-                            "pubdate": article.get("pubdate", ""),
-                            "doi": article.get("elocationid", ""),
-                            "url": f"https://pubmed.ncbi.nlm.nih.gov/{pmid}/"
-                        })
-                    
-                    return results if results else self._get_mock_pubmed_results(search_query)
-        except Exception as e:
-            print(f"PubMed search error: {e}")
-            return self._get_mock_pubmed_results(search_query)
+            results.append({
+                "pmid": pmid,
+                "title": article.get("title", ""),
+                "authors": [author.get("name", "") for author in article.get("authors", [])[:3]],
+                "source": article.get("source", ""),
+                "pubdate": article.get("pubdate", ""),
+                "doi": article.get("elocationid", ""),
+                "url": f"https://pubmed.ncbi.nlm.nih.gov/{pmid}/"
+            })
+        
+        return results
     
     def _get_mock_pubmed_results(self, query: str) -> List[Dict[str, Any]]:
         """Return mock PubMed results"""
@@ -88,46 +443,29 @@ class WebScraper:
             for i in range(5)
         ]
     
-    async def search_clinical_trials(self, query: str, max_results: int = 10) -> List[Dict[str, Any]]:
+    async def search_clinical_trials(self, query: str, max_results: int = 10, force_refresh: bool = False) -> List[Dict[str, Any]]:
         """Search ClinicalTrials.gov"""
         # Extract key terms only
         search_query = self._extract_key_terms(query)
-        
-        try:
-            url = "https://clinicaltrials.gov/api/query/study_fields"
-            params = {
-                "expr": search_query,
-                "fields": "NCTId,BriefTitle,Condition,Phase,OverallStatus",
-                "max_rnk": max_results,
-                "fmt": "json"
-            }
-            
-            async with aiohttp.ClientSession(timeout=self.timeout) as session:
-                async with session.get(url, params=params) as response:
-                    if response.content_type == 'application/json':
-                        data = await response.json()
-                        studies = data.get("StudyFieldsResponse", {}).get("StudyFields", [])
-                        
-                        if not studies:
-                            return self._get_mock_clinical_trials(search_query)
-                        
-                        results = []
-                        for study in studies:
-                            results.append({
-                                "nct_id": study.get("NCTId", [""])[0],
-                                "title": study.get("BriefTitle", [""])[0],
-                                "condition": study.get("Condition", []),
-                                "phase": study.get("Phase", [""])[0],
-                                "status": study.get("OverallStatus", [""])[0],
-                                "url": f"https://clinicaltrials.gov/study/{study.get('NCTId', [''])[0]}"
-                            })
-                        
-                        return results
-                    else:
-                        return self._get_mock_clinical_trials(search_query)
-        except Exception as e:
-            print(f"Clinical trials search error: {e}")
-            return self._get_mock_clinical_trials(search_query)
+        results = await self._cached_search(
+            CACHE_PREFIX_TRIALS, search_query, max_results, force_refresh, self._fetch_clinical_trials
+        )
+        return results if results else self._get_mock_clinical_trials(search_query)
+    
+    async def _fetch_clinical_trials(self, search_query: str, max_results: int) -> List[Dict[str, Any]]:
+        """Fetch ClinicalTrials.gov results"""
+        if self.trial_index is not None:
+            return await self.breakers[CACHE_PREFIX_TRIALS].call(
+                lambda: asyncio.to_thread(self.trial_index.search, search_query, max_results)
+            )
+        return await self.trials_client.search(search_query, max_studies=max_results)
+    
+    @property
+    def trial_search_limit(self) -> int:
+        """How many trials an analysis should request from the current backend"""
+        if self.trial_index is not None:
+            return self._setting("CLINICAL_TRIALS_LOCAL_MAX_RESULTS", 1000)
+        return 10
     
     def _get_mock_clinical_trials(self, query: str) -> List[Dict[str, Any]]:
         """Return mock clinical trial results"""
@@ -147,9 +485,61 @@ class WebScraper:
             for i in range(5)
         ]
     
-    async def search_patents_uspto(self, query: str, max_results: int = 10) -> List[Dict[str, Any]]:
-        """Search USPTO patents"""
+    async def search_patents_uspto(self, query: str, max_results: int = 10, force_refresh: bool = False) -> List[Dict[str, Any]]:
+        """Search USPTO patents
+        
+        With a patent index, its results are returned even when empty, so
+        they agree with patent_landscape; mock patents are only used
+        without an index.
+        """
+        key_terms = self._extract_key_terms(query)
+        if self.patent_index is None:
+            return self._get_mock_patents(key_terms, max_results)
+        return await self._cached_search(
+            CACHE_PREFIX_PATENTS, key_terms, max_results, force_refresh, self._fetch_patents
+        )
+    
+    async def _fetch_patents(self, key_terms: str, max_results: int) -> List[Dict[str, Any]]:
+        """Fetch patent results from the local index"""
+        return await self.breakers[CACHE_PREFIX_PATENTS].call(
+            lambda: asyncio.to_thread(self.patent_index.search, key_terms, max_results)
+        )
+    
+    async def patent_landscape(self, query: str, force_refresh: bool = False) -> Optional[Dict[str, Any]]:
+        """Status counts and top holders over all matching patents, if indexed
+        
+        Cached like patent searches. Returns None without an index or when
+        the index cannot be read, so callers keep the search-based counts.
+        """
+        if self.patent_index is None:
+            return None
+        
         key_terms = self._extract_key_terms(query)
+        key = make_cache_key(CACHE_PREFIX_PATENT_LANDSCAPE, {"query": key_terms})
+        if not force_refresh:
+            cached = await self.cache.get(key)
+            if cached is not None:
+                return cached
+        
+        breaker = self.breakers[CACHE_PREFIX_PATENTS]
+        
+        async def load():
+            try:
+                landscape = await breaker.call(
+                    lambda: asyncio.to_thread(self.patent_index.landscape, key_terms)
+                )
+            except CircuitOpenError:
+                return None
+            except Exception as e:
+                print(f"{breaker.name} landscape error: {e!r}")
+                return None
+            await self.cache.set(key, landscape, ttl=self.cache_ttls[CACHE_PREFIX_PATENTS])
+            return landscape
+        
+        return await self.inflight.do(key, load)
+    
+    def _get_mock_patents(self, key_terms: str, max_results: int) -> List[Dict[str, Any]]:
+        """Return mock patent results"""
         return [
             {
                 "patent_number": f"US{10500000 + i}",
@@ -188,31 +578,158 @@ class WebScraper:
             }
         ]
     
+    async def _parse_html(self, html: bytes, encoding: Optional[str]) -> Dict[str, Any]:
+        """Run text extraction in the parse pool (or a thread without one)"""
+        if self.parse_workers <= 0:
+            return await asyncio.to_thread(extract_page_text, html, encoding)
+        if self._parse_pool is None:
+            self._parse_pool = ProcessPoolExecutor(max_workers=self.parse_workers)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._parse_pool, extract_page_text, html, encoding)
+    
     async def scrape_url(self, url: str) -> Dict[str, Any]:
         """Scrape content from URL"""
         try:
-            async with aiohttp.ClientSession(timeout=self.timeout) as session:
-                async with session.get(url, headers=self.headers) as response:
-                    html = await response.text()
-                    soup = BeautifulSoup(html, 'lxml')
-                    
-                    for script in soup(["script", "style"]):
-                        script.decompose()
-                    
-                    text = soup.get_text()
-                    lines = (line.strip() for line in text.splitlines())
-                    chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-                    text = ' '.join(chunk for chunk in chunks if chunk)
-                    
-                    return {
-                        "url": url,
-                        "title": soup.find("title").text if soup.find("title") else "",
-                        "content": text[:5000],
-                        "scraped_at": dt.now().isoformat()
-                    }
+            session = await self._get_session()
+            async with session.get(url) as response:
+                # Stop reading at the byte cap instead of buffering huge pages
+                body = bytearray()
+                async for chunk in response.content.iter_chunked(64 * 1024):
+                    body.extend(chunk)
+                    if len(body) >= self.scrape_max_bytes:
+                        break
+                encoding = response.charset
+            
+            page = await self._parse_html(bytes(body[:self.scrape_max_bytes]), encoding)
+            return {
+                "url": url,
+                **page,
+                "bytes": min(len(body), self.scrape_max_bytes),
+                "truncated": len(body) >= self.scrape_max_bytes,
+                "scraped_at": dt.now().isoformat()
+            }
         except Exception as e:
             return {
                 "url": url,
                 "error": str(e),
                 "scraped_at": dt.now().isoformat()
             }
+    
+    async def _fetch_robots(self, origin: str) -> RobotFileParser:
+        """Download and parse an origin's robots.txt"""
+        parser = RobotFileParser(f"{origin}/robots.txt")
+        try:
+            session = await self._get_session()
+            async with session.get(f"{origin}/robots.txt") as response:
+                if response.status in (401, 403):
+                    parser.disallow_all = True
+                elif response.status >= 400:
+                    parser.allow_all = True
+                else:
+                    parser.parse((await response.text(errors="replace")).splitlines())
+        except Exception:
+            # Unreachable robots.txt is treated as no restrictions
+            parser.allow_all = True
+        return parser
+    
+    async def _get_robots(self, origin: str) -> RobotFileParser:
+        """Get an origin's robots.txt rules, cached for ROBOTS_CACHE_TTL"""
+        parser = self._robots.get(origin)
+        if parser is not None:
+            return parser
+        
+        parser = await self.inflight.do(f"robots:{origin}", lambda: self._fetch_robots(origin))
+        self._robots.set(origin, parser)
+        return parser
+    
+    def _scrape_limits(self, domain: str) -> Tuple[asyncio.Semaphore, asyncio.Semaphore]:
+        """Shared total and per-domain semaphores for bulk scraping"""
+        loop = asyncio.get_running_loop()
+        if self._scrape_loop is not loop:
+            # Semaphores belong to the loop they were first used on
+            self._scrape_loop = loop
+            self._scrape_limit = asyncio.Semaphore(self.scrape_concurrency)
+            self._domain_limits = {}
+            self._domain_active = {}
+        
+        limit = self._domain_limits.get(domain)
+        if limit is None:
+            if len(self._domain_limits) >= self.max_tracked_domains:
+                self._prune_domains()
+            limit = self._domain_limits[domain] = asyncio.Semaphore(self.scrape_per_domain)
+        return self._scrape_limit, limit
+    
+    def _prune_domains(self):
+        """Forget domains with no requests in flight or pending spacing"""
+        now = time.monotonic()
+        for domain in list(self._domain_limits):
+            if not self._domain_active.get(domain) and self._domain_next_at.get(domain, 0.0) <= now:
+                del self._domain_limits[domain]
+                self._domain_active.pop(domain, None)
+                self._domain_next_at.pop(domain, None)
+    
+    async def _wait_for_domain(self, domain: str, delay: float):
+        """Space requests to one domain at least `delay` seconds apart"""
+        now = time.monotonic()
+        start = max(now, self._domain_next_at.get(domain, 0.0))
+        self._domain_next_at[domain] = start + delay
+        if start > now:
+            await asyncio.sleep(start - now)
+    
+    async def _scrape_politely(self, url: str, domain_delay: float, respect_robots: bool) -> Dict[str, Any]:
+        parts = urlsplit(url)
+        domain = parts.netloc.lower()
+        user_agent = self.headers["User-Agent"]
+        
+        delay = domain_delay
+        if respect_robots:
+            robots = await self._get_robots(f"{parts.scheme}://{domain}")
+            if not robots.can_fetch(user_agent, url):
+                return {"url": url, "error": "Disallowed by robots.txt", "scraped_at": dt.now().isoformat()}
+            delay = max(delay, float(robots.crawl_delay(user_agent) or 0))
+        
+        limit, domain_limit = self._scrape_limits(domain)
+        self._domain_active[domain] = self._domain_active.get(domain, 0) + 1
+        try:
+            async with domain_limit:
+                await self._wait_for_domain(domain, delay)
+                async with limit:
+                    return await self.scrape_url(url)
+        finally:
+            self._domain_active[domain] -= 1
+    
+    async def scrape_many(
+        self,
+        urls: Iterable[str],
+        domain_delay: Optional[float] = None,
+        respect_robots: bool = True
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Scrape many URLs, yielding each result as it completes
+        
+        URLs that normalize to the same form are fetched once, using (and
+        reported under) the first one given. Limits are shared by all
+        concurrent calls: at most SCRAPE_CONCURRENCY requests run at once and
+        at most SCRAPE_PER_DOMAIN to one domain, spaced domain_delay seconds
+        apart (or the robots.txt Crawl-delay if longer). Stopping iteration
+        early cancels the remaining requests.
+        """
+        if domain_delay is None:
+            domain_delay = self._setting("SCRAPE_DOMAIN_DELAY", 0.5)
+        
+        # Normalized forms only detect duplicates; the URL fetched is the
+        # caller's, since servers can treat the normalized one differently
+        unique: Dict[str, str] = {}
+        for url in urls:
+            if url:
+                unique.setdefault(normalize_url(url), url)
+        tasks = [
+            asyncio.ensure_future(self._scrape_politely(url, domain_delay, respect_robots))
+            for url in unique.values()
+        ]
+        
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
@@ -0,0 +1,75 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+class MicroBatcher:
+    """Merge key lookups from concurrent callers into batched calls
+
+    Keys requested within `window` seconds of each other are loaded together
+    by one call to fn(keys), split into chunks of at most max_batch keys.
+    fn returns a dict of the keys it found; missing keys resolve to None.
+    A key already waiting for a batch is shared rather than requested twice.
+    """
+
+    def __init__(
+        self,
+        fn: Callable[[List[str]], Awaitable[Dict[str, Any]]],
+        window: float = 0.005,
+        max_batch: int = 200
+    ):
+        self.fn = fn
+        self.window = window
+        self.max_batch = max_batch
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self.stats = {"requests": 0, "keys": 0, "batches": 0}
+
+    async def load_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """Load keys, waiting for the current batch window to close"""
+        loop = asyncio.get_running_loop()
+        futures: Dict[str, asyncio.Future] = {}
+        for key in keys:
+            future = self._pending.get(key)
+            if future is None:
+                future = self._pending[key] = loop.create_future()
+                self.stats["keys"] += 1
+            futures[key] = future
+
+        if not futures:
+            return {}
+        self.stats["requests"] += 1
+
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None and self._pending:
+            self._timer = loop.call_later(self.window, self._flush)
+
+        # Shielded so one caller going away does not fail the others' keys
+        values = await asyncio.gather(*(asyncio.shield(f) for f in futures.values()))
+        return {key: value for key, value in zip(futures, values) if value is not None}
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, {}
+        keys = list(batch)
+        for i in range(0, len(keys), self.max_batch):
+            chunk = {key: batch[key] for key in keys[i:i + self.max_batch]}
+            asyncio.ensure_future(self._run(chunk))
+
+    async def _run(self, batch: Dict[str, asyncio.Future]):
+        self.stats["batches"] += 1
+        try:
+            found = await self.fn(list(batch))
+        except Exception as e:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for key, future in batch.items():
+            if not future.done():
+                future.set_result(found.get(key))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get batching statistics"""
+        return {**self.stats, "pending": len(self._pending)}
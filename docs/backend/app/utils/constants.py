@@ -19,8 +19,12 @@ MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
 
 # Cache keys
 CACHE_PREFIX_PUBMED = "pubmed"
+CACHE_PREFIX_PUBMED_RECORD = "pubmed_record"
 CACHE_PREFIX_TRIALS = "trials"
 CACHE_PREFIX_PATENTS = "patents"
+CACHE_PREFIX_PATENT_LANDSCAPE = "patent_landscape"
+CACHE_PREFIX_QUERY = "query_result"
+CACHE_PREFIX_QUERY_GENERATION = "query_result_generation"
 
 # Rate limiting
 DEFAULT_RATE_LIMIT = 20  # requests per minutes
\ No newline at end of file
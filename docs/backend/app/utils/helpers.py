@@ -1,5 +1,7 @@
 from typing import Any, Optional
 from datetime import datetime
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+import json
 import re
 
 def format_number(num: float, decimals: int = 2) -> str:
@@ -23,6 +25,11 @@ def sanitize_filename(filename: str) -> str:
     name = name[:100]
     return f"{name}.{ext}" if ext else name
 
+def format_sse(data: Any, event: Optional[str] = None) -> str:
+    """Format a Server-Sent Events message"""
+    message = f"event: {event}\n" if event else ""
+    return message + f"data: {json.dumps(data, default=str)}\n\n"
+
 def parse_date(date_str: str) -> Optional[datetime]:
     """Parse date string to datetime"""
     formats = [
@@ -43,4 +50,23 @@ def parse_date(date_str: str) -> Optional[datetime]:
 def extract_domain(url: str) -> str:
     """Extract domain from URL"""
     match = re.search(r'https?://([^/]+)', url)
-    return match.group(1) if match else urls  # pyright: ignore[reportUndefinedVariable]
\ No newline at end of file
+    return match.group(1) if match else ""
+
+def normalize_url(url: str) -> str:
+    """Normalize a URL so trivially different forms compare equal
+    
+    Lowercases scheme and host, drops default ports, fragments and utm_*
+    tracking parameters, sorts the query and trims a trailing slash.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and (scheme, parts.port) not in (("http", 80), ("https", 443)):
+        host = f"{host}:{parts.port}"
+    
+    path = parts.path.rstrip("/") or "/"
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_")
+    )
+    return urlunsplit((scheme, host, path, urlencode(query), ""))
\ No newline at end of file
@@ -0,0 +1,5 @@
+import os
+
+# Tests run on the fake LLM provider; placeholder keys only satisfy Settings
+os.environ.setdefault("OPENAI_API_KEY", "test-openai-key")
+os.environ.setdefault("GOOGLE_API_KEY", "test-google-key")
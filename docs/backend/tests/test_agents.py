@@ -17,6 +17,11 @@ def web_scraper():
 def master_agent(llm_manager, web_scraper):
     return MasterAgent(llm_manager, web_scraper)
 
+@pytest.fixture
+def cached_llm_manager(llm_manager):
+    llm_manager.config = llm_manager.config.model_copy(update={"QUERY_CACHE_ENABLED": True})
+    return llm_manager
+
 @pytest.mark.asyncio
 async def test_master_agent_decompose(master_agent):
     """Test query decomposition"""
@@ -33,7 +38,377 @@ async def test_web_intelligence_agent(llm_manager, web_scraper):
     from app.agents.worker_agents import WebIntelligenceAgent
     
     agent = WebIntelligenceAgent(llm_manager, web_scraper)
-    result = await agent.execute("diabetes treatment")
+    result = await agent.execute("diabetes treatment", {"provider": "fake"})
     
     assert result["agent"] == "Web Intelligence Agent"
-    assert "data" in result
\ No newline at end of file
+    assert "data" in result
+
+@pytest.mark.asyncio
+async def test_fake_provider_is_deterministic(llm_manager):
+    """Test fake provider output is stable and follows the prompt"""
+    messages = [{"role": "user", "content": "Analyze X\n\n## Findings\n\nSTART with \"# Report\"."}]
+
+    first = await llm_manager.generate(messages, provider="fake")
+    second = await llm_manager.generate(messages, provider="fake")
+
+    assert first["content"] == second["content"]
+    assert first["content"].startswith("# Report")
+    assert "## Findings" in first["content"]
+    assert first["cost"] == 0.0
+
+@pytest.mark.asyncio
+async def test_task_scheduler_dependencies_and_deadline():
+    """Test priorities, dependencies, timeouts and the partial-result deadline"""
+    import asyncio
+    from app.agents.scheduler import TaskScheduler
+
+    started = []
+
+    async def runner(task_info, dependencies):
+        started.append(task_info["agent"])
+        await asyncio.sleep(task_info.get("sleep", 0))
+        if task_info["agent"] == "broken":
+            raise RuntimeError("boom")
+        return {"data": sorted(dependencies)}
+
+    tasks = [
+        {"agent": "late", "task": "t", "priority": 2},
+        {"agent": "first", "task": "t", "priority": 1},
+        {"agent": "after_first", "task": "t", "priority": 1, "depends_on": ["first"]},
+        {"agent": "broken", "task": "t", "priority": 3},
+        {"agent": "slow", "task": "t", "priority": 3, "sleep": 1, "timeout": 0.05}
+    ]
+    results = await TaskScheduler(max_concurrency=1).run(tasks, runner)
+
+    assert started[:3] == ["first", "after_first", "late"]
+    assert results["after_first"] == {"data": ["first"]}
+    assert results["broken"]["status"] == "failed"
+    assert results["slow"]["status"] == "timeout"
+
+    results = await TaskScheduler(deadline=0.05).run(
+        [{"agent": "quick", "task": "t"}, {"agent": "stuck", "task": "t", "sleep": 1}],
+        runner
+    )
+    assert results["quick"] == {"data": []}
+    assert results["stuck"]["status"] == "incomplete"
+
+@pytest.mark.asyncio
+async def test_execute_stream_emits_agents_as_they_finish(master_agent, tmp_path):
+    """Test each worker result is streamed before synthesis starts"""
+    import asyncio
+
+    class StubAgent:
+        timeout = None
+
+        def __init__(self, delay):
+            self.delay = delay
+
+        async def execute(self, task, context=None):
+            await asyncio.sleep(self.delay)
+            return {"data": {"delay": self.delay}}
+
+    delays = {"web_intelligence": 0.03, "clinical_trials": 0.0, "patent_landscape": 0.06, "iqvia_insights": 0.01}
+    master_agent.workers = {name: StubAgent(delay) for name, delay in delays.items()}
+
+    async def generate_report(**kwargs):
+        return str(tmp_path / "report.pdf")
+
+    master_agent.report_generator.generate_report = generate_report
+
+    events = [e async for e in master_agent.execute_stream("metformin", {"provider": "fake"})]
+    names = [e["event"] for e in events]
+
+    finished = [e["data"]["agent"] for e in events if e["event"] == "agent_result"]
+    assert finished == sorted(delays, key=delays.get)
+    assert names.index("agent_results") == names.index("agent_result") + len(delays)
+    assert names.index("agent_results") < names.index("synthesis") < names.index("report")
+    assert events[-1]["data"]["agent_results"]["patent_landscape"] == {"data": {"delay": 0.06}}
+
+@pytest.mark.asyncio
+async def test_query_result_cache(cached_llm_manager, web_scraper, tmp_path):
+    """Test equivalent queries share one cached result until invalidated"""
+    master_agent = MasterAgent(cached_llm_manager, web_scraper)
+    calls = []
+
+    class StubAgent:
+        timeout = None
+
+        async def execute(self, task, context=None):
+            calls.append(task)
+            return {"data": {"task": task}}
+
+    master_agent.workers = {
+        name: StubAgent() for name in ("web_intelligence", "clinical_trials", "patent_landscape", "iqvia_insights")
+    }
+
+    async def generate_report(**kwargs):
+        return str(tmp_path / "report.pdf")
+
+    master_agent.report_generator.generate_report = generate_report
+    context = {"provider": "fake"}
+
+    first = await master_agent.execute("Find repurposing opportunities for metformin", context)
+    assert first["cached"] is False
+    runs = len(calls)
+
+    second = await master_agent.execute("Identify opportunities for Metformin", context)
+    assert second["cached"] is True
+    assert second["cache_age_seconds"] >= 0
+    assert second["synthesis"] == first["synthesis"]
+    assert len(calls) == runs
+
+    events = [e async for e in master_agent.execute_stream("metformin repurposing", context)]
+    assert events[-1]["data"]["cached"] is True
+    assert len(calls) == runs
+
+    refreshed = await master_agent.execute("metformin", {**context, "force_refresh": True})
+    assert refreshed["cached"] is False
+    assert (await master_agent.execute("metformin", {"provider": "fake", "model": "fake-model"}))["cached"] is True
+    assert (await master_agent.execute("metformin", {"provider": "fake", "model": "other"}))["cached"] is False
+
+    assert await master_agent.invalidate_cache("opportunities for metformin") >= 1
+    assert (await master_agent.execute("metformin", context))["cached"] is False
+
+@pytest.mark.asyncio
+async def test_query_cache_invalidation_reaches_other_processes(cached_llm_manager, web_scraper, tmp_path):
+    """Test an invalidation in one process misses every process's memory tier"""
+    import fnmatch
+
+    class SharedCache:
+        def __init__(self):
+            self.values = {}
+
+        async def get(self, key):
+            return self.values.get(key)
+
+        async def get_many(self, keys):
+            return [self.values.get(key) for key in keys]
+
+        async def set(self, key, value, ttl=None):
+            self.values[key] = value
+            return True
+
+        async def incr(self, key):
+            self.values[key] = self.values.get(key, 0) + 1
+            return self.values[key]
+
+        async def clear_pattern(self, pattern):
+            keys = fnmatch.filter(list(self.values), pattern)
+            for key in keys:
+                del self.values[key]
+            return len(keys)
+
+    class StubAgent:
+        timeout = None
+
+        async def execute(self, task, context=None):
+            return {"data": {"task": task}}
+
+    async def generate_report(**kwargs):
+        return str(tmp_path / "report.pdf")
+
+    shared = SharedCache()
+    first, second = (MasterAgent(cached_llm_manager, web_scraper, shared) for _ in range(2))
+    for agent in (first, second):
+        agent.workers = {
+            name: StubAgent() for name in ("web_intelligence", "clinical_trials", "patent_landscape", "iqvia_insights")
+        }
+        agent.report_generator.generate_report = generate_report
+
+    context = {"provider": "fake"}
+    await first.execute("metformin", context)
+    assert (await second.execute("metformin", context))["cached"] is True
+
+    await first.invalidate_cache("metformin")
+    assert (await second.execute("metformin", context))["cached"] is False
+    assert (await first.execute("metformin", context))["cached"] is True
+
+    await second.invalidate_cache()
+    assert (await first.execute("metformin", context))["cached"] is False
+
+@pytest.mark.asyncio
+async def test_generate_stream_usage_and_cache(llm_manager):
+    """Test streamed deltas, the final usage chunk and the response cache"""
+    from app.services.cache_manager import TieredCache
+
+    llm_manager.fake_llm.latency_ms = 5
+    llm_manager.response_cache = TieredCache()
+    messages = [{"role": "user", "content": "Summarize\n\n## Evidence\n\nSTART with \"# Summary\"."}]
+
+    chunks = [c async for c in llm_manager.generate_stream(messages, provider="fake")]
+    assert [c["type"] for c in chunks[-2:]] == ["delta", "done"]
+    assert all(c["type"] == "delta" for c in chunks[:-1])
+
+    done = chunks[-1]
+    assert done["content"] == "".join(c["content"] for c in chunks[:-1])
+    assert done["usage"]["total_tokens"] == done["usage"]["prompt_tokens"] + done["usage"]["completion_tokens"]
+    assert llm_manager.response_cache.get_stats()["sets"] == 1
+
+    cached = [c async for c in llm_manager.generate_stream(messages, provider="fake")]
+    assert cached[-1]["cached"] is True
+    assert cached[0]["content"] == done["content"]
+
+@pytest.mark.asyncio
+async def test_openai_stream_settles_spent_tokens_on_error(llm_manager):
+    """Test a broken stream still charges the prompt and streamed tokens"""
+    from types import SimpleNamespace
+
+    requests = []
+
+    async def broken_stream():
+        yield SimpleNamespace(usage=None, choices=[SimpleNamespace(delta=SimpleNamespace(content="partial answer"))])
+        raise ConnectionError("stream reset")
+
+    async def create(**kwargs):
+        requests.append(kwargs)
+        return broken_stream()
+
+    llm_manager.openai_client = SimpleNamespace(
+        chat=SimpleNamespace(completions=SimpleNamespace(create=create))
+    )
+    settled = []
+    real_settle = llm_manager.openai_token_limiter.settle
+
+    async def settle(reserved, used):
+        settled.append((reserved, used))
+        await real_settle(reserved, used)
+
+    llm_manager.openai_token_limiter.settle = settle
+    messages = [{"role": "user", "content": "metformin"}]
+
+    with pytest.raises(ConnectionError):
+        async for _ in llm_manager.generate_stream(messages, provider="openai", model="gpt-4", max_tokens=500):
+            pass
+
+    assert requests[0]["extra_body"] == {"stream_options": {"include_usage": True}}
+    reserved, used = settled[0]
+    prompt_tokens = reserved - 500
+    assert used == prompt_tokens + llm_manager.count_tokens("partial answer", "gpt-4")
+
+@pytest.mark.asyncio
+async def test_bypass_cache_calls_fresh_and_skips_cache(llm_manager):
+    """Test bypass requests never join a cached-path flight or write the cache"""
+    import asyncio
+    from app.services.cache_manager import TieredCache
+
+    llm_manager.fake_llm.latency_ms = 50
+    llm_manager.response_cache = TieredCache()
+    calls = []
+    real_call = llm_manager._call_provider
+
+    async def counting_call(*args, **kwargs):
+        calls.append(1)
+        return await real_call(*args, **kwargs)
+
+    llm_manager._call_provider = counting_call
+    messages = [{"role": "user", "content": "metformin"}]
+
+    normal, bypass = await asyncio.gather(
+        llm_manager.generate(messages, provider="fake"),
+        llm_manager.generate(messages, provider="fake", bypass_cache=True)
+    )
+    assert len(calls) == 2
+    assert llm_manager.response_cache.get_stats()["sets"] == 1
+
+    await llm_manager.generate(messages, provider="fake", bypass_cache=True)
+    assert llm_manager.response_cache.get_stats()["sets"] == 1
+
+@pytest.mark.asyncio
+async def test_cross_provider_hedge_is_cached_under_backup_key(llm_manager):
+    """Test a winning backup from another provider does not fill the primary's cache entry"""
+    import asyncio
+    from app.core.hedging import HedgingPolicy
+    from app.services.cache_manager import TieredCache
+
+    llm_manager.response_cache = TieredCache()
+    llm_manager.hedging = HedgingPolicy(budget_ratio=1.0, min_samples=1, cross_provider=True)
+    llm_manager.hedging.latencies.record("openai:gpt-4:2000", 0.01)
+
+    async def call_once(messages, provider, model, **kwargs):
+        async def send():
+            await asyncio.sleep(0.2 if provider == "openai" else 0.0)
+            return {"content": f"from {provider}", "model": model}
+        return await llm_manager._timed(f"{provider}:{model}:2000", send)
+
+    llm_manager._call_once = call_once
+    messages = [{"role": "user", "content": "metformin"}]
+
+    first = await llm_manager.generate(messages, provider="openai")
+    assert first["hedge_provider"] == "gemini"
+
+    gemini_model = llm_manager._default_model("gemini", None)
+    gemini_key = llm_manager._response_cache_key(messages, "gemini", gemini_model, {})
+    assert (await llm_manager.response_cache.get(gemini_key))["content"] == "from gemini"
+    openai_key = llm_manager._response_cache_key(messages, "openai", "gpt-4", {})
+    assert await llm_manager.response_cache.get(openai_key) is None
+
+@pytest.mark.asyncio
+async def test_hedge_delay_excludes_local_queueing(llm_manager):
+    """Test time queued on local limiters does not launch a hedge"""
+    import asyncio
+    from contextlib import asynccontextmanager
+    from app.core.hedging import HedgingPolicy
+
+    llm_manager.hedging = HedgingPolicy(budget_ratio=1.0, min_samples=1)
+    llm_manager.hedging.latencies.record("fake:fake-model:2000", 0.05)
+    llm_manager.fake_llm.latency_ms = 1
+    calls = []
+    generate = llm_manager.fake_llm.generate
+
+    async def counted(messages, max_tokens):
+        calls.append(1)
+        return await generate(messages, max_tokens)
+
+    @asynccontextmanager
+    async def saturated_slot(request_limiter=None):
+        await asyncio.sleep(0.1)
+        yield
+
+    llm_manager.fake_llm.generate = counted
+    llm_manager._provider_slot = saturated_slot
+
+    response = await llm_manager.generate([{"role": "user", "content": "metformin"}], provider="fake")
+    assert "hedged" not in response
+    assert len(calls) == 1
+
+@pytest.mark.asyncio
+async def test_cancelled_openai_call_settles_its_reservation(llm_manager):
+    """Test a cancelled call returns its unused completion budget to the TPM bucket"""
+    import asyncio
+    from types import SimpleNamespace
+
+    async def create(**kwargs):
+        await asyncio.sleep(10)
+
+    llm_manager.openai_client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    limiter = llm_manager.openai_token_limiter
+    limiter.rate = 0.001
+    messages = [{"role": "user", "content": "metformin repurposing"}]
+    prompt_tokens = llm_manager.estimate_request_tokens(messages, 0)
+
+    call = asyncio.ensure_future(llm_manager.call_openai(messages, max_tokens=1000))
+    await asyncio.sleep(0.05)
+    call.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await call
+    assert limiter.max_requests - limiter._balance == pytest.approx(prompt_tokens, abs=1)
+
+@pytest.mark.asyncio
+async def test_clinical_trials_agent_lists_top_trials(llm_manager, web_scraper):
+    """Test the output lists a few trials while counting every match"""
+    from app.agents.worker_agents import ClinicalTrialsAgent
+
+    async def search(task, max_results=100, force_refresh=False):
+        return [
+            {"nct_id": f"NCT{i:08d}", "title": f"Trial {i}", "phase": "Phase 2", "status": "Recruiting"}
+            for i in range(50)
+        ]
+
+    web_scraper.search_clinical_trials = search
+    llm_manager.fake_llm.latency_ms = 5
+    agent = ClinicalTrialsAgent(llm_manager, web_scraper)
+    data = (await agent.execute("metformin", {"provider": "fake"}))["data"]
+
+    assert len(data["trials"]) == agent.max_listed_trials
+    assert data["total_trials"] == 50
+    assert data["phase_distribution"] == {"Phase 2": 50}
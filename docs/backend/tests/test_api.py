@@ -10,6 +10,7 @@ def test_health_check():
     assert response.status_code == 200
     data = response.json()
     assert data["status"] == "healthy"
+    assert data["circuit_breakers"]["pubmed"]["state"] == "closed"
 
 def test_query_endpoint():
     """Test query endpoint"""
@@ -17,7 +18,7 @@ def test_query_endpoint():
         "/api/query",
         json={
             "query": "Find molecules for diabetes",
-            "provider": "openai"
+            "provider": "fake"
         }
     )
     assert response.status_code == 200
@@ -30,4 +31,50 @@ def test_usage_stats():
     assert response.status_code == 200
     data = response.json()
     assert "tokens_used" in data
-    assert "total_cost" in data
\ No newline at end of file
+    assert "total_cost" in data
+
+def test_unknown_job():
+    """Test job endpoints reject unknown ids"""
+    assert client.get("/api/jobs/missing").status_code == 404
+    assert client.get("/api/jobs/missing/result").status_code == 404
+    assert client.delete("/api/jobs/missing").status_code == 404
+
+def _sse_events(response):
+    """Parse (event, data) pairs from a Server-Sent Events body"""
+    import json
+    events = []
+    for block in response.text.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines.get("event"), json.loads(lines["data"])))
+    return events
+
+def test_chat_stream():
+    """Test chat streaming sends deltas, then usage"""
+    response = client.post(
+        "/api/chat/stream",
+        json={"messages": [{"role": "user", "content": "Hello"}], "provider": "fake"}
+    )
+    assert response.status_code == 200
+    events = _sse_events(response)
+    names = [name for name, _ in events]
+    assert names[-1] == "done"
+    assert set(names[:-1]) == {"delta"}
+    assert events[-1][1]["usage"]["total_tokens"] > 0
+
+def test_query_stream():
+    """Test query streaming event order"""
+    response = client.post(
+        "/api/query/stream",
+        json={"query": "Find molecules for hypertension", "provider": "fake", "bypass_cache": True}
+    )
+    assert response.status_code == 200
+    events = _sse_events(response)
+    names = [name for name, _ in events]
+    assert "error" not in names
+
+    plan = events[0][1]
+    assert names[0] == "plan"
+    assert names[1:1 + len(plan["tasks"])] == ["agent_result"] * len(plan["tasks"])
+    assert names.index("agent_results") < names.index("synthesis_delta") < names.index("synthesis")
+    assert names[-3:] == ["report", "complete", "usage_stats"]
+    assert events[-2][1]["synthesis"] == events[names.index("synthesis")][1]["synthesis"]
\ No newline at end of file
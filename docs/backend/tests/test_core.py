@@ -0,0 +1,216 @@
+import pytest
+from app.core.rate_limiter import RateLimiter
+
+@pytest.mark.asyncio
+async def test_rate_limiter_queues_waiters():
+    """Test token bucket reservations and refunds"""
+    limiter = RateLimiter(max_requests=2, time_window=1)
+
+    assert await limiter.acquire() == 0
+    assert await limiter.acquire() == 0
+    assert limiter.get_wait_time() > 0
+
+    waited = await limiter.acquire()
+    assert 0 < waited <= 0.5
+    assert limiter.get_stats()["distributed"] is False
+
+@pytest.mark.asyncio
+async def test_rate_limiter_settles_token_reservations():
+    """Test unused reserved tokens are returned to the budget"""
+    limiter = RateLimiter(max_requests=1000, time_window=60)
+
+    await limiter.acquire(900)
+    assert limiter.get_wait_time() == 0
+
+    await limiter.acquire(100)
+    assert limiter.get_wait_time() > 0
+
+    await limiter.settle(1000, 400)
+    assert limiter.get_wait_time() == 0
+
+def test_gemini_models_are_cached():
+    """Test Gemini model objects are reused per model and config"""
+    from app.core.llm_manager import get_gemini_model
+
+    model = get_gemini_model("gemini-2.5-flash", 0.4, 1000)
+    assert get_gemini_model("gemini-2.5-flash", 0.4, 1000) is model
+    assert get_gemini_model("gemini-2.5-flash", 0.7, 1000) is not model
+
+@pytest.mark.asyncio
+async def test_single_flight_shares_calls():
+    """Test concurrent identical calls share one execution"""
+    import asyncio
+    from app.utils.singleflight import SingleFlight
+
+    flight = SingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"value": 42}
+
+    results = await asyncio.gather(*[flight.do("key", fetch) for _ in range(5)])
+    assert len(calls) == 1
+    assert all(r == {"value": 42} for r in results)
+
+    # A cancelled caller leaves the shared call running for the others
+    first = asyncio.ensure_future(flight.do("key", fetch))
+    second = asyncio.ensure_future(flight.do("key", fetch))
+    await asyncio.sleep(0.01)
+    first.cancel()
+    assert await second == {"value": 42}
+    assert flight.get_stats()["in_flight"] == 0
+
+    # A caller arriving just after the last waiter cancelled starts a new call
+    async def slow_fetch():
+        try:
+            await asyncio.sleep(0.05)
+        finally:
+            # Unwinding takes a while, as with a connection being closed
+            await asyncio.shield(asyncio.sleep(0.02))
+        return {"value": 42}
+
+    abandoned = asyncio.ensure_future(flight.do("slow", slow_fetch))
+    await asyncio.sleep(0.01)
+    abandoned.cancel()
+    await asyncio.sleep(0)
+    assert await flight.do("slow", slow_fetch) == {"value": 42}
+
+def test_hedging_policy_learns_and_caps_budget():
+    """Test hedge delay follows the latency tail and respects the budget"""
+    from app.core.hedging import HedgingPolicy
+
+    policy = HedgingPolicy(percentile=0.9, budget_ratio=0.5, min_samples=10)
+    assert policy.hedge_delay("openai:gpt-4:900") is None
+
+    for i in range(10):
+        policy.latencies.record("openai:gpt-4:900", float(i + 1))
+    assert policy.hedge_delay("openai:gpt-4:900") == 10.0
+
+    assert policy.acquire_budget() is True
+    assert policy.acquire_budget() is False
+    assert policy.get_stats()["budget_exhausted"] == 1
+
+@pytest.mark.asyncio
+async def test_adaptive_concurrency_backs_off_and_recovers():
+    """Test AIMD limit decreases on overload and grows on success"""
+    from app.core.concurrency import AdaptiveConcurrencyLimiter
+
+    limiter = AdaptiveConcurrencyLimiter(max_limit=4, cooldown=0)
+    for _ in range(4):
+        await limiter.acquire()
+    assert limiter.get_stats()["in_flight"] == 4
+
+    limiter.record_overload()
+    assert limiter.limit == 2
+    for _ in range(4):
+        limiter.release()
+
+    for _ in range(20):
+        limiter.record_success(1.0)
+    assert limiter.limit == 4
+    assert limiter.get_stats()["queue_depth"] == 0
+
+@pytest.mark.asyncio
+async def test_retry_policy_honors_retry_after():
+    """Test retries use Retry-After and report their cost"""
+    from types import SimpleNamespace
+    from app.core.retry import RetryPolicy
+
+    class RateLimited(Exception):
+        status_code = 429
+        response = SimpleNamespace(headers={"retry-after-ms": "20"})
+
+    policy = RetryPolicy(max_retries=3, base_delay=0.01, deadline=5)
+    attempts = []
+
+    async def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise RateLimited("rate limited")
+        return "ok"
+
+    result, stats = await policy.run(flaky)
+    assert result == "ok"
+    assert stats["retries"] == 2
+    assert stats["sleep_seconds"] >= 0.04
+
+    async def broken():
+        raise ValueError("not retryable")
+
+    with pytest.raises(ValueError):
+        await policy.run(broken)
+
+@pytest.mark.asyncio
+async def test_retry_deadline_excludes_gate_queueing():
+    """Test time spent queueing on our own limits does not eat the deadline"""
+    import asyncio
+    from contextlib import asynccontextmanager
+    from app.core.retry import RetryPolicy
+
+    @asynccontextmanager
+    async def gate():
+        await asyncio.sleep(0.1)
+        yield
+
+    async def call():
+        await asyncio.sleep(0.02)
+        return "ok"
+
+    policy = RetryPolicy(max_retries=0, deadline=0.05)
+    result, _ = await policy.run(call, gate=gate)
+    assert result == "ok"
+
+@pytest.mark.asyncio
+async def test_llm_latency_excludes_rate_limit_wait():
+    """Test provider latency samples cover only the round-trip"""
+    import asyncio
+    from types import SimpleNamespace
+    from app.core.config import get_settings
+    from app.core.llm_manager import LLMManager
+
+    llm_manager = LLMManager(get_settings())
+
+    async def create(**kwargs):
+        await asyncio.sleep(0.01)
+        usage = SimpleNamespace(prompt_tokens=5, completion_tokens=5, total_tokens=10)
+        return SimpleNamespace(usage=usage, choices=[SimpleNamespace(message=SimpleNamespace(content="ok"))])
+
+    llm_manager.openai_client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    llm_manager.openai_limiter.rate = 10.0
+    await llm_manager.openai_limiter.acquire(llm_manager.openai_limiter.max_requests + 2)
+
+    await llm_manager.call_openai([{"role": "user", "content": "hi"}], model="gpt-4", max_tokens=100)
+    assert llm_manager.concurrency_limiter._baselines["openai:gpt-4:100"] < 0.1
+
+@pytest.mark.asyncio
+async def test_circuit_breaker_opens_and_recovers():
+    """Test the breaker fails fast when a source degrades and probes for recovery"""
+    import asyncio
+    from app.core.circuit_breaker import CircuitBreaker, CircuitOpenError
+
+    breaker = CircuitBreaker("source", min_requests=2, open_seconds=0.05, call_timeout=0.02)
+
+    async def hang():
+        await asyncio.sleep(1)
+
+    for _ in range(2):
+        with pytest.raises(asyncio.TimeoutError):
+            await breaker.call(hang)
+    assert breaker.state == "open"
+
+    with pytest.raises(CircuitOpenError):
+        await breaker.call(hang)
+
+    await asyncio.sleep(0.06)
+    assert breaker.state == "half_open"
+
+    async def healthy():
+        return "ok"
+
+    assert await breaker.call(healthy) == "ok"
+    stats = breaker.get_stats()
+    assert stats["state"] == "closed"
+    assert stats["rejected"] == 1
+    assert stats["opened"] == 1
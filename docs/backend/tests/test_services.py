@@ -2,8 +2,10 @@ import pytest
 from app.services.web_scraper import WebScraper
 
 @pytest.fixture
-def web_scraper():
-    return WebScraper()
+async def web_scraper():
+    scraper = WebScraper()
+    yield scraper
+    await scraper.close()
 
 @pytest.mark.asyncio
 async def test_pubmed_search(web_scraper):
@@ -17,4 +19,549 @@ async def test_clinical_trials_search(web_scraper):
     """Test clinical trials search"""
     results = await web_scraper.search_clinical_trials("cancer", max_results=5)
     assert len(results) > 0
-    assert "nct_id" in results[0]
\ No newline at end of file
+    assert "nct_id" in results[0]
+
+@pytest.mark.asyncio
+async def test_tiered_cache_memory_tier():
+    """Test in-process LRU tier with TTL and eviction"""
+    from app.services.cache_manager import TieredCache
+
+    cache = TieredCache(max_entries=2, default_ttl=60)
+    await cache.set("llm:a", {"content": "a"})
+    await cache.set("llm:b", {"content": "b"})
+    assert await cache.get("llm:a") == {"content": "a"}
+
+    await cache.set("llm:c", {"content": "c"})
+    assert await cache.get("llm:b") is None
+    assert await cache.clear_prefix("llm") == 2
+
+    stats = cache.get_stats()
+    assert stats["memory_hits"] == 1
+    assert stats["misses"] == 1
+
+@pytest.mark.asyncio
+async def test_tiered_cache_redis_tier_is_async():
+    """Test the Redis tier awaits the asyncio client and clears keys with SCAN"""
+    import fnmatch
+    from app.services.cache_manager import CacheManager, TieredCache
+
+    class AsyncRedis:
+        def __init__(self):
+            self.values = {}
+
+        async def get(self, key):
+            return self.values.get(key)
+
+        async def setex(self, key, ttl, value):
+            self.values[key] = value
+
+        async def scan_iter(self, match, count=None):
+            for key in fnmatch.filter(list(self.values), match):
+                yield key
+
+        async def delete(self, *keys):
+            return sum(self.values.pop(key, None) is not None for key in keys)
+
+        def keys(self, pattern):
+            raise AssertionError("KEYS blocks Redis")
+
+    cache_manager = CacheManager()
+    cache_manager.redis_client = AsyncRedis()
+    writer, reader = TieredCache(cache_manager), TieredCache(cache_manager)
+
+    await writer.set("llm:a", {"content": "a"})
+    assert await reader.get("llm:a") == {"content": "a"}
+    assert reader.get_stats()["redis_hits"] == 1
+    assert await writer.clear_prefix("llm") == 1
+    assert cache_manager.redis_client.values == {}
+
+@pytest.mark.asyncio
+async def test_web_scraper_reuses_session(web_scraper):
+    """Test one pooled session is shared across calls"""
+    first = await web_scraper._get_session()
+    second = await web_scraper._get_session()
+    assert first is second
+
+    stats = web_scraper.get_pool_stats()
+    assert stats["open"] is True
+    assert stats["sessions_created"] == 1
+
+def test_session_from_another_loop_is_closed():
+    """Test switching event loops closes the old session's connector"""
+    import asyncio
+
+    scraper = WebScraper()
+    asyncio.run(scraper.start())
+    old_connector = scraper._session.connector
+
+    async def reopen():
+        await scraper._get_session()
+        await scraper.close()
+
+    asyncio.run(reopen())
+    assert old_connector.closed
+    assert scraper.sessions_created == 2
+
+@pytest.mark.asyncio
+async def test_source_search_cache(web_scraper):
+    """Test real results are cached and mock fallbacks are not"""
+    calls = []
+
+    async def fetch(search_query, max_results):
+        calls.append(search_query)
+        return [{"pmid": "1", "title": "Metformin"}] if search_query == "metformin" else []
+
+    web_scraper._fetch_pubmed = fetch
+    first = await web_scraper.search_pubmed("metformin")
+    second = await web_scraper.search_pubmed("metformin")
+    assert first == second == [{"pmid": "1", "title": "Metformin"}]
+    assert len(calls) == 1
+
+    await web_scraper.search_pubmed("metformin", force_refresh=True)
+    assert len(calls) == 2
+
+    await web_scraper.search_pubmed("unknowncompound")
+    await web_scraper.search_pubmed("unknowncompound")
+    assert len(calls) == 4
+
+def test_eutils_params_and_rate():
+    """Test NCBI identification is attached and the key raises the rate"""
+    from types import SimpleNamespace
+
+    scraper = WebScraper(SimpleNamespace(PUBMED_API_KEY="key", NCBI_EMAIL="dev@example.com"))
+    params = scraper._eutils_params({"db": "pubmed"})
+    assert params == {"db": "pubmed", "tool": "pharma-ai", "email": "dev@example.com", "api_key": "key"}
+    assert scraper.ncbi_limiter.max_requests == 10
+
+    assert "api_key" not in WebScraper()._eutils_params({})
+    assert WebScraper().ncbi_limiter.max_requests == 3
+
+@pytest.mark.asyncio
+async def test_pubmed_summaries_are_batched(web_scraper):
+    """Test concurrent searches share one esummary call and record cache"""
+    import asyncio
+
+    calls = []
+
+    async def eutils(endpoint, params, method="GET", max_retries=3):
+        calls.append(endpoint)
+        if endpoint == "esearch.fcgi":
+            ids = {"metformin": ["1", "2"], "aspirin": ["2", "3"]}[params["term"]]
+            return {"esearchresult": {"idlist": ids}}
+        ids = params["id"].split(",")
+        return {"result": {"uids": ids, **{pmid: {"title": f"Paper {pmid}"} for pmid in ids}}}
+
+    web_scraper._eutils_request = eutils
+    first, second = await asyncio.gather(
+        web_scraper.search_pubmed("metformin"),
+        web_scraper.search_pubmed("aspirin")
+    )
+    assert [r["pmid"] for r in first] == ["1", "2"]
+    assert [r["pmid"] for r in second] == ["2", "3"]
+    assert calls.count("esummary.fcgi") == 1
+
+    await web_scraper.search_pubmed("metformin", force_refresh=True)
+    assert calls.count("esummary.fcgi") == 1
+
+@pytest.mark.asyncio
+async def test_clinical_trials_client_pagination():
+    """Test v2 pagination, filters and early stop against recorded pages"""
+    from pathlib import Path
+    from app.services.clinical_trials_client import ClinicalTrialsClient, RecordedTransport
+
+    transport = RecordedTransport.load(Path(__file__).parent / "fixtures" / "clinical_trials_v2.json")
+    client = ClinicalTrialsClient(transport, page_size=2)
+
+    studies = [s async for s in client.iter_studies("metformin", phases=["PHASE3"], statuses=["RECRUITING"])]
+    assert [s["nct_id"] for s in studies] == [f"NCT0500000{n}" for n in range(1, 6)]
+    assert studies[1]["phase"] == "Phase 2/Phase 3"
+    assert studies[1]["status"] == "Active, not recruiting"
+    assert transport.requests[0]["filter.advanced"] == "AREA[Phase](PHASE3)"
+    assert transport.requests[0]["filter.overallStatus"] == "RECRUITING"
+    assert transport.requests[2]["pageToken"] == "ZVNj7o2Elu8"
+
+    transport.requests.clear()
+    assert len(await client.search("metformin", max_studies=2)) == 2
+    assert len(transport.requests) == 1
+
+def test_extract_page_text():
+    """Test lxml extraction drops scripts and styles and caps the text"""
+    from app.services.web_scraper import extract_page_text
+
+    html = b"""<html><head><title> Metformin </title><style>p {}</style></head>
+    <body><script>var x = 1;</script><p>Repurposing   evidence</p><!-- note --><p>grows</p></body></html>"""
+    page = extract_page_text(html, "utf-8")
+    assert page["title"] == "Metformin"
+    assert page["content"] == "Metformin Repurposing evidence grows"
+    assert page["parse_ms"] >= 0
+    assert extract_page_text(html, max_chars=9)["content"] == "Metformin"
+    assert extract_page_text(b"")["content"] == ""
+
+@pytest.mark.asyncio
+async def test_scrape_many_dedupes_and_respects_robots(web_scraper):
+    """Test bulk scraping dedupes URLs, obeys robots.txt and caps per-domain load"""
+    import asyncio
+    from urllib.robotparser import RobotFileParser
+
+    active = {}
+    peak = {}
+
+    async def scrape(url):
+        domain = url.split("/")[2]
+        active[domain] = active.get(domain, 0) + 1
+        peak[domain] = max(peak.get(domain, 0), active[domain])
+        await asyncio.sleep(0.01)
+        active[domain] -= 1
+        return {"url": url, "content": "ok"}
+
+    async def robots(origin):
+        parser = RobotFileParser()
+        parser.parse(["User-agent: *", "Disallow: /private"])
+        return parser
+
+    web_scraper.scrape_url = scrape
+    web_scraper._fetch_robots = robots
+    urls = [f"https://a.example/p{i}" for i in range(4)] + [
+        "https://A.example/p0/#top",
+        "https://b.example/private/x",
+        "https://b.example/q?utm_source=mail"
+    ]
+    web_scraper.scrape_per_domain = 2
+
+    async def run(batch):
+        return [r async for r in web_scraper.scrape_many(batch, domain_delay=0)]
+
+    # Two concurrent batches share the per-domain limit
+    results, more = await asyncio.gather(run(urls), run([f"https://a.example/x{i}" for i in range(4)]))
+
+    assert len(results) == 6
+    assert len(more) == 4
+    blocked = [r for r in results if "error" in r]
+    assert [r["url"] for r in blocked] == ["https://b.example/private/x"]
+    assert "https://b.example/q?utm_source=mail" in [r["url"] for r in results]
+    assert peak["a.example"] == 2
+    assert len(web_scraper._robots) == 2
+
+    # The caller's URL is fetched as given, not its normalized form
+    fetched = [r async for r in web_scraper.scrape_many(["https://c.example/dir/?z=1&a=2"], domain_delay=0)]
+    assert fetched[0]["url"] == "https://c.example/dir/?z=1&a=2"
+
+def test_trial_index_ingest_and_search(tmp_path):
+    """Test the local trial index ranks matches and ingests incrementally"""
+    import json
+    from pathlib import Path
+    from app.services.trial_index import TrialIndex, iter_study_records
+
+    pages = json.loads((Path(__file__).parent / "fixtures" / "clinical_trials_v2.json").read_text())
+    export = tmp_path / "studies.jsonl"
+    export.write_text("\n".join(json.dumps(study) for page in pages for study in page["studies"]))
+
+    index = TrialIndex(str(tmp_path / "trials.db"))
+    assert index.ingest(iter_study_records(str(export))) == {"seen": 5, "written": 5, "skipped": 0}
+    assert index.ingest(iter_study_records(str(export)))["skipped"] == 5
+
+    results = index.search("metformin cancer", max_results=10)
+    assert {t["nct_id"] for t in results} == {"NCT05000001", "NCT05000002"}
+    assert index.search("metformin", statuses=["Recruiting"], max_results=10)[0]["status"] == "Recruiting"
+    assert index.search("cancer obesity")  # falls back to any-term matching
+    assert index.get_stats()["studies"] == 5
+
+def test_pubmed_index_ingest_and_search(tmp_path):
+    """Test MEDLINE ingestion, deletions and BM25 ranking over titles and abstracts"""
+    import gzip
+    import shutil
+    from pathlib import Path
+    from app.services.pubmed_index import PubMedIndex
+
+    source = tmp_path / "pubmed24n0001.xml.gz"
+    with open(Path(__file__).parent / "fixtures" / "medline_sample.xml", "rb") as f, gzip.open(source, "wb") as out:
+        shutil.copyfileobj(f, out)
+
+    index = PubMedIndex(str(tmp_path / "pubmed.db"))
+    assert index.ingest_file(str(source)) == {"file": source.name, "articles": 3, "deleted": 1}
+    assert index.ingest_file(str(source))["skipped"] is True
+
+    results = index.search("metformin", max_results=10)
+    assert [r["pmid"] for r in results] == ["30000001", "30000002"]
+    assert results[0]["authors"] == ["Smith J", "MET Trial Group"]
+    assert results[0]["doi"] == "10.1000/jco.2021.1"
+    assert "AMPK activation" in results[0]["abstract"]
+    assert index.search("breast neoplasms")[0]["pmid"] == "30000001"
+    assert index.search("metformin", min_year=2020)[0]["pubdate"] == "2021 Mar"
+    assert index.get_stats()["articles"] == 2
+
+def test_patent_index_build_and_landscape(tmp_path):
+    """Test the PatentsView index filters by keyword and CPC and counts statuses"""
+    from pathlib import Path
+    from app.services.patent_index import PatentIndex, build_patent_index
+
+    meta = build_patent_index(str(Path(__file__).parent / "fixtures" / "patentsview"), str(tmp_path), ["A61"])
+    assert meta["patents"] == 4 and meta["pending"] == 1
+
+    index = PatentIndex(str(tmp_path))
+    results = index.search("metformin", max_results=10)
+    assert [p["patent_number"] for p in results] == ["US10500002", "US10500003", "US10500001", "20230100001"]
+    assert results[0]["assignee"] == "Pharma Corp B"
+    assert results[2]["status"] == "Expired"
+    assert results[2]["expiry_date"] == "2020-02-01"
+    assert results[3]["status"] == "Pending"
+    assert [p["patent_number"] for p in index.search("metformin cancer")] == ["US10500001"]
+
+    # Claims text is indexed too
+    assert [p["patent_number"] for p in index.search("glibenclamide")] == ["US10500003"]
+
+    landscape = index.landscape("metformin")
+    assert (landscape["total"], landscape["active"], landscape["pending"], landscape["expired"]) == (4, 2, 1, 1)
+    assert index.landscape("metformin", cpc_prefixes=["A61P"])["total"] == 1
+    assert index.search("", cpc_prefixes=["A61K31/64"])[0]["assignee"] == "Jane Doe"
+
+@pytest.mark.asyncio
+async def test_job_queue_progress_and_cancel():
+    """Test background jobs record progress and results, and can be cancelled"""
+    import asyncio
+    from app.services.job_queue import JobQueue, MemoryJobStore, job_summary
+
+    release = asyncio.Event()
+
+    async def runner(query, context):
+        yield {"event": "plan", "data": {"tasks": [{}, {}]}}
+        yield {"event": "agent_result", "data": {"agent": "a", "completed": 1, "total": 2}}
+        await release.wait()
+        yield {"event": "agent_result", "data": {"agent": "b", "completed": 2, "total": 2}}
+        yield {"event": "complete", "data": {"query": query, "synthesis": "done"}}
+
+    queue = JobQueue(MemoryJobStore(), runner, workers=1)
+    first = await queue.submit("metformin")
+    second = await queue.submit("aspirin")
+    assert "result" not in job_summary(first)
+
+    await asyncio.sleep(0.05)
+    job = await queue.get(first["id"])
+    assert job["status"] == "running"
+    assert job["progress"] == {"stage": "agents", "completed": 1, "total": 2}
+    assert (await queue.get(second["id"]))["status"] == "queued"
+
+    assert (await queue.cancel(second["id"]))["status"] == "cancelled"
+    release.set()
+    await asyncio.sleep(0.05)
+
+    job = await queue.get(first["id"])
+    assert job["status"] == "completed"
+    assert job["result"] == {"query": "metformin", "synthesis": "done"}
+    assert (await queue.get(second["id"]))["status"] == "cancelled"
+
+    release.clear()
+    third = await queue.submit("statins")
+    await asyncio.sleep(0.05)
+    assert (await queue.cancel(third["id"]))["status"] == "cancelled"
+    await asyncio.sleep(0.01)
+    assert (await queue.get_stats())["running"] == 0
+    await queue.close()
+
+@pytest.mark.asyncio
+async def test_patent_landscape_is_cached_and_degrades(web_scraper):
+    """Test landscape counts are cached and index errors return None"""
+    calls = []
+
+    class FlakyIndex:
+        def landscape(self, key_terms):
+            calls.append(key_terms)
+            if len(calls) > 1:
+                raise OSError("truncated postings file")
+            return {"total": 3, "active": 2, "pending": 1}
+
+    web_scraper.patent_index = FlakyIndex()
+    first = await web_scraper.patent_landscape("metformin cancer")
+    assert await web_scraper.patent_landscape("metformin cancer") == first
+    assert len(calls) == 1
+
+    assert await web_scraper.patent_landscape("metformin cancer", force_refresh=True) is None
+
+@pytest.mark.asyncio
+async def test_breaker_times_only_the_upstream_request(web_scraper):
+    """Test NCBI rate limit waits do not count against the pubmed breaker"""
+    from types import SimpleNamespace
+    from contextlib import asynccontextmanager
+
+    @asynccontextmanager
+    async def get(url, params=None):
+        async def json(content_type=None):
+            return {"esearchresult": {"idlist": []}}
+        yield SimpleNamespace(status=200, headers={}, raise_for_status=lambda: None, json=json)
+
+    async def get_session():
+        return SimpleNamespace(get=get)
+
+    web_scraper._get_session = get_session
+    breaker = web_scraper.breakers["pubmed"]
+    breaker.call_timeout = 0.1
+    for _ in range(3):
+        await web_scraper.ncbi_limiter.acquire()
+
+    result = await web_scraper._eutils_request("esearch.fcgi", {"term": "metformin"})
+    assert result == {"esearchresult": {"idlist": []}}
+    stats = breaker.get_stats()
+    assert (stats["calls"], stats["failures"], stats["state"]) == (1, 0, "closed")
+
+@pytest.mark.asyncio
+async def test_job_cancel_from_another_process_is_kept():
+    """Test a worker never overwrites a cancel written by another process"""
+    import asyncio
+    from app.services.job_queue import JobQueue, MemoryJobStore
+
+    release = asyncio.Event()
+
+    async def runner(query, context):
+        yield {"event": "complete", "data": {"query": query}}
+        await release.wait()
+
+    store = MemoryJobStore()
+    worker = JobQueue(store, runner, workers=1)
+    other = JobQueue(store, runner, workers=0)
+    job = await worker.submit("metformin")
+    await asyncio.sleep(0.05)
+
+    assert (await other.cancel(job["id"]))["status"] == "cancelled"
+    release.set()
+    await asyncio.sleep(0.05)
+    assert (await store.get(job["id"]))["status"] == "cancelled"
+    assert worker.stats["completed"] == 0
+    await worker.close()
+
+class FakeRedis:
+    """Just enough of the asyncio redis client for RedisJobStore, without a server"""
+
+    def __init__(self):
+        self.values = {}
+        self.lists = {}
+
+    def ping(self):
+        return True
+
+    def close(self):
+        pass
+
+    async def aclose(self):
+        pass
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.values[key] = value
+
+    async def exists(self, key):
+        return int(key in self.values)
+
+    async def delete(self, key):
+        self.values.pop(key, None)
+
+    async def transaction(self, func, *watches, value_from_callable=False):
+        from types import SimpleNamespace
+
+        # Pipelined commands are buffered, not awaited
+        def set(key, value, ex=None):
+            self.values[key] = value
+
+        return await func(SimpleNamespace(get=self.get, multi=lambda: None, set=set))
+
+    async def rpush(self, key, value):
+        self.lists.setdefault(key, []).append(value)
+
+    async def llen(self, key):
+        return len(self.lists.get(key, []))
+
+    async def lrange(self, key, start, end):
+        return list(self.lists.get(key, []))
+
+    async def lrem(self, key, count, value):
+        self.lists.get(key, []).remove(value)
+
+    async def lmove(self, source, destination, src="LEFT", dest="RIGHT"):
+        items = self.lists.get(source)
+        if not items:
+            return None
+        value = items.pop(0 if src == "LEFT" else -1)
+        target = self.lists.setdefault(destination, [])
+        target.insert(0 if dest == "LEFT" else len(target), value)
+        return value
+
+    async def blmove(self, source, destination, timeout, src="LEFT", dest="RIGHT"):
+        import asyncio
+
+        value = await self.lmove(source, destination, src, dest)
+        if value is None:
+            await asyncio.sleep(0.01)
+        return value
+
+    async def scan_iter(self, match):
+        for key in list(self.lists):
+            if key.startswith(match.rstrip("*")):
+                yield key
+
+@pytest.mark.asyncio
+async def test_redis_jobs_from_dead_workers_are_requeued(monkeypatch):
+    """Test popped jobs stay in a processing list until acked and are recovered after the lease expires"""
+    from app.services import job_queue
+    from app.services.job_queue import RedisJobStore
+
+    client = FakeRedis()
+    monkeypatch.setattr(job_queue.redis, "from_url", lambda url, **kwargs: client)
+    monkeypatch.setattr(job_queue.redis.asyncio, "from_url", lambda url, **kwargs: client)
+    crashed = RedisJobStore("redis://test")
+    alive = RedisJobStore("redis://test")
+
+    job = {"id": "j1", "status": "queued", "progress": {"stage": "queued", "completed": 0, "total": 0}}
+    await crashed.save(job)
+    await crashed.push("j1")
+    await crashed.heartbeat()
+    assert await crashed.pop() == "j1"
+    await crashed.save({**job, "status": "running", "progress": {"stage": "agents", "completed": 1, "total": 2}})
+    assert await alive.recover() == 0
+
+    await client.delete(f"jobs:lease:{crashed.worker_id}")
+    assert await alive.recover() == 1
+    assert (await alive.get("j1"))["status"] == "queued"
+    assert await alive.pop() == "j1"
+    await alive.ack("j1")
+    assert client.lists[alive.processing_key] == []
+
+@pytest.mark.asyncio
+async def test_job_worker_survives_store_errors():
+    """Test a failing pop is retried instead of ending the worker"""
+    import asyncio
+    from app.services.job_queue import JobQueue, MemoryJobStore
+
+    async def runner(query, context):
+        yield {"event": "complete", "data": {"query": query}}
+
+    store = MemoryJobStore()
+    pop = store.pop
+    failures = []
+
+    async def flaky_pop(timeout=1.0):
+        if len(failures) < 2:
+            failures.append(1)
+            raise ConnectionError("Redis unavailable")
+        return await pop(timeout)
+
+    store.pop = flaky_pop
+    queue = JobQueue(store, runner, workers=1, error_delay=0.01)
+    job = await queue.submit("metformin")
+    await asyncio.sleep(0.1)
+    assert len(failures) == 2
+    assert (await queue.get(job["id"]))["status"] == "completed"
+    await queue.close()
+
+@pytest.mark.asyncio
+async def test_patent_search_with_index_returns_no_mock_matches(web_scraper, tmp_path):
+    """Test an indexed search with no hits returns nothing rather than mock patents"""
+    from pathlib import Path
+    from app.services.patent_index import PatentIndex, build_patent_index
+
+    build_patent_index(str(Path(__file__).parent / "fixtures" / "patentsview"), str(tmp_path), ["A61"])
+    web_scraper.patent_index = PatentIndex(str(tmp_path))
+
+    assert await web_scraper.search_patents_uspto("zzzunknownmolecule therapy") == []
+    assert (await web_scraper.patent_landscape("zzzunknownmolecule therapy"))["total"] == 0
+    assert await web_scraper.search_patents_uspto("metformin")